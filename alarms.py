@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+
+# ---------------------------------------------------------
+# ALARM SCHEDULER
+# ---------------------------------------------------------
+# Alarms are absolute epoch timestamps in a min-heap. The scheduler thread sleeps on a
+# condition until the earliest deadline (or until add/cancel wakes it). Waits are capped
+# at `max_sleep` and deadlines are re-checked against the wall clock after every wake-up,
+# so a suspend/resume or a clock jump costs at most `max_sleep` of lateness.
+# `clock` and `wait` are injectable so the scheduler can be driven without real time.
+
+DAY = 24 * 3600
+
+class Alarm:
+    def __init__(self, id, at, label="", repeat=None):
+        self.id = id; self.at = at; self.label = label; self.repeat = repeat
+
+    def to_dict(self): return {"id": self.id, "at": self.at, "label": self.label, "repeat": self.repeat}
+
+    def __repr__(self): return f"Alarm({self.id}, at={self.at}, label={self.label!r}, repeat={self.repeat})"
+
+
+class AlarmScheduler:
+    def __init__(self, on_fire, path="alarms.json", clock=time.time, wait=None,
+                 max_sleep=15.0, grace=6 * 3600, on_change=None):
+        self.on_fire = on_fire; self.on_change = on_change
+        self.path = path; self.clock = clock
+        self.wait = wait or (lambda cond, timeout: cond.wait(timeout))
+        self.max_sleep = max_sleep; self.grace = grace
+        self.cond = threading.Condition()
+        self.heap = []; self.alarms = {}
+        self.ids = itertools.count(1)
+        self.last_fired = None
+        self.stopped = False
+        self._load()
+
+    # --- public API ---
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        with self.cond: self.stopped = True; self.cond.notify_all()
+
+    def add(self, at, label="", repeat=None):
+        with self.cond:
+            alarm = Alarm(next(self.ids), float(at), label, repeat)
+            self._push(alarm)
+            self._changed()
+            return alarm
+
+    def cancel(self, alarm_id=None):
+        # One alarm by id, or all of them. Heap entries are dropped lazily.
+        with self.cond:
+            if alarm_id is None: n = len(self.alarms); self.alarms.clear()
+            else: n = 1 if self.alarms.pop(alarm_id, None) else 0
+            if n: self._changed()
+            return n
+
+    def snooze(self, minutes=9, alarm_id=None):
+        with self.cond:
+            src = self.alarms.get(alarm_id) if alarm_id else self.last_fired
+            if src is None: return None
+            alarm = Alarm(next(self.ids), float(self.clock() + minutes * 60), src.label or "Snooze")
+            self._push(alarm)
+            self._changed()
+            return alarm
+
+    def next(self):
+        with self.cond:
+            self._drop_stale()
+            return self.alarms[self.heap[0][1]] if self.heap else None
+
+    def pending(self):
+        with self.cond: return sorted(self.alarms.values(), key=lambda a: a.at)
+
+    def run_pending(self):
+        # Fires everything that is due now; returns the alarms fired. The thread calls this
+        # after every wake-up, tests can call it directly after moving the clock.
+        with self.cond: due = self._pop_due()
+        for alarm in due:
+            try: self.on_fire(alarm)
+            except Exception as e: print(f"Alarm callback failed: {e}")
+        return due
+
+    # --- internals ---
+    def _push(self, alarm):
+        self.alarms[alarm.id] = alarm
+        heapq.heappush(self.heap, (alarm.at, alarm.id))
+        self.cond.notify_all()
+
+    def _drop_stale(self):
+        while self.heap and (self.heap[0][1] not in self.alarms or self.alarms[self.heap[0][1]].at != self.heap[0][0]):
+            heapq.heappop(self.heap)
+
+    def _pop_due(self):
+        now = self.clock(); due = []
+        self._drop_stale()
+        while self.heap and self.heap[0][0] <= now:
+            at, aid = heapq.heappop(self.heap)
+            alarm = self.alarms.pop(aid)
+            late = now - at
+            if alarm.repeat:
+                missed = int(late // alarm.repeat)
+                self._push(Alarm(alarm.id, at + alarm.repeat * (missed + 1), alarm.label, alarm.repeat))
+                late -= alarm.repeat * missed          # judged by the latest occurrence, not the first
+            if late <= self.grace: due.append(alarm)   # device was off for ages: don't ring stale alarms
+            self._drop_stale()
+        if due: self.last_fired = due[-1]; self._changed()
+        return due
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopped:
+                    self._drop_stale()
+                    now = self.clock()
+                    if self.heap and self.heap[0][0] <= now: break
+                    timeout = self.max_sleep if not self.heap else min(self.max_sleep, self.heap[0][0] - now)
+                    self.wait(self.cond, timeout)
+                if self.stopped: return
+            self.run_pending()
+
+    def _changed(self):
+        self._save()
+        if self.on_change:
+            try: self.on_change(self)
+            except Exception as e: print(e)
+
+    def _save(self):
+        if not self.path: return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f: json.dump([a.to_dict() for a in self.alarms.values()], f)
+            os.replace(tmp, self.path)
+        except OSError as e: print(f"Could not save alarms: {e}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path) as f: saved = json.load(f)
+        except (OSError, ValueError) as e: print(f"Could not load alarms: {e}"); return
+        with self.cond:
+            for d in saved: self._push(Alarm(d["id"], d["at"], d.get("label", ""), d.get("repeat")))
+        self.ids = itertools.count(max(self.alarms, default=0) + 1)
@@ -0,0 +1,773 @@
+import os
+import time
+import threading
+import asyncio
+import re
+import numpy as np
+import wave
+import json
+import webbrowser
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+import pyaudio
+from groq import Groq, AsyncGroq
+from concurrent.futures import CancelledError
+
+from stt import GroqWhisperSTT, IncrementalTranscriber
+from codec import tts_codec
+from tts_cache import TTSCache, PhraseBank, clock_fragments, all_clock_fragments
+from mic_buffer import MicRingBuffer, MicCapture
+from vad import VoiceActivityDetector
+from playback import JitterBuffer
+from mixer import Mixer, ClipSource, StreamSource, to_mono16
+from alarms import AlarmScheduler, DAY
+from tracing import tracer
+from net import ConnectionPool
+from intents import IntentRouter
+from tool_cache import ToolCache
+from memory import ConversationMemory, llm_summarizer
+from runtime import runtime, event_setter, aiter_any, BackendLimits
+from echo import EchoSuppressor
+from wakeword import create_detector
+
+load_dotenv()
+
+# API KEYS
+DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+PICOVOICE_ACCESS_KEY = os.getenv("PICOVOICE_ACCESS_KEY")
+SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+
+# ENDPOINTS (overridable so local stand-ins can serve them)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+DEEPGRAM_URL = os.getenv("DEEPGRAM_URL", "https://api.deepgram.com")
+TRACE_FILE = os.getenv("TRACE_FILE")                   # JSONL of per-turn stage timings
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev")
+WEATHER_URL = os.getenv("WEATHER_URL", "https://wttr.in")
+
+# CONVERSATION MEMORY (recent turns verbatim, older ones folded into a summary)
+MEMORY_TOKENS = int(os.getenv("MEMORY_TOKENS", "1200"))
+MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "2"))
+MEMORY_IDLE_SEC = int(os.getenv("MEMORY_IDLE_SEC", "300"))
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "llama-3.1-8b-instant")
+
+# TOOL RESULT CACHE (seconds; 0 = don't cache)
+TOOL_CACHE_FILE = os.getenv("TOOL_CACHE_FILE", ".tool_cache.json")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+# Replies to context-free questions. Repeats answer instantly, but a cached reply is the same reply:
+# kept short, and questions about now (news, scores) or asking for variety (jokes) are never cached
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "300"))
+
+# NETWORK
+NET_CONNECT_TIMEOUT = float(os.getenv("NET_CONNECT_TIMEOUT", "3.05"))
+NET_READ_TIMEOUT = float(os.getenv("NET_READ_TIMEOUT", "15"))
+NET_HEDGE_MS = int(os.getenv("NET_HEDGE_MS", "800"))   # idempotent calls: send a 2nd attempt if the 1st is this slow (0 = off)
+NET_POOL_SIZE = int(os.getenv("NET_POOL_SIZE", "8"))    # connections across all backends; server mode needs ~3 per busy session
+# Concurrent requests per backend across all sessions (server mode); extra turns queue. 0 = unlimited
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", "0"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "0"))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "0"))
+
+# SETTINGS
+CURRENT_LLM = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+CURRENT_VOICE = os.getenv("VOICE_MODEL", "aura-asteria-en") 
+STT_MODEL = os.getenv("STT_MODEL", "whisper-large-v3")
+WEATHER_CITY = os.getenv("WEATHER_CITY", "London")
+ALARM_FILE = os.getenv("ALARM_FILE", "alarms.json")
+ALARM_SNOOZE_MIN = int(os.getenv("ALARM_SNOOZE_MIN", "9"))
+SYSTEM_INSTRUCTIONS = os.getenv("SYSTEM_INSTRUCTIONS", "You are a helpful assistant. Keep answers concise.")
+
+# AUDIO CONSTANTS
+WAKE_WORD_KEYWORD = 'alexa' 
+WAKE_WORD_ENGINE = os.getenv("WAKE_WORD_ENGINE", "porcupine")       # porcupine | template | energy
+WAKE_WORD_TEMPLATE = os.getenv("WAKE_WORD_TEMPLATE", "wake.wav")    # recording of the wake word (template engine)
+WAKE_WORD_THRESHOLD = float(os.getenv("WAKE_WORD_THRESHOLD", "0.85"))
+AUDIO_FORMAT = pyaudio.paInt16
+CHANNELS = 1
+RATE = 16000
+INPUT_CHUNK = 512
+OUTPUT_CHUNK = 4096 
+VOLUME_GAIN = 3.0   
+MIXER_BLOCK = int(os.getenv("MIXER_BLOCK", "1024"))                  # samples per device write: bounds stop and beep latency
+JITTER_TARGET_MS = int(os.getenv("JITTER_TARGET_MS", "150"))          # prefill when TTS arrives at real time
+PLAYBACK_STATS = os.getenv("PLAYBACK_STATS", "0") == "1"              # print jitter-buffer stats after each reply
+# Mixer sources: higher priority wins; while sounding it scales lower ones by its duck
+SPEECH_PRIORITY, BEEP_PRIORITY, ALARM_PRIORITY = 1, 2, 3
+BEEP_DUCK = float(os.getenv("BEEP_DUCK", "0.3"))
+ALARM_DUCK = 0.0
+MIC_BUFFER_SEC = float(os.getenv("MIC_BUFFER_SEC", "10"))   # ring size; must exceed the longest utterance
+PREROLL_MS = int(os.getenv("PREROLL_MS", "300"))            # audio kept from just before the wake word ended
+
+# ENDPOINTING
+VAD_TRAILING_SILENCE_MS = int(os.getenv("VAD_TRAILING_SILENCE_MS", "700"))
+VAD_MAX_UTTERANCE_MS = int(os.getenv("VAD_MAX_UTTERANCE_MS", "6000"))
+VAD_NO_SPEECH_MS = int(os.getenv("VAD_NO_SPEECH_MS", "5000"))
+
+# BARGE-IN (wake word / talking over the reply interrupts it)
+BARGE_IN = os.getenv("BARGE_IN", "1") == "1"
+# Speech this long over the reply interrupts (0 = wake word only). Off until the echo suppressor and
+# gate stop firing on the reply itself: benchmarks/barge_in_eval.py still false-triggers at 300 ms
+BARGE_IN_VAD_MS = int(os.getenv("BARGE_IN_VAD_MS", "0"))
+ECHO_MAX_DELAY_MS = int(os.getenv("ECHO_MAX_DELAY_MS", "400"))
+
+# STREAMING TTS
+SEGMENT_MIN_CHARS = int(os.getenv("SEGMENT_MIN_CHARS", "12"))   # shortest sentence sent on its own
+CLAUSE_MIN_CHARS = int(os.getenv("CLAUSE_MIN_CHARS", "60"))     # split long sentences at , once this long
+
+# INCREMENTAL STT
+STT_INCREMENTAL = os.getenv("STT_INCREMENTAL", "0") == "1"
+STT_WINDOW_SEC = float(os.getenv("STT_WINDOW_SEC", "2.5"))
+
+# AUDIO TRANSPORT (codec.py): falls back to wav / linear16 when the codec isn't available
+STT_CODEC = os.getenv("STT_CODEC", "flac")          # wav | flac | opus   (flac/opus need soundfile)
+TTS_CODEC = os.getenv("TTS_CODEC", "linear16")      # linear16 | mulaw | opus   (opus needs opuslib)
+
+# TTS CACHE
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+TTS_CACHE_MEM_MB = float(os.getenv("TTS_CACHE_MEM_MB", "8"))
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "64"))
+TTS_PREWARM = os.getenv("TTS_PREWARM", "1") == "1"
+CLOCK_PREFIXES = ["It's", "Alarm set for"]
+FIXED_PHRASES = ["Please say a time, like '5 PM'.", "Connection error.", "Error generating response.", "Opening YouTube..."]
+
+# ---------------------------------------------------------
+# SHARED STATE
+# ---------------------------------------------------------
+class AssistantState:
+    # Observable: subscribe(fn, fields) calls fn(name, value) whenever one of those fields
+    # takes a new value. Writers are the asyncio loop, the wake loop, the mixer and alarm
+    # threads, and listeners run on the writing thread, so they should only hand off (set
+    # an Event, fire a Clock trigger). Rewriting a field with the same value is silent.
+    def __init__(self):
+        object.__setattr__(self, "_listeners", ())
+        self.active = False
+        self.amplitude = 0.0
+        self.stop_signal = False 
+        self.user_text = "" 
+        self.ai_text = ""    
+        self.status = ""
+        self.current_temp = "??"
+        self.next_alarm_label = "No Active Alarms"
+        self.is_alarm_ringing = False
+
+    def __setattr__(self, name, value):
+        old = self.__dict__.get(name, _UNSET)
+        object.__setattr__(self, name, value)
+        if old is _UNSET or old == value: return
+        for fields, fn in self._listeners:
+            if fields is None or name in fields: fn(name, value)
+
+    def subscribe(self, fn, fields=None):
+        # The tuple is replaced, never mutated, so writers can iterate it without a lock
+        object.__setattr__(self, "_listeners", self._listeners + ((frozenset(fields) if fields else None, fn),))
+        return fn
+
+    def unsubscribe(self, fn):
+        object.__setattr__(self, "_listeners", tuple(l for l in self._listeners if l[1] is not fn))
+
+_UNSET = object()
+state = AssistantState()
+def new_tts_cache(): return TTSCache(CURRENT_VOICE, RATE, TTS_CACHE_DIR, int(TTS_CACHE_MEM_MB * 2**20), int(TTS_CACHE_DISK_MB * 2**20))
+net = ConnectionPool(NET_CONNECT_TIMEOUT, NET_READ_TIMEOUT, NET_POOL_SIZE, hedge_after=NET_HEDGE_MS / 1000)
+limits = BackendLimits(stt=STT_CONCURRENCY, llm=LLM_CONCURRENCY, tts=TTS_CONCURRENCY)
+tool_cache = ToolCache(TOOL_CACHE_FILE or None)
+tool_cache.register("search", SEARCH_CACHE_TTL, stale=24 * 3600)
+tool_cache.register("weather", WEATHER_CACHE_TTL, stale=3 * 3600)
+tool_cache.register("llm", LLM_CACHE_TTL)
+LLM_UNCACHEABLE = re.compile(r"\b(?:now|today|tonight|tomorrow|yesterday|this (?:week|year)|latest|current(?:ly)?|recent|news|"
+                             r"scores?|winning|won|game|match|prices?|stocks?|jokes?|story|poem|riddle|fact|random|surprise)\b", re.I)
+
+# ---------------------------------------------------------
+# 1. TOOL MANAGER
+# ---------------------------------------------------------
+class ToolManager:
+    @staticmethod
+    def get_time(): 
+        return datetime.now().strftime('%I:%M %p')
+
+    WEATHER_ERRORS = ("N/A", "Offline")
+    CLOCK = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?m\.?)?')   # the router's time slot
+
+    @staticmethod
+    def _fetch_weather():
+        try:
+            url = f"{WEATHER_URL}/{WEATHER_CITY}?format=%t"
+            response = net.get(url, hedge=True, timeout=10)
+            if response.status_code == 200:
+                clean_temp = response.text.strip().replace('+', '')
+                return f"{clean_temp} in {WEATHER_CITY}"
+            return "N/A"
+        except: return "Offline"
+
+    @staticmethod
+    def fetch_weather_bg():
+        # Shows the cached reading right away; a stale or missing one is refreshed in the background
+        def _set(temp):
+            # Keep showing a stale reading rather than replacing it with an error
+            if temp not in ToolManager.WEATHER_ERRORS or state.current_temp == "??": state.current_temp = temp
+        cached = tool_cache.get_async("weather", WEATHER_CITY, ToolManager._fetch_weather, _set,
+                                      cacheable=lambda t: t not in ToolManager.WEATHER_ERRORS)
+        if cached: state.current_temp = cached
+
+    @staticmethod
+    def get_weather():
+        # Blocking; for callers without the UI's background refresh (server sessions)
+        return tool_cache.get("weather", WEATHER_CITY, ToolManager._fetch_weather,
+                              cacheable=lambda t: t not in ToolManager.WEATHER_ERRORS)
+
+    @staticmethod
+    def parse_and_set_alarm(slots, scheduler):
+        # From the router's alarm_set slots: "rel" ("20 minute") or "time" ("6:30 p.m."), "repeat"
+        now = datetime.now().replace(second=0, microsecond=0)
+        rel = re.fullmatch(r'(\d+) (minute|hour)', slots.get("rel", ""))
+        at = ToolManager.CLOCK.fullmatch(slots.get("time", ""))
+        try:
+            if rel:
+                target_time = now + timedelta(**{rel.group(2) + "s": int(rel.group(1))})
+            elif at:
+                h = int(at.group(1)); m = int(at.group(2) or 0); period = at.group(3)
+                if h <= 12:
+                    if period == 'p' and h != 12: h += 12
+                    elif period == 'a' and h == 12: h = 0
+                    elif not period and now.hour > h and h < 12: h += 12
+                target_time = now.replace(hour=h, minute=m)
+                if target_time < datetime.now(): target_time += timedelta(days=1)
+            else: return None
+        except ValueError: return None      # "at 25", "at 7:75"
+
+        user_friendly = target_time.strftime("%I:%M %p").lstrip('0')
+        scheduler.add(target_time.timestamp(), user_friendly, DAY if slots.get("repeat") else None)
+        return user_friendly
+
+    @staticmethod
+    def cancel_alarms(slots, scheduler):
+        # "cancel my 6:30 p.m. alarm" cancels alarms at the router's time slot; without one
+        # ("cancel alarms", "cancel all 3 alarms": a count is not a time) all of them go
+        at = ToolManager.CLOCK.fullmatch(slots.get("time", ""))
+        if not at: return scheduler.cancel()
+        h = int(at.group(1)); m = at.group(2); period = at.group(3)
+        n = 0
+        for alarm in scheduler.pending():
+            t = datetime.fromtimestamp(alarm.at)
+            if h % 12 != t.hour % 12 and h != t.hour: continue
+            if m and int(m) != t.minute: continue
+            if period and period != t.strftime("%p")[0].lower(): continue
+            n += scheduler.cancel(alarm.id)
+        return n
+
+    @staticmethod
+    def search_web(query):
+        if not SERPER_API_KEY: return "API Key missing."
+        return tool_cache.get("search", query, lambda: ToolManager._search(query),
+                              cacheable=lambda r: r not in ("Connection error.", "No results."))
+
+    @staticmethod
+    def _search(query):
+        try:
+            resp = net.post(f"{SERPER_URL}/search",   # billed per request: never hedged
+                headers={'X-API-KEY': SERPER_API_KEY, 'Content-Type': 'application/json'}, 
+                data=json.dumps({"q": query, "gl": "us"}), timeout=5).json()
+            if 'organic' in resp: return resp['organic'][0].get('snippet')
+            return "No results."
+        except: return "Connection error."
+
+    @staticmethod
+    def play_on_youtube(query):
+        try:
+            # Requires `pip install pywhatkit` ideally, or simple webbrowser logic:
+            webbrowser.open(f"https://www.youtube.com/results?search_query={query}")
+            return True, "Opening YouTube..."
+        except: return False, "Error opening YouTube."
+
+# ---------------------------------------------------------
+# 2. SENTENCE CHUNKER (LLM tokens -> speakable segments)
+# ---------------------------------------------------------
+class SentenceChunker:
+    SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+    CLAUSE_END = re.compile(r'[,;:]\s+')
+
+    def __init__(self, min_chars=SEGMENT_MIN_CHARS, clause_chars=CLAUSE_MIN_CHARS):
+        self.buf = ""; self.min_chars = min_chars; self.clause_chars = clause_chars
+
+    def feed(self, token):
+        self.buf += token
+        out = []
+        while True:
+            cut = self._find_cut()
+            if cut is None: break
+            seg, self.buf = self.buf[:cut].strip(), self.buf[cut:]
+            if seg: out.append(seg)
+        return out
+
+    def _find_cut(self):
+        for m in self.SENTENCE_END.finditer(self.buf):
+            if len(self.buf[:m.start()].strip()) >= self.min_chars: return m.end()
+        if len(self.buf) >= self.clause_chars:
+            cuts = [m.end() for m in self.CLAUSE_END.finditer(self.buf) if m.start() >= self.min_chars]
+            if cuts: return cuts[-1]
+        return None
+
+    def flush(self):
+        seg, self.buf = self.buf.strip(), ""
+        return [seg] if seg else []
+
+# ---------------------------------------------------------
+# 3. AUDIO ENGINE
+# ---------------------------------------------------------
+class AudioEngine:
+    # `pa` is anything with PyAudio's open(); a server session passes its network stand-in
+    def __init__(self, pa=None, state=state, tracer=tracer, tts_cache=None):
+        self.pa = pa or pyaudio.PyAudio()
+        self.state = state; self.tracer = tracer
+        self.stream = self.pa.open(
+            format=AUDIO_FORMAT, channels=CHANNELS, rate=RATE, 
+            output=True, frames_per_buffer=OUTPUT_CHUNK
+        )
+        self.jitter = JitterBuffer(RATE, target_ms=JITTER_TARGET_MS)
+        # The only writer to the output stream: replies, beeps and alarms are all its sources
+        self.mixer = Mixer(self.stream, RATE, MIXER_BLOCK, tap=self._on_block)
+        self._play_gen = 0; self.speech = None
+        self.is_playing = False; self.playback_done = None
+        self.dg_headers = {"Authorization": f"Token {DEEPGRAM_API_KEY}", "Content-Type": "application/json"}
+        self.tts_cache = tts_cache or new_tts_cache()
+        self.tts_codec = tts_codec(TTS_CODEC, RATE)
+        self.phrases = PhraseBank(self.tts_cache)
+        # Everything written to the speaker, on the mic's clock (SmartAssistant sets echo.clock)
+        self.echo = EchoSuppressor(RATE, INPUT_CHUNK, ECHO_MAX_DELAY_MS)
+
+    def close(self):
+        self.stop_playback(); self.mixer.close()
+        try: self.stream.close()
+        except Exception: pass
+
+    def get_mic_input_stream(self):
+        return self.pa.open(format=AUDIO_FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=INPUT_CHUNK)
+
+    def stop_playback(self):
+        self.is_playing = False; self.state.amplitude = 0
+        self.jitter.abort(); self.mixer.stop("speech")
+
+    def _on_block(self, out):
+        # Mixer thread, just before `out` goes to the device
+        if BARGE_IN: self.echo.push(out)
+        sp = self.speech
+        if self.is_playing and sp is not None: self.state.amplitude = sp.level / 60
+
+    def _tts_url(self, codec):
+        return f"{DEEPGRAM_URL}/v1/speak?model={CURRENT_VOICE}&{codec.query}"
+
+    async def _tts_stream(self, seg):
+        # bytes = already rendered PCM (stitched phrase), str = text to synthesize
+        pcm = seg if isinstance(seg, bytes) else self.tts_cache.get(seg, self.tts_codec.name)
+        if pcm is not None:
+            self.tracer.mark("tts_first_byte")
+            self.jitter.put(pcm)
+            return
+
+        got = bytearray(); complete = False; codec = self.tts_codec; error = None
+        async with limits.slot("tts", self.tracer):
+            with self.tracer.span("tts", chars=len(seg), codec=codec.name) as info:
+                async with net.ahttp.stream("POST", self._tts_url(codec), headers=self.dg_headers, json={"text": seg}) as r:
+                    if r.status_code != 200: error = (r.status_code, (await r.aread())[:200])
+                    else:
+                        # Decoded chunk by chunk: audio is playable as soon as its bytes land
+                        dec = codec.decoder(); wire = 0
+                        async for chunk in r.aiter_bytes():      # as received; a size would re-buffer to it
+                            wire += len(chunk)
+                            pcm = dec.feed(chunk)
+                            if pcm:
+                                if not got: self.tracer.mark("tts_first_byte")
+                                self.jitter.put(pcm); got += pcm
+                        info["wire_bytes"] = wire; complete = True
+        if error and codec.name != "linear16":
+            print(f"TTS {codec.name} refused ({error[0]}); using linear16")
+            self.tts_codec = tts_codec("linear16", RATE)
+            return await self._tts_stream(seg)
+        if error: print(f"TTS error {error[0]}: {error[1]}")
+        if complete: self.tts_cache.put(seg, bytes(got), codec.name)
+
+    def synthesize(self, text):
+        codec = self.tts_codec
+        r = net.post(self._tts_url(codec), headers=self.dg_headers, json={"text": text})
+        if r.status_code == 200 and r.content:
+            pcm = codec.decoder().feed(r.content)
+            if pcm: self.tts_cache.put(text, pcm, codec.name)
+
+    def warm_cache(self, texts):
+        # Pre-render phrase fragments and fixed replies in the background; later runs hit the disk cache
+        def _job():
+            for t in self.phrases.missing(texts, self.tts_codec.name):
+                try: self.synthesize(t)
+                except Exception as e: print(e); return
+        threading.Thread(target=_job, daemon=True).start()
+
+    async def play_segments(self, segments):
+        # `segments` may be an async generator still waiting on the LLM; it is drained by its own
+        # task so the next sentence is ready as soon as the current one has been synthesized.
+        # Returns once every segment is in the jitter buffer; await wait_playback() for the end.
+        self.stop_playback()
+        self.jitter.start()
+        self.is_playing = True; self._play_gen += 1
+        self.playback_done = asyncio.Event()
+        gen = self._play_gen; done = event_setter(self.playback_done)
+        def _end():
+            # Mixer thread (or stop_playback): the reply finished or was cut off
+            if gen == self._play_gen:
+                self.is_playing = False; self.state.amplitude = 0
+                if PLAYBACK_STATS: print(f"Playback: {self.jitter.stats()}")
+            done()
+        self.speech = self.mixer.play("speech", StreamSource(self.jitter, MIXER_BLOCK, priority=SPEECH_PRIORITY, gain=VOLUME_GAIN,
+                                                             on_first=lambda: self.tracer.mark("first_audio"), on_end=_end))
+
+        pending = asyncio.Queue()
+        async def _produce():
+            try:
+                async for seg in aiter_any(segments): pending.put_nowait(seg)
+            except Exception as e: print(e)
+            finally: pending.put_nowait(None)
+        producer = asyncio.create_task(_produce())
+        try:
+            while (seg := await pending.get()) is not None:
+                try: await self._tts_stream(seg)
+                except Exception as e: print(e)
+        except asyncio.CancelledError:
+            self.stop_playback(); raise
+        finally:
+            producer.cancel(); self.jitter.finish()
+
+    async def wait_playback(self):
+        if self.playback_done is not None: await self.playback_done.wait()
+
+    async def play_streamed_response(self, text):
+        await self.play_segments([text])
+
+    async def play_phrase(self, text, fragments):
+        # Stitch from cached fragments when they are all there, otherwise synthesize the full text
+        pcm = self.phrases.render(fragments, self.tts_codec.name)
+        await self.play_segments([pcm if pcm else text])
+
+    # --- SOUNDS (WAV) ---
+    def load_sound(self, path):
+        # Decoded once to mono int16 at RATE, so playing it is just another mixer source
+        try:
+            with wave.open(path, 'rb') as wf:
+                return to_mono16(wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getsampwidth(), wf.getframerate(), RATE)
+        except Exception as e: print(f"Sound {path}: {e}"); return None
+
+    def play_sound(self, pcm):
+        self.mixer.play("beep", ClipSource(pcm, priority=BEEP_PRIORITY, duck=BEEP_DUCK))
+
+    def play_alarm_loop(self, pcm, on_end=None):
+        if self.state.is_alarm_ringing: return
+        self.state.is_alarm_ringing = True
+        def _end():
+            self.state.is_alarm_ringing = False
+            if on_end: on_end()
+        self.mixer.play("alarm", ClipSource(pcm, loops=20, gap=int(RATE * 0.2), priority=ALARM_PRIORITY,
+                                            duck=ALARM_DUCK, on_end=_end))
+
+    def stop_alarm(self):
+        self.mixer.stop("alarm")
+
+# ---------------------------------------------------------
+# 4. MAIN LOGIC
+# ---------------------------------------------------------
+class SmartAssistant:
+    # One microphone/speaker pair. The app makes one with the module's `state` and `tracer`;
+    # server.py makes one per connected client, each with its own.
+    def __init__(self, stt=None, engine=None, state=state, tracer=tracer, wake_word=True,
+                 alarm_file=ALARM_FILE, prewarm=TTS_PREWARM, open_media=True):
+        self.state = state; self.tracer = tracer
+        if tracer.path is None: tracer.configure(TRACE_FILE)
+        runtime.start()
+        self.engine = engine or AudioEngine(state=state, tracer=tracer)
+        # The async client serves the turn (cancellable); the blocking one background jobs like summaries
+        self.groq = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, http_client=net.http)
+        self.agroq = AsyncGroq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, http_client=net.ahttp)
+        self.stt = stt or GroqWhisperSTT(self.groq, STT_MODEL, aclient=self.agroq, codec=STT_CODEC)
+        self.turn = None
+        self.router = IntentRouter()
+        self.memory = ConversationMemory(llm_summarizer(self.groq, SUMMARY_MODEL), MEMORY_TOKENS,
+                                         MEMORY_KEEP_TURNS, MEMORY_IDLE_SEC)
+        self.vad = VoiceActivityDetector(RATE, INPUT_CHUNK, trailing_silence_ms=VAD_TRAILING_SILENCE_MS,
+                                         max_utterance_ms=VAD_MAX_UTTERANCE_MS, no_speech_ms=VAD_NO_SPEECH_MS)
+        # Runs on the echo-suppressed mic while the assistant talks; stricter, as residual echo remains
+        self.barge_vad = VoiceActivityDetector(RATE, INPUT_CHUNK, min_speech_ms=max(BARGE_IN_VAD_MS, 1),
+                                               start_ratio=4.0, min_level=250.0, no_speech_ms=10**9, onset_gap_ms=100)
+        self.detector = None
+        self.frames_heard = 0; self.wake_errors = 0
+        self.beep = self.engine.load_sound("beep.wav") if os.path.exists("beep.wav") else None
+        self.on_window_front = None     # set by the UI
+        self.open_media = open_media    # "play X" opens a browser on this machine; off for remote sessions
+
+        self.mic = None
+        # Without a wake word (server sessions) turns start from push_to_talk()
+        self.wake_word = wake_word
+        if wake_word: self.detector = create_detector(WAKE_WORD_ENGINE, RATE, INPUT_CHUNK, PICOVOICE_ACCESS_KEY,
+                                                      WAKE_WORD_KEYWORD, WAKE_WORD_TEMPLATE, WAKE_WORD_THRESHOLD)
+
+        self.warm_connections()
+        if prewarm: self.engine.warm_cache(all_clock_fragments(CLOCK_PREFIXES) + FIXED_PHRASES)
+        
+        threading.Thread(target=self.loop, daemon=True).start()
+        self.alarms = AlarmScheduler(self.on_alarm, alarm_file, on_change=self.alarms_changed)
+        self.alarms_changed(self.alarms)
+        self.alarms.start()
+
+    def bring_window_front(self):
+        # After opening a browser tab; only a UI has a window to take focus back to
+        if self.on_window_front: self.on_window_front()
+
+    def warm_connections(self):
+        # Startup and every wake word: the reply will need all of these within a second or two
+        net.warm([SERPER_URL if SERPER_API_KEY else None], [DEEPGRAM_URL, str(self.agroq.base_url)], loop=runtime.loop)
+
+    def on_alarm(self, alarm):
+        self.state.active = True; self.state.ai_text = "ALARM RINGING"
+        if self.beep is not None: self.engine.play_alarm_loop(self.beep, on_end=self._alarm_ended)
+
+    def _alarm_ended(self):
+        # Rang out (or was dismissed) with nobody talking: back to the idle screen
+        if self.turn is None: self.state.active = False
+
+    def alarms_changed(self, scheduler):
+        nxt = scheduler.next()
+        self.state.next_alarm_label = datetime.fromtimestamp(nxt.at).strftime("%I:%M %p").lstrip('0') if nxt else "No Active Alarms"
+
+    def close(self):
+        # Ends the session: loop, capture, playback and alarms
+        self.state.stop_signal = True
+        self.interrupt()
+        if self.mic: self.mic.stop()
+        self.alarms.stop(); self.engine.close()
+
+    def loop(self):
+        if self.wake_word and not self.detector: return
+        try: self.mic = MicCapture(self.engine.get_mic_input_stream(), MicRingBuffer(RATE, MIC_BUFFER_SEC), INPUT_CHUNK)
+        except: return 
+        self.mic.start()
+        self.engine.echo.clock = lambda: self.mic.ring.head
+        wake = self.mic.ring.reader()
+        detector = self.detector; n = detector.frame_length if detector else INPUT_CHUNK
+        was_speaking = False; errors = 0
+        print("Listening...")
+        
+        # Keeps listening while a turn runs: a wake word, or speech over the reply, barges in.
+        # Frames are views into the mic ring, handed to the detector without copying.
+        while not self.state.stop_signal:
+            try:
+                frame = wake.read(n, timeout=1.0)
+                if frame is None: continue
+                self.frames_heard += 1
+                busy = self.turn is not None
+                alarm = self.state.is_alarm_ringing
+                # A ringing alarm counts as talking: the wake word, or speech over it, dismisses it
+                speaking = BARGE_IN and (busy and self.engine.is_playing or alarm)
+                if speaking:
+                    frame = self.engine.echo.process(frame, wake.pos - n)
+                    if not was_speaking: self.barge_vad.reset(); self.barge_vad.floor = self.vad.floor
+                was_speaking = speaking
+                is_wake = detector is not None and detector.process(frame) >= 0 and (speaking or not busy)
+                # Before the echo canceller has converged the VAD would fire on the reply itself
+                barge = speaking and self.engine.echo.ready and BARGE_IN_VAD_MS > 0 and self.barge_vad.process(frame) == "start"
+                if not busy and not alarm: self.vad.observe(frame)  # keep the room's noise floor current between turns
+                if is_wake or barge:
+                    beep_len = 0; start = wake.pos
+                    if barge: start -= int(RATE * BARGE_IN_VAD_MS / 1000) + len(frame)   # the speech that triggered it
+                    elif is_wake and not alarm and self.beep is not None:
+                        self.engine.play_sound(self.beep)   # first, so nothing below delays it
+                        beep_len = len(self.beep)
+                    if is_wake and not busy: self.tracer.begin_turn(trigger="wake"); self.tracer.mark("wake")
+                    if is_wake: self.warm_connections()
+                    if busy: self.interrupt()
+                    self.start_turn(start, beep_len, trigger="barge_in" if busy else "wake")
+                    if alarm: self.engine.stop_alarm()     # after start_turn, so the screen stays active
+                errors = 0
+            except Exception as e:
+                errors += 1; self.wake_errors += 1
+                if errors == 1 or self.wake_errors % 100 == 0: print(f"Wake loop error ({self.wake_errors}): {e!r}")
+                if errors >= 10: time.sleep(0.5)   # a broken detector or stream shouldn't spin a core
+
+    def push_to_talk(self):
+        # A button (or a remote client) instead of the wake word: the turn starts now
+        if self.mic is None: return None
+        if self.turn is not None: self.interrupt()
+        return self.start_turn(self.mic.ring.head, trigger="button")
+
+    def start_turn(self, wake_pos, ignore_samples=0, trigger="other"):
+        # Schedules a turn on the event loop; it waits for a cancelled predecessor to unwind first
+        fut = runtime.submit(self._turn(wake_pos, ignore_samples, trigger, self.turn))
+        self.turn = fut
+        fut.add_done_callback(self._turn_done)
+        return fut
+
+    def _turn_done(self, fut):
+        if self.turn is fut: self.turn = None
+
+    def conversation(self, wake_pos, ignore_samples=0):
+        # Runs a turn and blocks the calling thread until it finishes or interrupt() cancels it
+        try: self.start_turn(wake_pos, ignore_samples).result()
+        except CancelledError: pass
+        except Exception as e: print(e)
+
+    def interrupt(self):
+        # From any thread: cancels the turn task, and with it every request it is awaiting
+        self.engine.stop_playback()
+        turn = self.turn
+        if turn: turn.cancel()
+
+    async def _turn(self, wake_pos, ignore_samples, trigger="other", prev=None):
+        if prev is not None: await asyncio.wait([asyncio.wrap_future(prev)])
+        self.tracer.begin_turn(trigger=trigger)  # no-op if the wake word already opened the turn
+        if trigger == "barge_in": self.tracer.mark("barge_in")
+        try: await self._conversation(wake_pos, ignore_samples)
+        except asyncio.CancelledError:
+            self.engine.stop_playback(); self.tracer.mark("cancelled"); raise
+        finally:
+            self.state.active = False; self.state.amplitude = 0
+            self.tracer.end_turn()
+
+    async def _conversation(self, wake_pos, ignore_samples):
+        self.state.active = True; self.state.status = "Listening"
+        self.state.user_text = ""; self.state.ai_text = ""
+        
+        # Start from audio already in the ring: a short pre-roll before the wake word ended,
+        # so words spoken straight after it (even over the beep) are kept
+        ring = self.mic.ring
+        start = max(ring.oldest(), wake_pos - RATE * PREROLL_MS // 1000)
+        rec = ring.reader(start)
+        speech_from = wake_pos + ignore_samples  # the beep itself must not count as speech
+        # Windows are uploaded as tasks on the loop, each through self.transcribe (and its slot)
+        inc = IncrementalTranscriber(self.stt, RATE, window_s=STT_WINDOW_SEC,
+                                     submit=lambda pcm, rate: runtime.submit(self.transcribe(pcm))) if STT_INCREMENTAL else None
+        self.vad.reset()
+        
+        try:
+            with self.tracer.span("capture") as info:
+                while True:
+                    chunk = await runtime.blocking(rec.read, INPUT_CHUNK, 1.0)
+                    if chunk is None: break
+                    if inc: inc.feed(chunk.tobytes())
+                    if rec.pos <= speech_from:
+                        self.state.amplitude = float(np.abs(chunk).mean()) / 30; continue
+                    if self.vad.process(chunk) == "end": break
+                    self.state.amplitude = self.vad.rms / 30
+                info.update(audio_ms=round((rec.pos - start) * 1000 / RATE), endpoint=self.vad.reason)
+                
+            self.state.status = "Thinking..."
+            
+            try:
+                with self.tracer.span("stt", incremental=bool(inc)):
+                    if inc: user_txt = await asyncio.to_thread(inc.finish)
+                    else: user_txt = await self.transcribe(ring.slice(start, rec.pos).tobytes())
+                self.state.user_text = user_txt
+            except Exception as e: print(e); user_txt = ""
+        finally:
+            # A cancelled turn (barge-in, interrupt()) only stops awaiting finish(): this aborts
+            # the window upload still in flight and the worker thread
+            if inc: inc.close()
+
+        if not user_txt.strip(): return
+
+        with self.tracer.span("tool"): rsp, fragments, opened_external = await asyncio.to_thread(self.route, user_txt)
+
+        self.state.ai_text = ""
+        if rsp:
+            self.state.status = "Speaking"
+            self.state.ai_text = rsp
+            if fragments: await self.engine.play_phrase(rsp, fragments)
+            else: await self.engine.play_streamed_response(rsp)
+        else:
+            msgs = self.memory.messages(SYSTEM_INSTRUCTIONS, user_txt)
+            await self.engine.play_segments(self.stream_reply(msgs))
+        self.memory.add_turn(user_txt, self.state.ai_text)
+
+        # TRIGGER WINDOW RESTORE IF EXTERNAL APP OPENED
+        if opened_external:
+            self.bring_window_front()
+
+        with self.tracer.span("playback"): await self.engine.wait_playback()
+
+    async def transcribe(self, pcm):
+        async with limits.slot("stt", self.tracer):
+            if hasattr(self.stt, "atranscribe"): return await self.stt.atranscribe(pcm, RATE)
+            return await asyncio.to_thread(self.stt.transcribe, pcm, RATE)
+
+    def route(self, user_txt):
+        # Confident intents are answered locally; an empty reply means "ask the LLM"
+        rsp = ""; fragments = None
+        opened_external = False # Flag to track external apps
+        intent = self.router.route(user_txt)
+        if intent is None: return rsp, fragments, opened_external
+        name, slots = intent.name, intent.slots
+
+        if name in ("snooze", "alarm_cancel"): self.engine.stop_alarm()   # a turn started over the alarm
+
+        if name == "snooze":
+            rsp = f"Snoozing for {ALARM_SNOOZE_MIN} minutes." if self.alarms.snooze(ALARM_SNOOZE_MIN) else "There's no alarm to snooze."
+
+        elif name == "alarm_cancel":
+            n = ToolManager.cancel_alarms(slots, self.alarms)
+            rsp = f"Cancelled {n} alarm{'s' if n != 1 else ''}." if n else "No matching alarms."
+
+        elif name == "alarm_set":
+            pt = ToolManager.parse_and_set_alarm(slots, self.alarms)
+            rsp = f"Alarm set for {pt}." if pt else "Please say a time, like '5 PM'."
+            if pt:
+                at = datetime.strptime(pt, "%I:%M %p")
+                fragments = clock_fragments("Alarm set for", at.hour, at.minute)
+        
+        elif name == "time":
+            now = datetime.now()
+            rsp = f"It's {now.strftime('%I:%M %p')}"
+            fragments = clock_fragments("It's", now.hour, now.minute)
+
+        elif name == "weather":
+            temp = self.state.current_temp
+            if temp == "??": temp = ToolManager.get_weather()   # nothing fetched it for this state yet
+            known = temp not in ("??", "N/A", "Offline")
+            rsp = f"It's {temp}." if known else "I can't reach the weather service right now."
+
+        elif name == "search": rsp = ToolManager.search_web(slots.get("query", user_txt))
+        
+        elif name == "play" and not self.open_media: rsp = "I can't play videos on your device."
+
+        elif name == "play": 
+            success, rsp = ToolManager.play_on_youtube(slots.get("title", user_txt))
+            if success: opened_external = True # Set flag true
+
+        return rsp, fragments, opened_external
+
+    async def stream_reply(self, msgs):
+        # Yields speakable segments while the completion is still streaming in
+        chunker = SentenceChunker(); t_llm = self.tracer.now()
+        cacheable = LLM_CACHE_TTL and len(msgs) == 2 and not LLM_UNCACHEABLE.search(msgs[-1]["content"])  # context-free, timeless
+        cache_key = json.dumps(msgs) if cacheable else None
+        cached = tool_cache.fresh("llm", cache_key) if cache_key else None
+        if cached:
+            self.state.status = "Speaking"; self.state.ai_text = cached
+            for seg in chunker.feed(cached) + chunker.flush(): yield seg
+            return
+        t0 = time.perf_counter(); complete = False
+        try:
+            async with limits.slot("llm", self.tracer):   # held until the completion has streamed in
+                stream = await self.agroq.chat.completions.create(model=CURRENT_LLM, messages=msgs, max_tokens=200, stream=True)
+                async with stream:     # closes the HTTP response if the turn is cancelled mid-stream
+                    async for part in stream:
+                        tok = part.choices[0].delta.content if part.choices else None
+                        if not tok: continue
+                        self.tracer.mark("llm_first_token")
+                        self.state.status = "Speaking"; self.state.ai_text += tok
+                        for seg in chunker.feed(tok): yield seg
+            complete = True
+            self.tracer.add_span("llm", t_llm, self.tracer.now())
+        except Exception as e:
+            print(e)
+            if not self.state.ai_text.strip():
+                self.state.ai_text = "Error generating response."
+                yield self.state.ai_text; return
+        if complete and cache_key and self.state.ai_text.strip():
+            tool_cache.put("llm", cache_key, self.state.ai_text, time.perf_counter() - t0)
+        for seg in chunker.flush(): yield seg
@@ -0,0 +1,128 @@
+# Barge-in while the assistant talks: synthetic assistant speech is "played" as the
+# reference, reaches the mic through a simulated echo path (delay, gain, short room
+# reverb, noise), and in half the trials the user starts talking over it. The barge-in
+# detector (EchoSuppressor + VAD, as in SmartAssistant) runs on the mic frames.
+#   false triggers   trials without user speech that fired
+#   detection ms     user speech onset -> barge-in fired
+#   stop ms          interrupt -> reply off the mixer (AudioEngine on a simulated device; the
+#                    block already being written, up to MIXER_BLOCK samples, still plays)
+#
+#   python benchmarks/barge_in_eval.py [--trials 40] [--vad-ms 300] [--no-engine]
+#
+# Exits 1 if the suppressed detector fires on any quiet trial: at that rate replies would
+# cut themselves off, and BARGE_IN_VAD_MS should stay 0.
+import os
+import sys
+import time
+import argparse
+import statistics
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from echo import EchoSuppressor
+from vad import VoiceActivityDetector
+
+RATE = 16000
+FRAME = 512
+
+def voice(rng, seconds, f0, level):
+    # Voiced runs of 0.15-0.8 s (syllables merging into words) separated by short gaps
+    n = int(seconds * RATE); t = np.arange(n) / RATE
+    f = f0 + 0.15 * f0 * np.sin(2 * np.pi * rng.uniform(0.4, 1.0) * t)
+    phase = 2 * np.pi * np.cumsum(f) / RATE
+    v = sum(np.sin(k * phase + rng.uniform(0, 6)) / k for k in range(1, 7))
+    env = np.zeros(n); i = 0
+    while i < n:
+        on = int(rng.uniform(0.15, 0.8) * RATE); off = int(rng.uniform(0.05, 0.3) * RATE)
+        env[i:i + on] = rng.uniform(0.5, 1.0); i += on + off
+    env = np.convolve(env, np.ones(160) / 160, mode="same")          # 10 ms attack/decay
+    return v * env * level
+
+def trial(rng, user_talks, echo_gain, delay_ms, noise, suppress=True, barge_ms=300):
+    secs = 6.0
+    ref = voice(rng, secs, rng.uniform(180, 230), 6000)           # what the speaker plays
+    d = int(delay_ms * RATE / 1000)
+    ir = np.zeros(int(0.03 * RATE)); ir[0] = 1.0
+    taps = rng.integers(40, len(ir), 6); ir[taps] = rng.uniform(-0.3, 0.3, 6)   # a few reflections
+    echo = np.convolve(ref, ir)[:len(ref)] * echo_gain
+    mic = rng.normal(0, noise, len(ref)); mic[d:] += echo[:len(ref) - d]
+    onset = None
+    if user_talks:
+        onset = int(rng.uniform(1.5, 3.5) * RATE)
+        u = voice(rng, secs, rng.uniform(100, 150), rng.uniform(1500, 4000))
+        mic[onset:] += u[:len(mic) - onset]
+    mic = np.clip(mic, -32767, 32767).astype(np.int16)
+    ref16 = np.clip(ref, -32767, 32767).astype(np.int16)
+
+    base = 60 * RATE                                               # the mic clock has been running a while
+    clock = [0]
+    es = EchoSuppressor(RATE, FRAME, clock=lambda: clock[0])
+    vad = VoiceActivityDetector(RATE, FRAME, min_speech_ms=barge_ms, start_ratio=4.0, min_level=250, no_speech_ms=10**9, onset_gap_ms=100)
+    for pos in range(0, len(mic) - FRAME, FRAME):
+        clock[0] = base + pos
+        es.push(ref16[pos:pos + FRAME])                            # the playback thread's write
+        frame = mic[pos:pos + FRAME]
+        if suppress:
+            frame = es.process(frame, base + pos)
+            if not es.ready: continue                              # as in SmartAssistant: not converged yet
+        if vad.process(frame) == "start":
+            fired = pos + FRAME
+            if onset is None or fired < onset: return "false", None, es
+            return "hit", (fired - onset) * 1000 / RATE, es
+    return ("miss" if user_talks else "ok"), None, es
+
+def engine_stop_latency(runs=5):
+    # interrupt -> wait_playback() returns, on the real AudioEngine with a device that blocks in real time
+    from replay import FakePyAudio
+    import assistant as app
+    from runtime import runtime
+    engine = app.AudioEngine(pa=FakePyAudio()); runtime.start()
+    pcm = (np.sin(np.arange(RATE * 5) / 8) * 3000).astype(np.int16).tobytes()
+    out = []
+    for _ in range(runs):
+        runtime.submit(engine.play_segments([pcm])).result()
+        time.sleep(0.7)
+        t0 = time.perf_counter()
+        engine.stop_playback()
+        runtime.submit(engine.wait_playback()).result()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trials", type=int, default=40)
+    ap.add_argument("--vad-ms", type=int, default=300, help="BARGE_IN_VAD_MS to evaluate")
+    ap.add_argument("--no-engine", action="store_true")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(3)
+    conds = [(rng.uniform(0.3, 1.2), rng.uniform(20, 250), rng.choice([20, 80, 200])) for _ in range(args.trials)]
+    print(f"{'':12s} {'false trig':>10s} {'early':>6s} {'missed':>7s} {'detect p50':>11s} {'p95':>7s}   "
+          f"(echo gain 0.3-1.2, delay 20-250 ms, gate {args.vad_ms} ms)")
+    for label, suppress in (("raw mic", False), ("suppressed", True)):
+        false = early = miss = 0; lat = []; erle = []
+        for i, (g, dly, noise) in enumerate(conds):
+            user = i % 2 == 1
+            res, ms, es = trial(np.random.default_rng(100 + i), user, g, dly, noise, suppress, args.vad_ms)
+            if res == "false":
+                if user: early += 1          # fired on the echo before the user started
+                else: false += 1
+            miss += res == "miss"
+            if ms is not None: lat.append(ms)
+            if suppress and es.echo_frames: erle.append(es.stats()["erle_db"])
+        n_quiet = (len(conds) + 1) // 2; n_user = len(conds) // 2
+        p50 = f"{statistics.median(lat):9.0f}ms" if lat else "        -"
+        p95 = f"{sorted(lat)[int(0.95 * (len(lat) - 1))]:5.0f}ms" if lat else "     -"
+        print(f"{label:12s} {false:4d}/{n_quiet:<5d} {early:3d}/{n_user:<2d} {miss:3d}/{n_user:<3d} {p50:>11s} {p95:>7s}"
+              + (f"   echo reduction {statistics.mean(erle):.1f} dB" if erle else ""))
+    failed = false > 0                       # the suppressed row
+
+    if not args.no_engine:
+        stop = engine_stop_latency()
+        print(f"\nstop playback: p50 {statistics.median(stop):.1f} ms   max {max(stop):.1f} ms")
+    if failed: print(f"\nFAIL: {false}/{n_quiet} quiet trials fired after echo suppression")
+    os._exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# Wake word -> beep: time from the detector firing in SmartAssistant.loop() to the first
+# block containing the beep being handed to the output device.
+#
+#   python benchmarks/beep_latency.py [--runs 20] [--device]
+#
+#   idle           nothing else playing: the mixer thread is asleep
+#   over a reply   the wake word barges in while TTS plays (the beep ducks, then replaces it)
+#   old path       the removed play_wav_once(): a thread, a new PyAudio instance and stream
+#                  per beep. With the simulated device that is only thread + open; --device
+#                  measures it on the real sound card (needs pyaudio and an output device).
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+from replay import FakePyAudio
+
+RATE = 16000
+
+class ScriptedDetector:
+    # Fires on the first frame after fire() is called, and records when
+    frame_length = 512; sample_rate = RATE
+    def __init__(self): self.armed = False; self.t = None
+    def fire(self): self.t = None; self.armed = True
+    def process(self, frame):
+        if not self.armed: return -1
+        self.armed = False; self.t = time.perf_counter()
+        return 0
+    def delete(self): pass
+
+def old_path(pa_factory, data, params):
+    # What play_wav_once used to do; returns seconds until the beep's write() is issued
+    t0 = time.perf_counter(); out = []
+    def _job():
+        p = pa_factory()
+        s = p.open(format=p.get_format_from_width(params[1]), channels=params[0], rate=params[2], output=True)
+        out.append(time.perf_counter())
+        s.write(data); s.stop_stream(); s.close()
+        if hasattr(p, "terminate"): p.terminate()
+    th = threading.Thread(target=_job, daemon=True); th.start(); th.join()
+    return out[0] - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--device", action="store_true")
+    args = ap.parse_args()
+
+    backends = FakeBackends(tts_speed=1.0).start()
+    tmp = tempfile.mkdtemp()
+    os.environ.update(GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+                      WEATHER_URL=backends.url, GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake", PICOVOICE_ACCESS_KEY="",
+                      TTS_PREWARM="0", LLM_CACHE_TTL="0", TOOL_CACHE_FILE="", TRACE_FILE="", BARGE_IN_VAD_MS="0",
+                      TTS_CACHE_DIR=os.path.join(tmp, "tts"), ALARM_FILE=os.path.join(tmp, "alarms.json"))
+    os.chdir(os.path.dirname(HERE))                                 # beep.wav
+    import wave
+    import assistant as app
+
+    pa = FakePyAudio()
+    a = app.SmartAssistant(engine=app.AudioEngine(pa=pa))
+    det = ScriptedDetector(); a.detector = det
+    threading.Thread(target=a.loop, daemon=True).start()
+    time.sleep(0.5)
+    engine = a.engine; mixer = engine.mixer
+    heard = []
+    def tap(out, inner=mixer.tap):
+        b = mixer.sources.get("beep")
+        if b is not None and b.pos > 0 and not heard: heard.append(time.perf_counter())
+        inner(out)
+    mixer.tap = tap
+
+    def one(during_reply):
+        if during_reply:
+            a.start_turn(a.mic.ring.head, trigger="other")
+            # the turn listens first; wait until its reply is actually playing
+            end = time.perf_counter() + 20
+            while not (engine.is_playing and engine.jitter.played) and time.perf_counter() < end: time.sleep(0.005)
+        heard.clear(); det.fire()
+        end = time.perf_counter() + 5
+        while not heard and time.perf_counter() < end: time.sleep(0.001)
+        ms = (heard[0] - det.t) * 1000 if heard else None
+        a.interrupt()
+        while a.turn is not None or mixer.sources: time.sleep(0.01)   # let the beep finish too
+        time.sleep(0.2)
+        return ms
+
+    results = {}
+    from vad_eval import synth_clip
+    utt = synth_clip(np.random.default_rng(1), 20, 1.5, lead_s=0.2, tail_s=0.0)[0]
+    missed = {}
+    for label, during in (("idle", False), ("over a reply", True)):
+        ms = []; missed[label] = 0
+        for _ in range(args.runs):
+            if during: pa.mic.say(utt)
+            r = one(during)
+            if r is None: missed[label] += 1
+            else: ms.append(r)
+        results[label] = ms
+
+    with wave.open("beep.wav", 'rb') as wf:
+        params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()); data = wf.readframes(wf.getnframes())
+    results["old path (sim)"] = [old_path(FakePyAudio, data, params) * 1000 for _ in range(args.runs)]
+    if args.device:
+        import pyaudio
+        results["old path (device)"] = [old_path(pyaudio.PyAudio, data, params) * 1000 for _ in range(min(args.runs, 5))]
+
+    print(f"{'wake -> beep':18s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s} {'missed':>7s}   (mixer block {app.MIXER_BLOCK} samples = {app.MIXER_BLOCK * 1000 / RATE:.0f} ms)")
+    for label, ms in results.items():
+        miss = f"{missed[label]:3d}/{args.runs:<3d}" if label in missed else ""
+        if not ms: print(f"{label:18s} {'never heard':>26s} {miss:>7s}"); continue
+        ms = sorted(ms)
+        print(f"{label:18s} {statistics.median(ms):8.2f} {ms[int(0.95 * (len(ms) - 1))]:8.2f} {ms[-1]:8.2f} {miss:>7s}")
+    backends.stop()
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
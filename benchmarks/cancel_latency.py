@@ -0,0 +1,85 @@
+# How fast an interrupt stops a turn, per stage: interrupt() lands while the STT upload,
+# the LLM stream, a TTS download or playback is in flight, and we time how long until the
+# turn has fully unwound, and check that no backend request is started after it.
+#
+#   python benchmarks/cancel_latency.py [--runs 5] [--slow 2.0]
+#
+# Runs against the local fake backends with every stage slowed to --slow seconds.
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+from vad_eval import synth_clip
+from replay import FakePyAudio
+
+RATE = 16000
+
+def wait_until(cond, timeout=30):
+    end = time.perf_counter() + timeout
+    while not cond():
+        if time.perf_counter() > end: return False
+        time.sleep(0.002)
+    return True
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--slow", type=float, default=2.0)
+    args = ap.parse_args()
+
+    backends = FakeBackends(stt_latency=args.slow, llm_first_token=0.05, llm_token_interval=args.slow / 10,
+                            tts_first_byte=args.slow, tts_speed=1.0).start()
+    tmp = tempfile.mkdtemp()
+    os.environ.update(GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+                      WEATHER_URL=backends.url, GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake",
+                      PICOVOICE_ACCESS_KEY="", TTS_PREWARM="0", LLM_CACHE_TTL="0",
+                      TTS_CACHE_DIR=os.path.join(tmp, "tts"), TTS_CACHE_MEM_MB="0", TTS_CACHE_DISK_MB="0",
+                      ALARM_FILE=os.path.join(tmp, "alarms.json"), TOOL_CACHE_FILE="", TRACE_FILE="")
+
+    import assistant as app
+    from mic_buffer import MicRingBuffer, MicCapture
+
+    pa = FakePyAudio()
+    assistant = app.SmartAssistant(engine=app.AudioEngine(pa=pa))
+    assistant.mic = MicCapture(pa.mic, MicRingBuffer(RATE, app.MIC_BUFFER_SEC), app.INPUT_CHUNK)
+    assistant.mic.start()
+    utterance = synth_clip(np.random.default_rng(1), 20, 2.0, lead_s=0.3, tail_s=0.0)[0]
+    time.sleep(1.0)
+
+    engine = assistant.engine
+    stages = {
+        "stt": lambda gen: backends.active["stt"] > 0,
+        "llm": lambda gen: backends.active["llm"] > 0 and app.state.ai_text != "",
+        "tts": lambda gen: backends.active["tts"] > 0,
+        "playback": lambda gen: engine._play_gen > gen and engine.jitter.played > 0,
+    }
+    print(f"{'stage':10s} {'p50 ms':>8s} {'max ms':>8s}   requests started after the interrupt")
+    for stage, ready in stages.items():
+        times = []; late = 0
+        for _ in range(args.runs):
+            gen = engine._play_gen
+            pa.mic.say(utterance)
+            t = threading.Thread(target=assistant.conversation, args=(assistant.mic.ring.head,)); t.start()
+            if not wait_until(lambda: assistant.turn is not None and ready(gen)): print(f"{stage}: never reached"); break
+            t0 = time.perf_counter()
+            assistant.interrupt()
+            t.join()
+            times.append((time.perf_counter() - t0) * 1000)
+            before = backends.started
+            time.sleep(args.slow)
+            late += backends.started - before
+        if times: print(f"{stage:10s} {statistics.median(times):8.2f} {max(times):8.2f}   {late}")
+    print(f"\nresponses the client hung up on: {backends.dropped}   connections {app.net.stats()}")
+    backends.stop()
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
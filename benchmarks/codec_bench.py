@@ -0,0 +1,122 @@
+# Audio on the wire per codec, over a simulated constrained link:
+#   upload     STT_CODEC wav / flac / opus: bytes sent, encode time, upload -> transcript
+#   download   TTS_CODEC linear16 / mulaw / opus: bytes received, request -> first decoded
+#              audio, whole download, and SNR of the decoded audio against the source
+#   turn       end of speech -> first audio for whole turns with each pairing
+#
+#   python benchmarks/codec_bench.py [speech.wav ...] [--uplink 128] [--downlink 256] [--runs 5]
+#
+# The WAVs (16 kHz mono int16) are both the captured question and the voice the stand-in
+# TTS "speaks"; without any, a synthetic voice is used. --uplink/--downlink are kbit/s
+# (0 = unlimited). flac/opus uploads need soundfile, opus TTS also needs opuslib; missing
+# ones show up as the wav / linear16 fallback.
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+from vad_eval import synth_clip
+from replay import FakePyAudio, load_wav, pct
+
+RATE = 16000
+UPLOADS = ("wav", "flac", "opus")
+DOWNLOADS = ("linear16", "mulaw", "opus")
+PAIRS = (("wav", "linear16"), ("flac", "mulaw"), ("flac", "opus"), ("opus", "opus"))
+
+def snr_db(ref, out):
+    n = min(len(ref), len(out))
+    if n == 0: return float("nan")
+    ref = ref[:n].astype(np.float64); err = ref - out[:n]
+    return 10 * np.log10((ref ** 2).sum() / max((err ** 2).sum(), 1e-9))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wavs", nargs="*")
+    ap.add_argument("--uplink", type=float, default=128)
+    ap.add_argument("--downlink", type=float, default=256)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    clips = [load_wav(p) for p in args.wavs] or [synth_clip(np.random.default_rng(1), 20, 2.5, lead_s=0.3, tail_s=0.0)[0]]
+    voice = np.concatenate(clips)
+    backends = FakeBackends(stt_latency=0.1, tts_speed=4.0, tts_audio=voice,
+                            uplink_kbps=args.uplink or None, downlink_kbps=args.downlink or None).start()
+    tmp = tempfile.mkdtemp()
+    os.environ.update(GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+                      WEATHER_URL=backends.url, GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake", PICOVOICE_ACCESS_KEY="",
+                      TTS_PREWARM="0", LLM_CACHE_TTL="0", TOOL_CACHE_FILE="", TRACE_FILE="", BARGE_IN="0",
+                      TTS_CACHE_DIR=os.path.join(tmp, "tts"), ALARM_FILE=os.path.join(tmp, "alarms.json"))
+    import assistant as app
+    from codec import encode_upload, upload_codec, tts_codec
+    from mic_buffer import MicRingBuffer, MicCapture
+    from tracing import tracer
+    from runtime import runtime
+
+    pa = FakePyAudio()
+    a = app.SmartAssistant(engine=app.AudioEngine(pa=pa))
+    a.mic = MicCapture(pa.mic, MicRingBuffer(RATE, app.MIC_BUFFER_SEC), app.INPUT_CHUNK)
+    a.mic.start()
+    engine = a.engine
+    link = f"uplink {args.uplink or 'unlimited'} kbit/s, downlink {args.downlink or 'unlimited'} kbit/s"
+    print(f"{link}; {len(clips)} clip(s), {sum(map(len, clips)) / RATE:.1f} s of speech\n")
+
+    # --- uploads ---
+    print(f"{'upload':8s} {'sent as':8s} {'bytes':>8s} {'vs wav':>7s} {'encode ms':>10s} {'to text p50 ms':>15s}")
+    base = None
+    for c in UPLOADS:
+        a.stt.codec = c; sizes = []; enc = []; lat = []
+        for _ in range(args.runs):
+            for pcm in clips:
+                t = time.perf_counter(); encode_upload(pcm.tobytes(), RATE, c); enc.append((time.perf_counter() - t) * 1000)
+                b0 = backends.bytes_in; t = time.perf_counter()
+                a.stt.transcribe(pcm.tobytes(), RATE)
+                lat.append((time.perf_counter() - t) * 1000); sizes.append(backends.bytes_in - b0)
+        size = statistics.mean(sizes); base = base or size
+        print(f"{c:8s} {upload_codec(c):8s} {size:8.0f} {size / base:7.2f} {statistics.median(enc):10.1f} {statistics.median(lat):15.0f}")
+
+    # --- downloads ---
+    print(f"\n{'download':8s} {'sent as':8s} {'bytes':>8s} {'vs pcm':>7s} {'first audio ms':>15s} {'whole ms':>9s} {'SNR dB':>7s}")
+    base = None; turns = []
+    tracer.listeners.append(turns.append)
+    for c in DOWNLOADS:
+        sizes = []; first = []; whole = []; snr = []
+        for i in range(args.runs):
+            engine.tts_codec = tts_codec(c, RATE)
+            text = f"Sample {c} {i}. This sentence is spoken by the stand-in voice."
+            tracer.begin_turn(trigger="bench")
+            runtime.submit(engine.play_segments([text])).result(); runtime.submit(engine.wait_playback()).result()
+            tracer.end_turn()
+            turn = turns[-1]; span = next(s for s in turn["spans"] if s["name"] == "tts")
+            sizes.append(span["wire_bytes"]); whole.append(span["dur_ms"])
+            first.append(turn["marks"]["tts_first_byte"] - span["start_ms"])
+            ref = np.resize(voice, int(max(0.3, 0.06 * len(text)) * RATE))
+            snr.append(snr_db(ref, np.frombuffer(engine.tts_cache.get(text, engine.tts_codec.name) or b"", dtype=np.int16)))
+        size = statistics.mean(sizes); base = base or size
+        print(f"{c:8s} {engine.tts_codec.name:8s} {size:8.0f} {size / base:7.2f} {statistics.median(first):15.0f} "
+              f"{statistics.median(whole):9.0f} {statistics.median(snr):7.1f}")
+
+    # --- whole turns ---
+    print(f"\n{'turn (stt + tts)':18s} {'TTFA p50 ms':>12s} {'p95 ms':>8s} {'stt ms':>8s}   (end of speech -> first audio)")
+    time.sleep(1.0)   # let the VAD see some room noise first
+    for stt_c, tts_c in PAIRS:
+        a.stt.codec = stt_c; engine.tts_codec = tts_codec(tts_c, RATE)
+        del turns[:]
+        for _ in range(args.runs):
+            for pcm in clips:
+                pa.mic.say(pcm); a.conversation(a.mic.ring.head)
+        ttfa = [t["summary"]["time_to_first_audio"] for t in turns if "time_to_first_audio" in t["summary"]]
+        stt = [t["summary"]["stt"] for t in turns if "stt" in t["summary"]]
+        label = f"{upload_codec(stt_c)} + {engine.tts_codec.name}"
+        if not ttfa: print(f"{label:18s} no audio"); continue
+        print(f"{label:18s} {pct(ttfa, 50):12.0f} {pct(ttfa, 95):8.0f} {statistics.median(stt):8.0f}")
+    backends.stop()
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# Local stand-ins for the Groq (OpenAI-style) and Deepgram HTTP APIs, with configurable latency.
+#   backends = FakeBackends(stt_latency=0.3).start()
+#   os.environ["GROQ_BASE_URL"] = os.environ["DEEPGRAM_URL"] = backends.url
+import json
+import time
+import itertools
+import threading
+import numpy as np
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from codec import mulaw_encode, encode_upload, upload_codec
+
+RATE = 16000
+
+class FakeBackends:
+    def __init__(self, stt_latency=0.3, llm_first_token=0.25, llm_token_interval=0.02,
+                 tts_first_byte=0.15, tts_speed=4.0, transcripts=None, reply=None, llm_prefill_per_1k=0.0,
+                 tts_audio=None, uplink_kbps=None, downlink_kbps=None):
+        self.stt_latency = stt_latency
+        self.llm_first_token = llm_first_token; self.llm_token_interval = llm_token_interval
+        self.llm_prefill_per_1k = llm_prefill_per_1k     # extra first-token delay per 1k prompt tokens
+        self.prompt_tokens = []
+        self.tts_first_byte = tts_first_byte; self.tts_speed = tts_speed
+        self.tts_audio = tts_audio                         # int16 PCM to "speak" (looped), else a tone
+        self.uplink_kbps = uplink_kbps; self.downlink_kbps = downlink_kbps   # simulated link, None = unlimited
+        self.encoded = {}                                  # (encoding, samples) -> body: the audio only depends on its length
+        self.transcripts = itertools.cycle(transcripts or ["What is the tallest mountain in the world?"])
+        self.reply = reply or ("Mount Everest is the tallest mountain above sea level, at about 8,849 metres. "
+                               "It sits on the border between Nepal and China. Many climbers attempt it every spring.")
+        self.turn = itertools.count(1)
+        self.requests = {"stt": 0, "llm": 0, "tts": 0}
+        self.active = {"stt": 0, "llm": 0, "tts": 0}       # requests being served right now
+        self.dropped = 0                                   # responses the client hung up on
+        self.started = 0
+        self.bytes_in = 0; self.bytes_out = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def start(self):
+        backends = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def log_message(self, *args): pass
+            def do_HEAD(self): self.send_response(200); self.send_header("Content-Length", "0"); self.end_headers()
+            def do_GET(self): backends.handle_get(self)
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with backends.lock: backends.bytes_in += len(body)
+                if backends.uplink_kbps: time.sleep(len(body) * 8 / (backends.uplink_kbps * 1000))
+                backends.handle(self, body)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self): return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server: self.server.shutdown()
+
+    # --- request handling ---
+    def handle_get(self, h):
+        body = b"+12\xc2\xb0C"   # wttr.in style
+        self._send(h, 200, body, "text/plain")
+
+    def handle(self, h, body):
+        path = h.path.split("?")[0]
+        kind = ("stt" if path.endswith("/audio/transcriptions") else "llm" if path.endswith("/chat/completions")
+                else "tts" if path.endswith("/v1/speak") else None)
+        if kind:
+            with self.lock: self.active[kind] += 1; self.started += 1
+            try:
+                if kind == "stt": self._stt(h)
+                elif kind == "llm": self._llm(h, json.loads(body or b"{}"))
+                else: self._tts(h, json.loads(body or b"{}"), h.path)
+            except (BrokenPipeError, ConnectionResetError):
+                with self.lock: self.dropped += 1
+                h.close_connection = True
+            finally:
+                with self.lock: self.active[kind] -= 1
+            return
+        if path.endswith("/search"): return self._send(h, 200, json.dumps({"organic": [{"snippet": "A search result."}]}).encode(), "application/json")
+        self._send(h, 404, b"{}", "application/json")
+
+    def _count(self, kind, out=0):
+        with self.lock: self.requests[kind] += 1; self.bytes_out += out
+
+    def _send(self, h, code, body, ctype):
+        h.send_response(code); h.send_header("Content-Type", ctype)
+        h.send_header("Content-Length", str(len(body))); h.end_headers(); h.wfile.write(body)
+
+    def _chunk(self, h, data):
+        h.wfile.write(b"%x\r\n%s\r\n" % (len(data), data)); h.wfile.flush()
+
+    def _stt(self, h):
+        time.sleep(self.stt_latency)
+        body = json.dumps({"text": next(self.transcripts)}).encode()
+        self._count("stt", len(body)); self._send(h, 200, body, "application/json")
+
+    def _llm(self, h, req):
+        prompt = sum(len(m.get("content") or "") for m in req.get("messages", [])) // 4
+        with self.lock: self.prompt_tokens.append(prompt)
+        time.sleep(self.llm_first_token + self.llm_prefill_per_1k * prompt / 1000)
+        text = f"Turn {next(self.turn)}. {self.reply}"   # first sentence differs per turn, so the TTS cache can't hide the server
+        tokens = [w + " " for w in text.split(" ")]
+        if not req.get("stream"):
+            body = json.dumps({"id": "fake", "object": "chat.completion", "created": 0, "model": req.get("model", "fake"),
+                               "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}]}).encode()
+            self._count("llm", len(body)); return self._send(h, 200, body, "application/json")
+        h.send_response(200); h.send_header("Content-Type", "text/event-stream")
+        h.send_header("Transfer-Encoding", "chunked"); h.end_headers()
+        for i, tok in enumerate(tokens):
+            chunk = {"id": "fake", "object": "chat.completion.chunk", "created": 0, "model": req.get("model", "fake"),
+                     "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]}
+            self._chunk(h, f"data: {json.dumps(chunk)}\n\n".encode())
+            if i < len(tokens) - 1: time.sleep(self.llm_token_interval)
+        self._chunk(h, b"data: [DONE]\n\n"); self._chunk(h, b"")
+        self._count("llm")
+
+    def _tts(self, h, req, full_path):
+        t0 = time.perf_counter()
+        secs = max(0.3, 0.06 * len(req.get("text", "")))
+        n = int(secs * RATE)
+        if self.tts_audio is not None: pcm = np.resize(self.tts_audio, n).tobytes()
+        else:
+            t = np.arange(n) / RATE
+            pcm = (np.sin(2 * np.pi * 220 * t) * 3000 * (np.sin(2 * np.pi * 3 * t) > 0)).astype(np.int16).tobytes()
+        # Deepgram-style encodings; opus (Ogg) only if this machine can encode it
+        enc = parse_qs(urlsplit(full_path).query).get("encoding", ["linear16"])[0]
+        if enc == "mulaw": body, ctype = mulaw_encode(pcm), "audio/basic"
+        elif enc == "opus" and upload_codec("opus") == "opus":
+            body = self.encoded.get((enc, n))
+            if body is None: body = self.encoded[enc, n] = encode_upload(pcm, RATE, "opus")[1]
+            ctype = "audio/ogg"
+        elif enc == "linear16": body, ctype = pcm, "audio/l16"
+        else: return self._send(h, 400, json.dumps({"err_msg": f"unsupported encoding {enc}"}).encode(), "application/json")
+        time.sleep(max(0.0, self.tts_first_byte - (time.perf_counter() - t0)))   # a real service encodes as it streams
+        h.send_response(200); h.send_header("Content-Type", ctype)
+        h.send_header("Transfer-Encoding", "chunked"); h.end_headers()
+        # Same number of chunks whatever the encoding, each sent once the audio it holds is
+        # "rendered" (tts_speed x real time) and the link has carried it
+        chunks = max(1, -(-len(pcm) // 4096)); step = -(-len(body) // chunks)
+        per_chunk = len(pcm) / 2 / RATE / self.tts_speed / chunks
+        for i in range(0, len(body), step):
+            data = body[i:i + step]
+            link = len(data) * 8 / (self.downlink_kbps * 1000) if self.downlink_kbps else 0
+            time.sleep(link)                               # on the wire
+            self._chunk(h, data); time.sleep(max(0.0, per_chunk - link))
+        self._chunk(h, b"")
+        self._count("tts", len(body))
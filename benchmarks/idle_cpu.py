@@ -0,0 +1,95 @@
+# Cost of the always-on path: what SmartAssistant.loop() spends while nobody is talking.
+#
+#   python benchmarks/idle_cpu.py [--seconds 20] [--engines energy,template]
+#
+# 1. Frame handoff to a native detector, per frame: the old struct.unpack tuple, a
+#    list, and the pointer PorcupineDetector passes (plus the ctypes array pvporcupine
+#    builds from a sequence).
+# 2. The real wake-word loop on a simulated real-time mic, per detector engine, with the
+#    capture thread alone as the baseline. Porcupine joins if PICOVOICE_ACCESS_KEY is set.
+# CPU is process CPU time (user + sys) for the wall-clock window.
+import os
+import sys
+import time
+import ctypes
+import struct
+import argparse
+import tempfile
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from replay import FakePyAudio
+
+RATE = 16000
+FRAME = 512
+FPS = RATE / FRAME
+
+def handoff(reps=20000):
+    pcm = np.random.default_rng(0).normal(0, 300, FRAME).astype(np.int16)
+    raw = pcm.tobytes(); fmt = "h" * FRAME
+    short_p = ctypes.POINTER(ctypes.c_short); arr_t = ctypes.c_short * FRAME
+    cases = {
+        "struct.unpack tuple + ctypes array": lambda: arr_t(*struct.unpack_from(fmt, raw)),
+        "ndarray.tolist + ctypes array": lambda: arr_t(*pcm.tolist()),
+        "pointer to the frame (zero-copy)": lambda: pcm.ctypes.data_as(short_p),
+    }
+    print(f"{'frame handoff':38s} {'us/frame':>9s} {'CPU s/hour':>11s}")
+    for name, fn in cases.items():
+        t0 = time.process_time()
+        for _ in range(reps): fn()
+        us = (time.process_time() - t0) / reps * 1e6
+        print(f"{name:38s} {us:9.2f} {us * FPS * 3600 / 1e6:11.1f}")
+
+def cpu_window(seconds, counter):
+    c0 = counter(); t0 = time.perf_counter(); p0 = time.process_time()
+    time.sleep(seconds)
+    return time.process_time() - p0, time.perf_counter() - t0, counter() - c0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--engines", default="energy,template")
+    args = ap.parse_args()
+
+    handoff()
+
+    tmp = tempfile.mkdtemp()
+    template = os.path.join(tmp, "wake.wav")
+    os.environ.update(GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake", TTS_PREWARM="0", TOOL_CACHE_FILE="", TRACE_FILE="",
+                      TTS_CACHE_DIR=os.path.join(tmp, "tts"), ALARM_FILE=os.path.join(tmp, "alarms.json"),
+                      WAKE_WORD_TEMPLATE=template)
+    import wave
+    import assistant as app
+    from mic_buffer import MicRingBuffer, MicCapture
+    from barge_in_eval import voice
+    with wave.open(template, 'wb') as wf:
+        wf.setnchannels(1); wf.setsampwidth(2); wf.setframerate(RATE)
+        wf.writeframes(voice(np.random.default_rng(1), 0.8, 150, 4000).astype(np.int16).tobytes())
+
+    engines = args.engines.split(",") + (["porcupine"] if os.getenv("PICOVOICE_ACCESS_KEY") else [])
+    print(f"\n{'idle loop':12s} {'frames/s':>9s} {'CPU %':>7s} {'CPU s/hour':>11s}   (over {args.seconds:.0f} s, mic in real time)")
+    baseline = None
+    for engine in ["capture only"] + engines:
+        pa = FakePyAudio()
+        if engine == "capture only":
+            mic = MicCapture(pa.mic, MicRingBuffer(RATE, app.MIC_BUFFER_SEC), FRAME); mic.start()
+            time.sleep(1.0)
+            cpu, wall, frames = cpu_window(args.seconds, lambda: mic.ring.head // FRAME)
+            mic.stop()
+        else:
+            app.WAKE_WORD_ENGINE = engine; app.state.stop_signal = False
+            a = app.SmartAssistant(engine=app.AudioEngine(pa=pa))      # starts loop() with that detector
+            if a.detector is None: continue
+            time.sleep(1.0)
+            cpu, wall, frames = cpu_window(args.seconds, lambda: a.frames_heard)
+            app.state.stop_signal = True; a.mic.stop(); time.sleep(1.2)
+            if a.wake_errors: print(f"  {engine}: {a.wake_errors} loop errors")
+        pct = cpu / wall * 100
+        extra = "" if baseline is None else f"   loop alone {(pct - baseline) * 36:7.1f} CPU s/hour"
+        if baseline is None: baseline = pct
+        print(f"{engine:12s} {frames / wall:9.1f} {pct:7.2f} {pct * 36:11.1f}{extra}")
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
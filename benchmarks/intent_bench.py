@@ -0,0 +1,51 @@
+# Routing accuracy and avoided LLM calls: IntentRouter vs the old substring chain.
+#   python benchmarks/intent_bench.py [corpus.jsonl]
+# Corpus lines: {"text": ..., "intent": "<intent name>" | "llm"}
+import os
+import sys
+import json
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+from intents import IntentRouter
+
+def legacy_route(text):
+    l = text.lower()
+    if "snooze" in l: return "snooze"
+    if "alarm" in l and any(w in l for w in ("cancel", "delete", "remove", "clear", "turn off")): return "alarm_cancel"
+    if "alarm" in l or "wake me" in l: return "alarm_set"
+    if "time" in l: return "time"
+    if "search" in l: return "search"
+    if "play" in l: return "play"
+    return "llm"
+
+def evaluate(name, fn, corpus):
+    ok = 0; local_ok = 0; wrong_local = 0; missed = 0
+    t0 = time.perf_counter()
+    got = [fn(c["text"]) for c in corpus]
+    per = (time.perf_counter() - t0) / len(corpus)
+    for c, g in zip(corpus, got):
+        want = c["intent"]
+        if g == want: ok += 1; local_ok += want != "llm"
+        elif g != "llm": wrong_local += 1        # answered locally, but wrongly: the worst case
+        else: missed += 1                        # fell through to the LLM: slower but harmless
+    print(f"{name:8s} accuracy {ok / len(corpus):6.1%}   LLM calls avoided {local_ok:3d}/{len(corpus)}"
+          f"   wrong local answers {wrong_local:2d}   missed tools {missed:2d}   {per * 1e6:6.1f} us/utterance")
+    return got
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, "intents_corpus.jsonl")
+    with open(path) as f: corpus = [json.loads(l) for l in f if l.strip()]
+    router = IntentRouter()
+    def new_route(text):
+        i = router.route(text)
+        return i.name if i else "llm"
+    print(f"{len(corpus)} utterances, {sum(c['intent'] != 'llm' for c in corpus)} answerable locally")
+    evaluate("legacy", legacy_route, corpus)
+    got = evaluate("router", new_route, corpus)
+    for c, g in zip(corpus, got):
+        if g != c["intent"]: print(f"  router: {c['text']!r} -> {g} (want {c['intent']})")
+
+if __name__ == '__main__':
+    main()
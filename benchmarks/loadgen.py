@@ -0,0 +1,170 @@
+# Load generator for server mode: N simulated clients each stream a real-time mic over TCP,
+# press push-to-talk, say a question and wait for the spoken reply, over and over. For each
+# N it reports completed turns/s and per-turn latency measured at the client, from the last
+# sample of the question being sent to the first byte of reply audio arriving.
+#
+#   python benchmarks/loadgen.py [--clients 1,2,4,8,16] [--duration 30] [--llm-limit 4]
+#
+# The server is a separate process (`main.py --serve`) talking to local fake backends, so
+# its CPU (reported per step, from /proc) is its own. --stt/llm/tts-limit set the
+# *_CONCURRENCY caps; "peak" is the most requests each fake backend had in flight at once.
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+from vad_eval import synth_clip
+from replay import pct
+
+RATE = 16000
+CHUNK = 512
+REPLY = "It is about 8,849 metres tall."
+
+def send_frame(sock, kind, payload=b""):
+    sock.sendall(kind + len(payload).to_bytes(4, "big") + payload)
+
+def recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk: return None
+        buf += chunk
+    return bytes(buf)
+
+
+class Client:
+    def __init__(self, port, seed, stop):
+        self.sock = socket.create_connection(("127.0.0.1", port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rng = np.random.default_rng(seed); self.stop = stop
+        self.utt = synth_clip(np.random.default_rng(seed), 20, 1.5, lead_s=0.0, tail_s=0.0)[0]
+        self.lock = threading.Lock()
+        self.spoken_at = None; self.first_audio = None; self.active = False; self.seen_active = False
+        self.latencies = []; self.turns = 0; self.failed = 0; self.rejected = False
+
+    def start(self):
+        threading.Thread(target=self._recv, daemon=True).start()
+        threading.Thread(target=self._talk, daemon=True).start()
+        return self
+
+    def _recv(self):
+        while True:
+            try:
+                head = recv_exact(self.sock, 5)
+                payload = recv_exact(self.sock, int.from_bytes(head[1:], "big")) if head else None
+            except OSError: return
+            if payload is None: return
+            kind = head[:1]; now = time.perf_counter()
+            with self.lock:
+                if kind == b"T" and self.spoken_at is not None and self.first_audio is None: self.first_audio = now
+                elif kind == b"S":
+                    st = json.loads(payload)
+                    if "error" in st: self.rejected = True; continue
+                    self.active = st["active"]
+                    if self.active: self.seen_active = True
+
+    def _talk(self):
+        # Mic clock: one CHUNK every 32 ms, noise unless a question is queued
+        t = time.perf_counter(); queued = np.zeros(0, dtype=np.int16); turn_t0 = None
+        idle_until = t + self.rng.uniform(0.5, 2.0)
+        try:
+            while not self.stop.is_set() and not self.rejected:
+                now = time.perf_counter()
+                with self.lock:
+                    done = self.seen_active and not self.active
+                if turn_t0 is None and now >= idle_until:
+                    with self.lock: self.spoken_at = None; self.first_audio = None; self.seen_active = False
+                    send_frame(self.sock, b"W"); queued = self.utt; turn_t0 = now
+                elif turn_t0 is not None and (done or now - turn_t0 > 30):
+                    with self.lock:
+                        if done and self.first_audio is not None:
+                            self.latencies.append(self.first_audio - self.spoken_at); self.turns += 1
+                        else: self.failed += 1
+                    turn_t0 = None; idle_until = now + self.rng.uniform(0.5, 1.5)
+                out = self.rng.normal(0, 20, CHUNK).astype(np.int16)
+                k = min(CHUNK, len(queued))
+                if k:
+                    out[:k] = queued[:k]; queued = queued[k:]
+                    if not len(queued):
+                        with self.lock: self.spoken_at = time.perf_counter()
+                send_frame(self.sock, b"A", out.tobytes())
+                t += CHUNK / RATE
+                delay = t - time.perf_counter()
+                if delay > 0: time.sleep(delay)
+        except OSError: pass
+
+    def close(self):
+        try: self.sock.shutdown(socket.SHUT_RDWR); self.sock.close()
+        except OSError: pass
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f: fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", default="1,2,4,8,16")
+    ap.add_argument("--duration", type=float, default=30)
+    ap.add_argument("--stt-limit", type=int, default=0)
+    ap.add_argument("--llm-limit", type=int, default=0)
+    ap.add_argument("--tts-limit", type=int, default=0)
+    ap.add_argument("--pool", type=int, help="NET_POOL_SIZE for the server (default 3 per client)")
+    ap.add_argument("--trace", help="server-side turn traces (all sessions) to this JSONL file")
+    args = ap.parse_args()
+    steps = [int(n) for n in args.clients.split(",")]
+
+    backends = FakeBackends(reply=REPLY).start()
+    tmp = tempfile.mkdtemp()
+    env = dict(os.environ, GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+               WEATHER_URL=backends.url, GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake", LLM_CACHE_TTL="0",
+               TOOL_CACHE_FILE="", TRACE_FILE=os.path.abspath(args.trace) if args.trace else "", TTS_CACHE_DIR=os.path.join(tmp, "tts"), SERVER_PORT="0",
+               SERVER_MAX_SESSIONS=str(max(steps)), NET_POOL_SIZE=str(args.pool or 3 * max(steps)), STT_CONCURRENCY=str(args.stt_limit),
+               LLM_CONCURRENCY=str(args.llm_limit), TTS_CONCURRENCY=str(args.tts_limit))
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py"), "--serve"], cwd=tmp, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    port = None
+    for line in server.stdout:
+        if line.startswith("Serving voice sessions"): port = int(line.rsplit(":", 1)[1]); break
+    if port is None: sys.exit("server did not start")
+    threading.Thread(target=lambda: [None for _ in server.stdout], daemon=True).start()   # keep its pipe drained
+
+    print(f"limits: stt {args.stt_limit or '-'}  llm {args.llm_limit or '-'}  tts {args.tts_limit or '-'}  "
+          f"pool {env['NET_POOL_SIZE']}   "
+          f"{args.duration:.0f} s per step, first byte of reply audio after end of question")
+    print(f"{'clients':>7s} {'turns':>6s} {'turns/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s} {'failed':>6s} "
+          f"{'server CPU':>10s}   peak in flight stt/llm/tts")
+    for n in steps:
+        stop = threading.Event()
+        clients = [Client(port, 100 * n + i, stop).start() for i in range(n)]
+        peak = dict.fromkeys(backends.active, 0)
+        cpu0 = cpu_seconds(server.pid); t0 = time.perf_counter()
+        while time.perf_counter() - t0 < args.duration:
+            with backends.lock:
+                for k, v in backends.active.items(): peak[k] = max(peak[k], v)
+            time.sleep(0.02)
+        stop.set()
+        elapsed = time.perf_counter() - t0; cpu = (cpu_seconds(server.pid) - cpu0) / elapsed
+        lat = [x * 1000 for c in clients for x in c.latencies]
+        turns = sum(c.turns for c in clients); failed = sum(c.failed for c in clients)
+        if any(c.rejected for c in clients): print(f"{n:7d} rejected: server full"); continue
+        row = f"{pct(lat, 50):8.0f} {pct(lat, 95):8.0f} {max(lat):8.0f}" if lat else f"{'-':>8s} {'-':>8s} {'-':>8s}"
+        print(f"{n:7d} {turns:6d} {turns / elapsed:8.2f} {row} {failed:6d} {cpu * 100:9.0f}%   "
+              f"{peak['stt']}/{peak['llm']}/{peak['tts']}")
+        for c in clients: c.close()
+        time.sleep(1.0)    # let the sessions close
+    server.terminate(); server.wait(5)
+    backends.stop()
+
+if __name__ == '__main__':
+    main()
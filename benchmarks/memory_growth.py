@@ -0,0 +1,69 @@
+# Prompt size and LLM first-token latency over a long session: full history vs ConversationMemory.
+#
+#   python benchmarks/memory_growth.py [--turns 60] [--budget 1200] [--prefill 0.25]
+#
+# Talks to the local fake Groq server, whose first-token delay grows with prompt size
+# (--prefill seconds per 1k prompt tokens), like a real model's prefill does.
+import os
+import sys
+import time
+import argparse
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from groq import Groq
+from fakes import FakeBackends
+from memory import ConversationMemory, llm_summarizer
+
+SYSTEM = "You are a helpful assistant. Keep answers concise."
+QUESTIONS = ["What is the tallest mountain in the world?", "How long does it take to climb it?",
+             "Who was the first to reach the top?", "And what about the second highest one?",
+             "Which of them is more dangerous?", "Remind me what we said about the first climbers."]
+
+def first_token(client, msgs):
+    t0 = time.perf_counter(); ttft = None; text = ""
+    for part in client.chat.completions.create(model="fake", messages=msgs, max_tokens=200, stream=True):
+        tok = part.choices[0].delta.content if part.choices else None
+        if tok and ttft is None: ttft = time.perf_counter() - t0
+        text += tok or ""
+    return ttft * 1000, text
+
+def run(mode, args):
+    backends = FakeBackends(llm_first_token=0.05, llm_token_interval=0.0, llm_prefill_per_1k=args.prefill).start()
+    client = Groq(api_key="fake", base_url=backends.url)
+    memory = ConversationMemory(llm_summarizer(client, "fake"), budget=args.budget) if mode == "memory" else None
+    history = []; rows = []
+    for i in range(args.turns):
+        q = QUESTIONS[i % len(QUESTIONS)]
+        if memory: msgs = memory.messages(SYSTEM, q)
+        else: msgs = [{"role": "system", "content": SYSTEM}] + history + [{"role": "user", "content": q}]
+        ttft, reply = first_token(client, msgs)
+        rows.append((backends.prompt_tokens[-1], ttft))
+        if memory: memory.add_turn(q, reply)
+        else: history += [{"role": "user", "content": q}, {"role": "assistant", "content": reply}]
+        time.sleep(0.02)   # the user listens; background summaries get a moment
+    stats = memory.stats() if memory else {}
+    backends.stop()
+    return rows, stats
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=60)
+    ap.add_argument("--budget", type=int, default=1200)
+    ap.add_argument("--prefill", type=float, default=0.25)
+    args = ap.parse_args()
+
+    results = {mode: run(mode, args) for mode in ("full", "memory")}
+    marks = sorted(set([1, 5] + list(range(10, args.turns + 1, 10)) + [args.turns]))
+    print(f"{'turn':>5s} {'full tok':>9s} {'full ms':>8s} {'mem tok':>9s} {'mem ms':>8s}")
+    for t in marks:
+        (ft, fm), (mt, mm) = results["full"][0][t - 1], results["memory"][0][t - 1]
+        print(f"{t:5d} {ft:9d} {fm:8.1f} {mt:9d} {mm:8.1f}")
+    for mode, (rows, stats) in results.items():
+        last = rows[len(rows) // 2:]
+        print(f"{mode:7s} second half: prompt {statistics.mean(r[0] for r in last):7.0f} tok   "
+              f"first token {statistics.mean(r[1] for r in last):6.1f} ms   {stats}")
+
+if __name__ == '__main__':
+    main()
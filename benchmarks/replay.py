@@ -0,0 +1,121 @@
+# Offline replay: recorded utterances through the real SmartAssistant pipeline against local
+# fake Groq/Deepgram servers, with per-stage latency percentiles from the turn tracer.
+#
+#   python benchmarks/replay.py [a.wav b.wav ...] [--runs 5] [--stt 0.3] [--llm-first 0.25]
+#                               [--tts-first 0.15] [--tts-speed 4] [--trace out.jsonl]
+#
+# WAVs must be 16 kHz mono int16 (a synthetic utterance is used when none are given).
+# The mic and speaker are simulated in real time; nothing touches the network.
+import os
+import sys
+import time
+import wave
+import argparse
+import tempfile
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+from vad_eval import synth_clip
+
+RATE = 16000
+STAGES = ["capture", "stt", "tool", "llm_first_token", "llm", "tts_first_byte", "tts", "time_to_first_audio", "playback"]
+
+class FakeInput:
+    # Real-time paced mic: queued utterances, low noise in between
+    def __init__(self):
+        self.pending = np.zeros(0, dtype=np.int16); self.t = None
+        self.rng = np.random.default_rng(0)
+
+    def say(self, pcm): self.pending = np.concatenate([self.pending, pcm])
+
+    def read(self, n, exception_on_overflow=False):
+        if self.t is None: self.t = time.perf_counter()
+        self.t += n / RATE
+        delay = self.t - time.perf_counter()
+        if delay > 0: time.sleep(delay)
+        out = self.rng.normal(0, 20, n).astype(np.int16)
+        k = min(n, len(self.pending))
+        if k: out[:k] = self.pending[:k]; self.pending = self.pending[k:]
+        return out.tobytes()
+
+    def stop_stream(self): pass
+    def close(self): pass
+
+class FakeOutput:
+    # Blocks like a device that plays in real time
+    def write(self, data): time.sleep(len(memoryview(data).cast('B')) / 2 / RATE)
+    def stop_stream(self): pass
+    def close(self): pass
+
+class FakePyAudio:
+    def __init__(self): self.mic = FakeInput()
+    def open(self, **kw): return self.mic if kw.get("input") else FakeOutput()
+    def get_format_from_width(self, w): return w
+    def terminate(self): pass
+
+def load_wav(path):
+    with wave.open(path, 'rb') as wf:
+        if wf.getframerate() != RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            sys.exit(f"{path}: must be 16 kHz mono int16")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+def pct(values, p):
+    v = sorted(values)
+    return v[min(len(v) - 1, max(0, int(round(p / 100 * len(v) + 0.5)) - 1))]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wavs", nargs="*")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--stt", type=float, default=0.3)
+    ap.add_argument("--llm-first", type=float, default=0.25)
+    ap.add_argument("--tts-first", type=float, default=0.15)
+    ap.add_argument("--tts-speed", type=float, default=4.0)
+    ap.add_argument("--trace")
+    ap.add_argument("--llm-cache", action="store_true", help="let repeated turns be answered from the LLM cache")
+    args = ap.parse_args()
+
+    backends = FakeBackends(stt_latency=args.stt, llm_first_token=args.llm_first,
+                            tts_first_byte=args.tts_first, tts_speed=args.tts_speed).start()
+    tmp = tempfile.mkdtemp()
+    os.environ.update(GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+                      WEATHER_URL=backends.url, GROQ_API_KEY="fake",
+                      DEEPGRAM_API_KEY="fake", PICOVOICE_ACCESS_KEY="", TTS_PREWARM="0",
+                      TTS_CACHE_DIR=os.path.join(tmp, "tts"), ALARM_FILE=os.path.join(tmp, "alarms.json"),
+                      TOOL_CACHE_FILE=os.path.join(tmp, "tools.json"), LLM_CACHE_TTL="21600" if args.llm_cache else "0",
+                      TRACE_FILE=args.trace or "")
+
+    import assistant as app
+    from mic_buffer import MicRingBuffer, MicCapture
+    from tracing import tracer
+
+    pa = FakePyAudio()
+    assistant = app.SmartAssistant(engine=app.AudioEngine(pa=pa))
+    assistant.mic = MicCapture(pa.mic, MicRingBuffer(RATE, app.MIC_BUFFER_SEC), app.INPUT_CHUNK)
+    assistant.mic.start()
+    turns = []; tracer.listeners.append(turns.append)
+
+    if args.wavs: utterances = [load_wav(p) for p in args.wavs]
+    else: utterances = [synth_clip(np.random.default_rng(1), 20, 2.0, lead_s=0.3, tail_s=0.0)[0]]
+
+    time.sleep(1.0)  # let the VAD see some room noise first
+    for i in range(args.runs):
+        for pcm in utterances:
+            pa.mic.say(pcm)
+            assistant.conversation(assistant.mic.ring.head)
+            print(f"turn {len(turns)}: {turns[-1]['summary']}" if turns else "turn: no trace")
+
+    print(f"\n{len(turns)} turns   backend requests {backends.requests}")
+    print(f"connections {app.net.stats()}")
+    print(f"tool cache {app.tool_cache.stats()}")
+    print(f"{'stage':22s} {'p50':>8s} {'p95':>8s} {'p99':>8s}   (ms)")
+    for stage in STAGES:
+        vals = [t["summary"][stage] for t in turns if stage in t["summary"]]
+        if vals: print(f"{stage:22s} {pct(vals, 50):8.1f} {pct(vals, 95):8.1f} {pct(vals, 99):8.1f}")
+    backends.stop()
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
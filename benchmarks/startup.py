@@ -0,0 +1,84 @@
+# Cold start and memory: headless vs UI. Each run is a fresh interpreter that builds the
+# assistant the way that mode does (headless.run(), or importing the Kivy UI first) and is
+# timed from spawn until "Listening..."; RSS is read from /proc at that moment.
+#
+#   python benchmarks/startup.py [--runs 3]
+#
+# Audio devices are simulated and the backends are local fakes; the wake-word engine is
+# the energy detector, so no access keys are needed. UI mode needs Kivy installed; without
+# a display it uses SDL's offscreen driver.
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT); sys.path.insert(0, HERE)
+
+def child(mode):
+    from replay import FakePyAudio
+    if mode == "ui":
+        import ui                                  # Kivy, the window, config; what `python main.py` pays
+        print(f"kivy from {os.path.dirname(sys.modules['kivy'].__file__)}", flush=True)
+    import assistant
+    engine = assistant.AudioEngine(pa=FakePyAudio())
+    if mode == "headless":
+        import headless
+        headless.run(stdout=False, engine=engine)
+    else:
+        assistant.SmartAssistant(engine=engine)    # VoiceApp.on_start
+        time.sleep(3600)
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"): return int(line.split()[1])
+    except OSError: return None
+
+def measure(mode, env):
+    t0 = time.perf_counter()
+    p = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", mode], cwd=ROOT, env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    note = ""; out = None
+    for line in p.stdout:
+        if line.startswith("kivy from"): note = line.strip()
+        if "Listening..." in line: out = ((time.perf_counter() - t0) * 1000, rss_kb(p.pid)); break
+        if "Error" in line: note = line.strip()
+    p.kill(); p.wait()
+    return out, note
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--child")
+    args = ap.parse_args()
+    if args.child: return child(args.child)
+
+    from fakes import FakeBackends
+    backends = FakeBackends().start()
+    tmp = tempfile.mkdtemp()
+    env = dict(os.environ, GROQ_BASE_URL=backends.url, DEEPGRAM_URL=backends.url, SERPER_URL=backends.url,
+               WEATHER_URL=backends.url, GROQ_API_KEY="fake", DEEPGRAM_API_KEY="fake", WAKE_WORD_ENGINE="energy",
+               TTS_PREWARM="0", TOOL_CACHE_FILE="", TRACE_FILE="", TTS_CACHE_DIR=os.path.join(tmp, "tts"),
+               ALARM_FILE=os.path.join(tmp, "alarms.json"), KIVY_NO_ARGS="1")    # else Kivy parses the child's --child
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"): env.setdefault("SDL_VIDEODRIVER", "offscreen")
+    print(f"{'mode':10s} {'to Listening p50 ms':>20s} {'max ms':>8s} {'RSS MB':>8s}")
+    for mode in ("headless", "ui"):
+        times = []; rss = []; note = ""
+        for _ in range(args.runs):
+            res, note = measure(mode, env)
+            if res is None: break
+            times.append(res[0])
+            if res[1]: rss.append(res[1] / 1024)
+        if not times: print(f"{mode:10s} did not start: {note}"); continue
+        print(f"{mode:10s} {statistics.median(times):20.0f} {max(times):8.0f} {statistics.median(rss) if rss else float('nan'):8.1f}"
+              + (f"   ({note})" if note else ""))
+    backends.stop()
+
+if __name__ == '__main__':
+    main()
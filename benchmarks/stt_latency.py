@@ -0,0 +1,82 @@
+# End-of-speech -> text latency for the three capture paths:
+#   disk         temp.wav write + read back, one upload (the old path)
+#   memory       in-memory WAV, one upload
+#   incremental  windows uploaded while the user is still talking
+#
+#   python benchmarks/stt_latency.py [utterance.wav] [--rtt 0.35] [--per-sec 0.08] [--runs 5]
+#
+# The backend is a local stand-in: a fixed round-trip plus a cost per second of audio.
+import os
+import sys
+import time
+import wave
+import argparse
+import tempfile
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stt import IncrementalTranscriber
+from codec import encode_wav
+
+RATE = 16000
+CHUNK = 512
+
+class FakeWhisper:
+    def __init__(self, rtt, per_sec):
+        self.rtt = rtt; self.per_sec = per_sec
+
+    def transcribe(self, pcm, rate):
+        secs = len(pcm) / 2 / rate
+        time.sleep(self.rtt + secs * self.per_sec)
+        return f"[{secs:.1f}s]"
+
+def synth_utterance(seconds=5.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    syllables = np.sin(2 * np.pi * 4 * t) > -0.2            # ~4 syllables/s with short gaps
+    voice = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t)
+    return (voice * syllables * 6000).astype(np.int16).tobytes()
+
+def load_wav(path):
+    with wave.open(path, 'rb') as wf:
+        if wf.getframerate() != RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            sys.exit("utterance must be 16 kHz mono int16")
+        return wf.readframes(wf.getnframes())
+
+def run(pcm, backend, mode):
+    inc = IncrementalTranscriber(backend, RATE) if mode == "incremental" else None
+    step = CHUNK * 2; t0 = time.perf_counter()
+    for i in range(0, len(pcm), step):
+        if inc: inc.feed(pcm[i:i + step])
+        delay = t0 + (i + step) / 2 / RATE - time.perf_counter()   # pace like a live mic
+        if delay > 0: time.sleep(delay)
+
+    end_of_speech = time.perf_counter()
+    if inc: inc.finish()
+    elif mode == "disk":
+        path = os.path.join(tempfile.gettempdir(), "temp.wav")
+        with open(path, "wb") as f: f.write(encode_wav(pcm, RATE))
+        with open(path, "rb") as f: data = f.read()
+        backend.transcribe(data[44:], RATE)
+    else:
+        encode_wav(pcm, RATE)
+        backend.transcribe(pcm, RATE)
+    return time.perf_counter() - end_of_speech
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wav", nargs="?")
+    ap.add_argument("--rtt", type=float, default=0.35)
+    ap.add_argument("--per-sec", type=float, default=0.08)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    pcm = load_wav(args.wav) if args.wav else synth_utterance()
+    backend = FakeWhisper(args.rtt, args.per_sec)
+    print(f"utterance {len(pcm) / 2 / RATE:.1f}s, rtt {args.rtt}s, {args.per_sec}s per audio second")
+    for mode in ("disk", "memory", "incremental"):
+        lat = [run(pcm, backend, mode) for _ in range(args.runs)]
+        print(f"{mode:12s} median {statistics.median(lat) * 1000:7.1f} ms   max {max(lat) * 1000:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
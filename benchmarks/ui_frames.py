@@ -0,0 +1,101 @@
+# What the UI draws: frames actually rendered, label textures rendered (each uploaded to
+# the GPU) and process CPU, per minute, while idle and during scripted turns.
+#
+#   python benchmarks/ui_frames.py [--idle 30] [--turns 3] [--between 5]
+#
+# The real AssistantInterface runs in a Kivy window (SDL's offscreen driver when there is
+# no display) with no assistant behind it: a thread writes `state` the way a turn does,
+# question, then the reply streaming in a token at a time, then the time it takes to speak.
+# Frames and textures are counted here, not by the UI, so any version of ui.py can be timed.
+import os
+import sys
+import time
+import argparse
+import threading
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from fakes import FakeBackends
+
+QUESTION = "What is the tallest mountain in the world?"
+REPLY = ("Mount Everest is the tallest mountain above sea level, at about 8,849 metres. It sits on the border "
+         "between Nepal and China, and hundreds of climbers attempt it every spring.")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--idle", type=float, default=30, help="seconds of idle screen before the turns")
+    ap.add_argument("--turns", type=int, default=3)
+    ap.add_argument("--between", type=float, default=5, help="idle seconds after each turn")
+    ap.add_argument("--tokens-per-s", type=float, default=50, help="LLM streaming speed")
+    ap.add_argument("--speak-cps", type=float, default=15, help="characters per second the reply takes to speak")
+    args = ap.parse_args()
+
+    backends = FakeBackends().start()
+    tmp = tempfile.mkdtemp()
+    os.environ.update(WEATHER_URL=backends.url, TOOL_CACHE_FILE="", TRACE_FILE="", TTS_CACHE_DIR=os.path.join(tmp, "tts"),
+                      ALARM_FILE=os.path.join(tmp, "alarms.json"), KIVY_NO_ARGS="1", KIVY_LOG_MODE="PYTHON")
+    if not os.getenv("DISPLAY") and not os.getenv("WAYLAND_DISPLAY"): os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    import logging
+    logging.getLogger("kivy").setLevel(logging.WARNING)
+    from kivy.app import App
+    from kivy.uix.label import Label
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+    import ui
+    from assistant import state
+
+    count = {"frames": 0, "textures": 0}
+    def texture(_, t):
+        if t is not None: count["textures"] += 1
+    phases = []      # (mode, seconds, frames, textures, cpu seconds)
+
+    def measure(mode, fn):
+        c0 = dict(count); t0 = time.perf_counter(); p0 = time.process_time()
+        fn()
+        phases.append((mode, time.perf_counter() - t0, count["frames"] - c0["frames"],
+                       count["textures"] - c0["textures"], time.process_time() - p0))
+
+    def turn():
+        state.active = True; state.status = "Listening"; state.user_text = ""; state.ai_text = ""
+        time.sleep(1.5)
+        state.status = "Thinking..."; state.user_text = QUESTION
+        time.sleep(0.4)
+        state.status = "Speaking"
+        for tok in REPLY.split(" "):
+            state.ai_text += ("" if not state.ai_text else " ") + tok; time.sleep(1 / args.tokens_per_s)
+        time.sleep(len(REPLY) / args.speak_cps)
+        state.active = False
+
+    def script(app):
+        time.sleep(2.0)                      # first layout, fonts, weather
+        measure("idle", lambda: time.sleep(args.idle))
+        for _ in range(args.turns):
+            measure("active", turn)
+            measure("idle", lambda: time.sleep(args.between))
+        Clock.schedule_once(lambda dt: app.stop())
+
+    class Bench(App):
+        def build(self): return ui.AssistantInterface()
+        def on_start(self):
+            Window.bind(on_flip=lambda *_: count.__setitem__("frames", count["frames"] + 1))
+            for w in self.root.walk():
+                if isinstance(w, Label): w.bind(texture=texture)
+            threading.Thread(target=script, args=(self,), daemon=True).start()
+
+    Bench().run()
+    backends.stop()
+
+    print(f"UI_FPS={os.getenv('UI_FPS', '-')} UI_IDLE_FPS={os.getenv('UI_IDLE_FPS', '-')}   {args.turns} turns, "
+          f"reply streamed at {args.tokens_per_s:.0f} tokens/s")
+    print(f"{'':8s} {'seconds':>8s} {'frames/min':>11s} {'textures/min':>13s} {'CPU %':>7s}")
+    for mode in ("idle", "active"):
+        rows = [p for p in phases if p[0] == mode]
+        secs = sum(p[1] for p in rows)
+        if not secs: continue
+        frames, textures, cpu = (sum(p[i] for p in rows) for i in (2, 3, 4))
+        print(f"{mode:8s} {secs:8.1f} {frames * 60 / secs:11.0f} {textures * 60 / secs:13.1f} {cpu / secs * 100:7.1f}")
+    os._exit(0)
+
+if __name__ == '__main__':
+    main()
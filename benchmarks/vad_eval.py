@@ -0,0 +1,112 @@
+# Offline endpointing evaluation: adaptive VAD vs the old fixed thresholds.
+#
+#   python benchmarks/vad_eval.py                 # synthetic labelled set (quiet / noisy rooms)
+#   python benchmarks/vad_eval.py clips/          # clips/*.wav + clips/labels.json
+#
+# labels.json: {"turn1.wav": {"start": 0.42, "end": 2.95}, ...}  (seconds of speech in the clip)
+# Clips must be 16 kHz mono int16. The detector is run frame by frame as in conversation().
+#   endpoint error  = detected end of speech - labelled end  (negative = speech clipped)
+#   added latency   = time the endpoint fired - labelled end (what the user waits)
+import os
+import sys
+import json
+import wave
+import argparse
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vad import VoiceActivityDetector
+
+RATE = 16000
+FRAME = 512
+
+class LegacyEndpointer:
+    # The original rule from conversation(): amp > 500 starts, 30 chunks under 300 stop, 6 s cap
+    def __init__(self):
+        self.frames = 0; self.silence = 0; self.speaking = False
+        self.last_voiced = None; self.max_frames = int(RATE / FRAME * 6)
+
+    def process(self, frame):
+        self.frames += 1
+        amp = np.mean(np.abs(frame.astype(np.int32)))
+        if amp > 500: self.speaking = True; self.silence = 0; self.last_voiced = self.frames
+        if self.speaking:
+            if amp < 300: self.silence += 1
+            else: self.last_voiced = self.frames
+        if self.silence > 30 or self.frames >= self.max_frames: return "end"
+        return None
+
+def synth_clip(rng, noise, speech_s=2.5, lead_s=0.5, tail_s=3.0, pause=True):
+    n = int((lead_s + speech_s + tail_s) * RATE)
+    t = np.arange(n) / RATE
+    sig = rng.normal(0, noise, n)
+    a, b = int(lead_s * RATE), int((lead_s + speech_s) * RATE)
+    ts = t[a:b] - lead_s
+    f0 = 140 + 25 * np.sin(2 * np.pi * 0.7 * ts)
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    env = np.clip(np.sin(2 * np.pi * 3.5 * ts) + 0.6, 0, 1)          # syllables
+    if pause: env[(ts > speech_s * 0.45) & (ts < speech_s * 0.45 + 0.25)] = 0   # a breath mid-sentence
+    env[-int(0.15 * RATE):] *= np.linspace(1, 0, int(0.15 * RATE))    # trailing decay
+    sig[a:b] += voice * env * 2500
+    idle = np.clip(rng.normal(0, noise, 3 * RATE), -32767, 32767).astype(np.int16)
+    return np.clip(sig, -32767, 32767).astype(np.int16), (lead_s, lead_s + speech_s), idle
+
+def synthetic_set():
+    rng = np.random.default_rng(7)
+    out = []
+    for name, noise in (("quiet", 20), ("office", 120), ("noisy", 350), ("loud_fan", 500)):
+        for i, speech_s in enumerate((1.2, 2.5, 4.0)):
+            sig, lab, idle = synth_clip(rng, noise, speech_s)
+            out.append((f"{name}_{i}", sig, lab, idle))
+    return out
+
+def load_dir(path):
+    with open(os.path.join(path, "labels.json")) as f: labels = json.load(f)
+    out = []
+    for name, lab in sorted(labels.items()):
+        with wave.open(os.path.join(path, name), 'rb') as wf:
+            if wf.getframerate() != RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                sys.exit(f"{name}: must be 16 kHz mono int16")
+            sig = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        idle = sig[:max(0, int((lab["start"] - 0.1) * RATE))]   # audio before speech stands in for idle time
+        out.append((name, sig, (lab["start"], lab["end"]), idle))
+    return out
+
+def run(det, sig, idle):
+    if hasattr(det, "observe"):
+        for i in range(0, len(idle) - FRAME + 1, FRAME): det.observe(idle[i:i + FRAME])
+    fired = None
+    for i in range(len(sig) // FRAME):
+        if det.process(sig[i * FRAME:(i + 1) * FRAME]) == "end": fired = i + 1; break
+    if fired is None: fired = len(sig) // FRAME
+    voiced = det.last_voiced or 0
+    return voiced * FRAME / RATE, fired * FRAME / RATE
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("dir", nargs="?")
+    ap.add_argument("--trailing-ms", type=int, default=700)
+    args = ap.parse_args()
+    clips = load_dir(args.dir) if args.dir else synthetic_set()
+
+    rows = {"adaptive": [], "legacy": []}
+    print(f"{'clip':14s} {'detector':9s} {'end err ms':>10s} {'added ms':>9s}")
+    for name, sig, (_, end), idle in clips:
+        for label, det in (("adaptive", VoiceActivityDetector(RATE, FRAME, trailing_silence_ms=args.trailing_ms)),
+                           ("legacy", LegacyEndpointer())):
+            voiced_end, fired = run(det, sig, idle)   # idle = what the wake loop saw before the turn
+            err, added = (voiced_end - end) * 1000, (fired - end) * 1000
+            rows[label].append((err, added))
+            print(f"{name:14s} {label:9s} {err:10.0f} {added:9.0f}")
+
+    print()
+    for label, r in rows.items():
+        errs = [abs(e) for e, _ in r]; added = [a for _, a in r]
+        clipped = sum(1 for _, a in r if a < 0)
+        print(f"{label:9s} mean |end err| {statistics.mean(errs):6.0f} ms   median added {statistics.median(added):6.0f} ms"
+              f"   p90 added {sorted(added)[int(0.9 * (len(added) - 1))]:6.0f} ms   clipped {clipped}/{len(r)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import io
+import wave
+import numpy as np
+
+try: import soundfile
+except (ImportError, OSError): soundfile = None
+try: import opuslib
+except Exception: opuslib = None      # also raised when the libopus shared library is missing
+
+# ---------------------------------------------------------
+# AUDIO CODECS
+# ---------------------------------------------------------
+# Uploads (STT): encode_upload(pcm, rate, codec) -> (filename, bytes). "flac" (lossless,
+# ~half of WAV for speech) and "opus" (Ogg/Opus, ~1/10) need soundfile; without it, or if
+# encoding fails, the capture goes up as WAV.
+# Downloads (TTS): tts_codec(name, rate) -> TTSCodec, whose `query` asks Deepgram for that
+# encoding and whose decoder() turns each HTTP chunk into int16 PCM as it arrives:
+#   linear16  raw PCM, passed through
+#   mulaw     8-bit G.711, half the bytes; decoded with a 256-entry table, no dependency
+#   opus      Ogg/Opus, ~1/20 the bytes; Ogg pages are parsed as they complete and each
+#             packet is decoded by opuslib (needs libopus). Unavailable -> linear16.
+
+def encode_wav(pcm, rate, channels=1):
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wf:
+        wf.setnchannels(channels); wf.setsampwidth(2); wf.setframerate(rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+UPLOAD_FORMATS = {"flac": ("speech.flac", "FLAC", "PCM_16"), "opus": ("speech.ogg", "OGG", "OPUS")}
+
+def encode_upload(pcm, rate, codec="wav"):
+    fmt = UPLOAD_FORMATS.get(codec)
+    if fmt is not None and soundfile is not None:
+        name, container, subtype = fmt
+        try:
+            buf = io.BytesIO()
+            soundfile.write(buf, np.frombuffer(pcm, dtype=np.int16), rate, format=container, subtype=subtype)
+            return name, buf.getvalue()
+        except Exception as e: print(f"{codec} encode failed, sending WAV: {e}")
+    return "speech.wav", encode_wav(pcm, rate)
+
+def upload_codec(codec):
+    # What encode_upload will actually produce for `codec` here
+    return codec if codec in UPLOAD_FORMATS and soundfile is not None else "wav"
+
+
+# --- G.711 mu-law ---
+def _mulaw_table():
+    u = ~np.arange(256, dtype=np.uint8)
+    exp = ((u >> 4) & 7).astype(np.int32); mant = (u & 0x0F).astype(np.int32)
+    mag = (((mant << 3) + 0x84) << exp) - 0x84
+    return np.where(u & 0x80, -mag, mag).astype(np.int16)
+
+MULAW = _mulaw_table()
+
+def mulaw_encode(pcm):
+    # As CCITT g711.c (and audioop.lin2ulaw): 14-bit magnitude, biased, segment + 4-bit mantissa
+    x = np.frombuffer(pcm, dtype=np.int16).astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(x), 8159) + 33
+    seg = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), mag)
+    u = np.where(seg > 7, 0x7F, (seg << 4) | ((mag >> (seg + 1)) & 0x0F))
+    return (u ^ mask).astype(np.uint8).tobytes()
+
+
+class PCMDecoder:
+    def feed(self, data): return data
+
+class MulawDecoder:
+    def feed(self, data): return MULAW[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+class OggPackets:
+    # Incremental Ogg demuxer: feed() bytes, get back the packets completed so far. A page's
+    # lacing table comes first, so packets are handed out as their bytes land, not per page
+    # (an encoder may put a second of audio in one page).
+    def __init__(self):
+        self.buf = bytearray(); self.packet = bytearray()
+        self.lacing = None; self.seg = 0                    # current page, next segment
+
+    def feed(self, data):
+        buf = self.buf; buf += data; out = []
+        while True:
+            if self.lacing is None:
+                if len(buf) < 27: break
+                if buf[:4] != b"OggS":
+                    i = buf.find(b"OggS", 1)
+                    del buf[:i if i > 0 else len(buf) - 3]; continue
+                body = 27 + buf[26]
+                if len(buf) < body: break
+                self.lacing = bytes(buf[27:body]); self.seg = 0
+                del buf[:body]
+            lacing = self.lacing; pos = 0
+            while self.seg < len(lacing) and len(buf) - pos >= lacing[self.seg]:
+                n = lacing[self.seg]; self.seg += 1
+                self.packet += buf[pos:pos + n]; pos += n
+                if n < 255: out.append(bytes(self.packet)); self.packet.clear()
+            del buf[:pos]
+            if self.seg < len(lacing): break
+            self.lacing = None
+        return out
+
+
+class OpusDecoder:
+    def __init__(self, rate):
+        self.rate = rate; self.ogg = OggPackets()
+        self.dec = None; self.channels = 1; self.skip = 0
+        self.max_frame = rate * 120 // 1000                 # longest Opus packet
+
+    def feed(self, data):
+        out = []
+        for pkt in self.ogg.feed(data):
+            if self.dec is None:
+                if pkt[:8] != b"OpusHead": continue
+                self.channels = pkt[9]
+                self.skip = int.from_bytes(pkt[10:12], "little") * self.rate // 48000   # encoder delay to drop
+                self.dec = opuslib.Decoder(self.rate, self.channels)
+                continue
+            if pkt[:8] == b"OpusTags": continue
+            pcm = np.frombuffer(self.dec.decode(pkt, self.max_frame), dtype=np.int16)
+            if self.channels > 1: pcm = pcm.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+            if self.skip:
+                k = min(self.skip, len(pcm)); pcm = pcm[k:]; self.skip -= k
+            if len(pcm): out.append(pcm.tobytes())
+        return b"".join(out)
+
+
+class TTSCodec:
+    def __init__(self, name, query, decoder):
+        self.name = name; self.query = query; self.decoder = decoder
+
+def tts_codec(name, rate):
+    if name == "mulaw": return TTSCodec("mulaw", f"encoding=mulaw&sample_rate={rate}&container=none", MulawDecoder)
+    if name == "opus":
+        if opuslib is not None: return TTSCodec("opus", "encoding=opus&container=ogg", lambda: OpusDecoder(rate))
+        print("TTS codec opus needs opuslib (and libopus); using linear16")
+    elif name != "linear16": print(f"Unknown TTS codec {name!r}; using linear16")
+    # container=none: raw PCM, so back-to-back segments don't each start with a WAV header click
+    return TTSCodec("linear16", f"encoding=linear16&sample_rate={rate}&container=none", PCMDecoder)
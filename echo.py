@@ -0,0 +1,151 @@
+import numpy as np
+
+# ---------------------------------------------------------
+# ECHO SUPPRESSION (for barge-in)
+# ---------------------------------------------------------
+# The playback thread push()es every block it hands to the speaker, stamped with the mic
+# ring's sample clock at that moment, so the reference lives on the same timeline as the
+# mic. The bulk speaker->mic delay (device buffers + air) is estimated by GCC-PHAT
+# cross-correlation of a recent mic window against the reference; the room's short
+# impulse response after that delay is learned by a frequency-domain adaptive filter
+# (one frame of taps, overlap-save).
+# Echo the filter misses is attenuated by a residual-suppression gain: `leak` (how much
+# echo usually survives) is learned on echo-only frames, and only a residual clearly above
+# that expectation - a voice on top of the echo - passes through.
+# Until `ready` the output may still contain raw echo and callers should not act on it: the
+# delay hasn't locked and the filter converged yet (or, with no audible echo at all, a second
+# of playback hasn't shown that). Delay and filter carry over to later replies.
+
+class EchoSuppressor:
+    def __init__(self, rate, frame=512, max_delay_ms=400, history_s=4.0, est_window_ms=500,
+                 est_every_ms=250, min_corr=0.3, residual_floor=0.1, mu=0.5, lead=32, clock=None):
+        self.rate = rate; self.frame = frame
+        self.max_delay = int(rate * max_delay_ms / 1000)
+        self.size = int(rate * history_s)
+        self.ref = np.zeros(self.size, dtype=np.float32)
+        self.mic = np.zeros(self.size, dtype=np.float32)
+        self.end = None                            # mic-clock position just after the last reference sample
+        self.start = None                          # ... and of the first sample of the current run
+        self.mic_end = 0
+        self.win = int(rate * est_window_ms / 1000); self.est_every = int(rate * est_every_ms / 1000)
+        self.next_est = 0
+        self.min_corr = min_corr; self.residual_floor = residual_floor
+        self.delay = int(rate * 0.05); self.locked = False
+        self.leak = 0.3                            # residual / echo energy on echo-only frames
+        self.mu = mu; self.lead = lead             # filter taps start `lead` samples before the direct path
+        self.W = np.zeros(frame + 1, dtype=np.complex128)
+        self.P = None; self.erle = 1.0; self.misses = 0; self.adapted = 0
+        self._u = np.empty(2 * frame, dtype=np.float32); self._e2 = np.zeros(2 * frame)
+        self.clock = clock or (lambda: 0)
+        self.frames = 0; self.echo_frames = 0; self.erle_sum = 0.0
+        self._x = np.empty(frame, dtype=np.float32); self._out = np.empty(frame, dtype=np.int16)
+
+    # --- reference (playback thread) ---
+    def push(self, pcm):
+        s = np.asarray(pcm)
+        pos = self.clock()
+        if self.end is not None and pos < self.end: pos = self.end      # device still busy: contiguous
+        if self.end is not None and pos > self.end:                     # gap (underrun): silence
+            self._write(self.ref, self.end, np.zeros(min(pos - self.end, self.size), dtype=np.float32))
+        if self.end is None or pos - self.end > self.size: self.start = pos
+        self._write(self.ref, pos, s)
+        self.end = pos + len(s)
+
+    def _write(self, ring, pos, s):
+        n = len(s)
+        if n > self.size: s = s[-self.size:]; pos += n - self.size; n = self.size
+        i = pos % self.size; first = min(n, self.size - i)
+        ring[i:i + first] = s[:first]; ring[:n - first] = s[first:]
+
+    def _read(self, ring, pos, n, out=None):
+        out = np.empty(n, dtype=np.float32) if out is None else out[:n]
+        i = pos % self.size; first = min(n, self.size - i)
+        out[:first] = ring[i:i + first]; out[first:] = ring[:n - first]
+        return out
+
+    def active(self, pos):
+        # Is any reference audio audible in the mic frame starting at `pos`?
+        return self.end is not None and pos < self.end + self.max_delay and pos + self.frame > self.end - self.size
+
+    # --- mic side (wake-word thread) ---
+    def process(self, frame, pos):
+        # frame: int16 mic samples starting at absolute position `pos`. Returns the residual.
+        n = len(frame); x = self._x[:n]
+        np.copyto(x, frame, casting='unsafe')
+        self._write(self.mic, pos, x); self.mic_end = pos + n
+        self.frames += 1
+        if not self.active(pos): return frame
+
+        if pos + n >= self.next_est:
+            self.next_est = pos + n + self.est_every
+            self._estimate_delay()
+
+        L = self.frame
+        if n != L: return frame
+        # Reference block feeding the filter: L past samples + the n aligned with this frame
+        d0 = pos - self.delay + self.lead - L
+        u = self._read(self.ref, d0, L + n, self._u)
+        if d0 + L + n > self.end: u[max(0, self.end - d0):] = 0
+        U = np.fft.rfft(u)
+        pu = U.real ** 2 + U.imag ** 2
+        if float(pu.sum()) < (L + n) ** 2 * 25.0: return frame        # reference near silent here
+        y = np.fft.irfft(U * self.W, 2 * L)[L:]
+        e = x - y
+        e_mic = float(np.dot(x, x)); e_res = float(np.dot(e, e)); e_echo = float(np.dot(y, y)) + 1.0
+        self.erle = self.erle * 0.9 + 0.1 * (e_mic + 1.0) / (e_res + 1.0)
+
+        # NLMS update every frame. Freezing it on suspected double-talk did worse: a filter that
+        # hasn't seen every frequency yet misfits new syllables, which then look like talk.
+        ratio = e_res / e_echo
+        self.P = pu if self.P is None else self.P * 0.9 + pu * 0.1
+        self._e2[L:] = e
+        E = np.fft.rfft(self._e2)
+        g = np.fft.irfft(np.conj(U) * E / (self.P + 1e-2 * float(self.P.mean()) + 1.0), 2 * L)
+        g[L:] = 0                                  # keep the filter causal and one frame long
+        self.W += self.mu * np.fft.rfft(g); self.adapted += 1
+        if ratio < 2 * self.leak:                  # looks echo-only: learn the leak (fast down, slow up)
+            self.leak += (ratio - self.leak) * (0.3 if ratio < self.leak else 0.05)
+            self.leak = min(max(self.leak, 1e-3), 1.0)
+        expected = max(4.0 * self.leak, 0.1) * e_echo   # over-subtract: the leak varies frame to frame
+        res = e * max(self.residual_floor, 1.0 - expected / (e_res + 1.0))
+        self.echo_frames += 1
+        self.erle_sum += 10 * np.log10((e_mic + 1.0) / (float(np.dot(res, res)) + 1.0))
+        np.clip(res, -32767, 32767, out=res)
+        out = self._out[:n]; np.copyto(out, res, casting='unsafe')
+        return out
+
+    def _estimate_delay(self):
+        # Cross-correlate the last `win` mic samples (less early in a reply) against the
+        # reference over [0, max_delay]
+        end = self.mic_end
+        w = min(self.win, end - self.start - self.frame)
+        if w < self.win // 2 or end - w - self.max_delay < 0: return
+        m = self._read(self.mic, end - w, w)
+        r = self._read(self.ref, end - w - self.max_delay, w + self.max_delay)
+        if self.end is not None and end > self.end: r[max(0, len(r) - (end - self.end)):] = 0
+        er = float(np.dot(r, r)); em = float(np.dot(m, m))
+        if er < 1e3 * len(r) or em < 1.0: return
+        # GCC-PHAT: whitening keeps voiced speech's pitch period from producing look-alike peaks
+        nfft = 1 << int(np.ceil(np.log2(len(r) + w)))
+        X = np.fft.rfft(r, nfft) * np.conj(np.fft.rfft(m, nfft))
+        c = np.fft.irfft(X / (np.abs(X) + 1e-9), nfft)[:self.max_delay + 1]
+        lag = int(np.argmax(c))                    # r[lag:lag+w] lines up with m
+        def corr(l):
+            seg = r[l:l + w]
+            return float(np.dot(seg, m)) / (np.sqrt(float(np.dot(seg, seg)) * em) + 1e-9)
+        best = corr(lag)
+        if best < self.min_corr: self.misses += 1; return
+        self.misses = 0
+        # Only move a locked estimate when the new lag clearly explains the mic better
+        if self.locked and best < corr(self.max_delay - self.delay) + 0.05: return
+        if self.max_delay - lag != self.delay: self.W[:] = 0; self.erle = 1.0; self.adapted = 0   # new path: relearn
+        self.delay = self.max_delay - lag; self.locked = True
+
+    @property
+    def ready(self):
+        return (self.locked and self.erle > 4.0 and self.adapted >= 20) or (not self.locked and self.misses >= 4)
+
+    def stats(self):
+        return {"delay_ms": round(self.delay * 1000 / self.rate, 1), "locked": self.locked, "erle_now_db": round(10 * np.log10(self.erle), 1),
+                "echo_frames": self.echo_frames, "leak_db": round(10 * np.log10(self.leak), 1),
+                "erle_db": round(self.erle_sum / self.echo_frames, 1) if self.echo_frames else 0.0}
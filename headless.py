@@ -0,0 +1,89 @@
+import json
+import time
+import signal
+import socket
+import threading
+
+from assistant import SmartAssistant, state
+
+# ---------------------------------------------------------
+# HEADLESS STATUS
+# ---------------------------------------------------------
+# Without a window the assistant's state goes out as JSON lines: one per change, on stdout
+# and/or to every client of a local TCP socket (which first gets the current state). Log
+# output shares stdout, so consumers should only parse lines starting with "{".
+# Lines are pushed by state changes, not polled; a burst (the reply streaming in token by
+# token) is coalesced to at most one line per `interval`.
+
+STATUS_FIELDS = ("status", "active", "user_text", "ai_text", "is_alarm_ringing", "next_alarm_label")
+
+class StatusReporter:
+    def __init__(self, state, stdout=True, port=None, host="127.0.0.1", interval=0.1):
+        self.state = state; self.stdout = stdout; self.interval = interval
+        self.clients = []; self.lock = threading.Lock()
+        self.last = None; self.running = False; self.changed = threading.Event()
+        self.server = None
+        if port:
+            self.server = socket.create_server((host, port))
+            self.port = self.server.getsockname()[1]
+
+    def snapshot(self):
+        return {k: getattr(self.state, k) for k in STATUS_FIELDS}
+
+    def start(self):
+        self.running = True
+        self.state.subscribe(self._on_change, STATUS_FIELDS); self.changed.set()
+        threading.Thread(target=self._run, daemon=True, name="status").start()
+        if self.server: threading.Thread(target=self._accept, daemon=True, name="status-server").start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.state.unsubscribe(self._on_change); self.changed.set()
+        if self.server: self.server.close()
+
+    def _on_change(self, name, value): self.changed.set()
+
+    def _line(self, snap):
+        return (json.dumps(dict(snap, t=round(time.time(), 3))) + "\n").encode()
+
+    def _accept(self):
+        while self.running:
+            try: conn, _ = self.server.accept()
+            except OSError: return
+            try: conn.sendall(self._line(self.snapshot()))
+            except OSError: conn.close(); continue
+            with self.lock: self.clients.append(conn)
+
+    def _run(self):
+        while True:
+            self.changed.wait()
+            if not self.running: return
+            self.changed.clear()
+            snap = self.snapshot()
+            if snap != self.last:
+                self.last = snap; self.publish(self._line(snap))
+            time.sleep(self.interval)
+
+    def publish(self, line):
+        if self.stdout: print(line.decode(), end="", flush=True)
+        with self.lock: clients = list(self.clients)
+        for c in clients:
+            try: c.sendall(line)
+            except OSError:
+                c.close()
+                with self.lock: self.clients.remove(c)
+
+
+def run(port=None, stdout=True, engine=None):
+    # Blocks until SIGINT/SIGTERM
+    done = threading.Event()
+    def _stop(*_): state.stop_signal = True; done.set()
+    signal.signal(signal.SIGINT, _stop); signal.signal(signal.SIGTERM, _stop)
+    reporter = StatusReporter(state, stdout, port)
+    if reporter.server: print(f"Status on 127.0.0.1:{reporter.port}", flush=True)
+    reporter.start()
+    assistant = SmartAssistant(engine=engine)
+    done.wait()
+    reporter.stop()
+    return assistant
@@ -0,0 +1,101 @@
+import re
+
+# ---------------------------------------------------------
+# LOCAL INTENT ROUTER
+# ---------------------------------------------------------
+# Each intent has a table of precompiled cue patterns with weights (negative weights veto
+# look-alikes such as "what time is it in Tokyo"). route() scores every intent, fills slots
+# from the named groups of the cues that matched, and only returns an intent when it is
+# confident; anything else goes to the LLM.
+
+TIME_SLOT = r'(?P<time>\d{1,2}(?::\d{2})?(?:\s*[ap]\.?m\b\.?)?)'     # 6 | 6:30 | 6:30pm | 6:30 p.m.
+
+INTENTS = {
+    "snooze": [
+        (r'\bsnooze\b', 3.0),
+    ],
+    "alarm_cancel": [
+        (r'\b(?:cancel|delete|remove|clear|turn off|disable)\b.*\balarms?\b', 3.0),
+        (r'\balarms?\b.*\b(?:off|cancel(?:led)?)\b', 2.0),
+        (r'\b(?:at|for) ' + TIME_SLOT, 0.2),                    # "the alarm at 7"
+        (r'\b' + TIME_SLOT + r"(?: o'clock)? alarm\b", 0.2),    # "my 6:30 p.m. alarm", not "all 3 alarms"
+    ],
+    "alarm_set": [
+        (r'\b(?:set|create|add|make|schedule)\b.*\balarm\b', 2.0),
+        (r'\bwake me(?: up)?\b', 2.0),
+        (r'\balarm (?:for|at|in)\b', 1.5),
+        (r'\b(?:at|for) ' + TIME_SLOT, 0.5),
+        (r'\bin (?P<rel>\d+ (?:minute|hour))s?\b', 0.5),
+        (r'\b(?P<repeat>every ?day|daily)\b', 0.2),
+        (r'\b(?:cancel|delete|remove|clear|turn off|disable|snooze)\b', -3.0),
+    ],
+    "time": [
+        (r'\bwhat(?:\'s| is)? the (?:current )?time\b', 2.5),
+        (r'\bwhat time is it\b', 2.5),
+        (r'\b(?:tell me|give me|do you have) the time\b', 2.5),
+        (r'\bcurrent time\b', 2.0),
+        (r'^time\??$', 2.0),
+        (r'\btime (?:is it )?(?:in|at) (?!the moment)\w+', -3.0),       # another city's clock
+        (r'\b(?:alarm|timer)\b', -2.0),
+    ],
+    "weather": [
+        (r'\b(?:weather|temperature|forecast)\b', 2.0),
+        (r'\bhow (?:hot|cold|warm) is it\b', 2.0),
+        (r'\b(?:weather|temperature|forecast) (?:in|for|at) (?!here\b)\w+', -3.0),  # only the configured city is known
+        (r'\b(?:tomorrow|next week|weekend|yesterday)\b', -3.0),                # only the current reading is known
+        (r'^(?:why|how come|what causes|how does|how do)\b', -3.0),             # questions about weather, not for it
+    ],
+    "search": [
+        (r'^(?:please )?(?:search|google|look up)(?: the web| online| google)?(?: for)? (?P<query>.+)', 3.0),
+        (r'\bsearch (?:the web |online |google )?for (?P<query>.+)', 2.5),
+        (r'\blook up (?P<query>.+)', 2.0),
+    ],
+    "play": [
+        (r"^(?:(?:hey|ok|okay) )?(?:(?:can|could|would|will) you |i want to |i'd like to |i wanna )?(?:please )?"
+         r'(?:play|put on) (?P<title>.+?)(?: for me)?(?: please)?(?: on youtube)?$', 2.5),
+        (r'\bplay (?P<title>.+?) on youtube\b', 3.0),
+        (r'\bplay (?:a game|games|with me|chess|cards|tag|along|dead|it cool|fair)\b', -4.0),
+        (r'\bplay (?:the )?(?:guitar|piano|drums|violin|football|soccer|basketball|tennis|golf|poker)\b(?! music| songs?)', -4.0),   # playing, not listening
+    ],
+}
+
+class Intent:
+    def __init__(self, name, score, slots):
+        self.name = name; self.score = score; self.slots = slots
+
+    def __repr__(self): return f"Intent({self.name}, {self.score:.1f}, {self.slots})"
+
+
+class IntentRouter:
+    def __init__(self, table=INTENTS, threshold=2.0, margin=1.0):
+        self.threshold = threshold; self.margin = margin
+        self.table = [(name, [(re.compile(p), w) for p, w in cues]) for name, cues in table.items()]
+        self.clean = re.compile(r"[^\w\s:'.]")
+        self.final_dot = re.compile(r"(?<![ap]\.m)\.+$")    # a sentence's, not the one in "6 p.m."
+
+    def normalize(self, text):
+        text = self.clean.sub(" ", text.lower())
+        return self.final_dot.sub("", " ".join(text.replace("’", "'").split()))
+
+    def score(self, text):
+        # All candidates with their scores and slots, best first
+        t = self.normalize(text)
+        out = []
+        for name, cues in self.table:
+            score = 0.0; slots = {}
+            for rx, w in cues:
+                m = rx.search(t)
+                if not m: continue
+                score += w
+                for k, v in m.groupdict().items():
+                    if v and k not in slots: slots[k] = v.strip()
+            if score > 0: out.append(Intent(name, score, slots))
+        out.sort(key=lambda i: -i.score)
+        return out
+
+    def route(self, text):
+        # The confident intent, or None when the LLM should answer
+        cands = self.score(text)
+        if not cands or cands[0].score < self.threshold: return None
+        if len(cands) > 1 and cands[0].score - cands[1].score < self.margin: return None
+        return cands[0]
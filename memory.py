@@ -0,0 +1,100 @@
+import time
+import threading
+
+# ---------------------------------------------------------
+# CONVERSATION MEMORY
+# ---------------------------------------------------------
+# Recent turns are kept verbatim within `budget` tokens. When they overflow, the oldest
+# turns are folded into a rolling summary by `summarize(summary, turns)` on a background
+# thread; until that lands they stay in the prompt verbatim, so nothing is lost and the
+# turn that triggered it never waits. After `idle_reset` seconds without a turn the
+# conversation starts over. Token counts are estimates (~4 chars per token).
+
+SUMMARY_PROMPT = ("Update the running summary of a voice conversation. Keep names, numbers, decisions "
+                  "and open questions; drop small talk. Reply with the summary only, at most {words} words.")
+
+def estimate_tokens(text): return len(text) // 4 + 4
+
+def llm_summarizer(client, model, max_tokens=160):
+    # summarize() backed by a chat completion (Groq SDK style client)
+    def summarize(summary, turns):
+        convo = "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+        msgs = [{"role": "system", "content": SUMMARY_PROMPT.format(words=int(max_tokens * 0.7))},
+                {"role": "user", "content": f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{convo}"}]
+        rsp = client.chat.completions.create(model=model, messages=msgs, max_tokens=max_tokens, temperature=0.2)
+        return rsp.choices[0].message.content.strip()
+    return summarize
+
+
+class ConversationMemory:
+    def __init__(self, summarize=None, budget=1200, keep_turns=2, idle_reset=300, clock=time.time):
+        self.summarize = summarize; self.budget = budget; self.keep_turns = keep_turns
+        self.idle_reset = idle_reset; self.clock = clock
+        self.lock = threading.Lock()
+        self.compactions = 0; self.failures = 0; self.resets = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.summary = ""
+            self.turns = []             # [(user, assistant, tokens)] kept verbatim
+            self.folding = []           # handed to the summarizer, still sent verbatim until it returns
+            self.epoch = getattr(self, "epoch", 0) + 1
+            self.last = None
+
+    # --- hot path ---
+    def messages(self, system, user_txt):
+        # Prompt for the next LLM call: system (+ summary), earlier turns, the new user line
+        if self.last is not None and self.clock() - self.last > self.idle_reset:
+            self.reset(); self.resets += 1
+        with self.lock:
+            sys_txt = f"{system}\n\nEarlier in this conversation: {self.summary}" if self.summary else system
+            msgs = [{"role": "system", "content": sys_txt}]
+            history = self.folding + self.turns
+            # Hard cap while a summary is pending: never send more than twice the budget
+            used = sum(t for _, _, t in history)
+            while history and used > 2 * self.budget: used -= history[0][2]; history = history[1:]
+            for u, a, _ in history:
+                msgs.append({"role": "user", "content": u}); msgs.append({"role": "assistant", "content": a})
+        msgs.append({"role": "user", "content": user_txt})
+        return msgs
+
+    def add_turn(self, user_txt, reply):
+        if not user_txt.strip() or not reply.strip(): return
+        with self.lock:
+            self.turns.append((user_txt, reply, estimate_tokens(user_txt) + estimate_tokens(reply)))
+            self.last = self.clock()
+            job = self._take_overflow()
+        if job: threading.Thread(target=self._compact, args=job, daemon=True).start()
+
+    # --- compaction ---
+    def _take_overflow(self):
+        # Oldest turns beyond the budget (always keeping `keep_turns`), unless a fold is already running
+        if self.folding: return None
+        used = sum(t for _, _, t in self.turns)
+        n = 0
+        while used > self.budget and len(self.turns) - n > self.keep_turns:
+            used -= self.turns[n][2]; n += 1
+        if not n: return None
+        self.folding, self.turns = self.turns[:n], self.turns[n:]
+        if not self.summarize:
+            self.folding = []; return None     # no summarizer: plain sliding window
+        return self.epoch, self.summary, [(u, a) for u, a, _ in self.folding]
+
+    def _compact(self, epoch, summary, turns):
+        try: new = self.summarize(summary, turns)
+        except Exception as e: print(f"Memory summary failed: {e}"); new = None
+        with self.lock:
+            if epoch != self.epoch: return       # conversation was reset meanwhile
+            if new: self.summary = new; self.compactions += 1
+            else: self.failures += 1             # keep the old summary, drop the turns
+            self.folding = []
+            job = self._take_overflow()
+        if job: self._compact(*job)
+
+    def stats(self):
+        with self.lock:
+            return {"turns": len(self.turns), "folding": len(self.folding),
+                    "history_tokens": sum(t for _, _, t in self.folding + self.turns),
+                    "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+                    "compactions": self.compactions, "failures": self.failures, "resets": self.resets}
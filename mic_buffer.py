@@ -0,0 +1,101 @@
+import time
+import threading
+import numpy as np
+
+# ---------------------------------------------------------
+# MICROPHONE RING BUFFER
+# ---------------------------------------------------------
+# One capture thread writes into a fixed int16 ring; the wake-word loop and the utterance
+# recorder read from it through their own cursors. Positions are absolute sample counts,
+# so "the last 300 ms before now" is just `head - 4800`.
+
+class MicRingBuffer:
+    def __init__(self, rate, seconds=10.0):
+        self.rate = rate
+        self.size = int(rate * seconds)
+        self.buf = np.zeros(self.size, dtype=np.int16)
+        self.head = 0                       # total samples ever written
+        self.cond = threading.Condition()
+        self.closed = False
+        self.overruns = 0
+
+    def write(self, data):
+        s = np.frombuffer(data, dtype=np.int16)
+        total = n = len(s)
+        if n > self.size: s = s[-self.size:]; n = self.size
+        with self.cond:
+            i = (self.head + total - n) % self.size
+            first = min(n, self.size - i)
+            self.buf[i:i + first] = s[:first]
+            if first < n: self.buf[:n - first] = s[first:]
+            self.head += total
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond: self.closed = True; self.cond.notify_all()
+
+    def oldest(self): return max(0, self.head - self.size)
+
+    def wait_for(self, pos, timeout=None):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.head >= pos or self.closed, timeout) and self.head >= pos
+
+    def view(self, start, end, out=None):
+        # Samples [start, end); a view when contiguous in the ring, otherwise copied into `out`
+        n = end - start
+        i = start % self.size
+        if i + n <= self.size and out is None: return self.buf[i:i + n]
+        if out is None: out = np.empty(n, dtype=np.int16)
+        first = min(n, self.size - i)
+        out[:first] = self.buf[i:i + first]
+        out[first:n] = self.buf[:n - first]
+        return out[:n]
+
+    def slice(self, start, end):
+        start = max(start, self.oldest())
+        return self.view(start, end, out=np.empty(max(0, end - start), dtype=np.int16))
+
+    def reader(self, start=None):
+        return RingReader(self, self.head if start is None else start)
+
+
+class RingReader:
+    def __init__(self, ring, pos):
+        self.ring = ring; self.pos = pos
+        self.scratch = None
+
+    def seek(self, pos=None):
+        self.pos = self.ring.head if pos is None else pos
+
+    def read(self, n, timeout=None):
+        # Blocks until n new samples exist. Returns None on timeout / close.
+        if not self.ring.wait_for(self.pos + n, timeout): return None
+        if self.pos < self.ring.oldest():   # fell a whole ring behind, skip ahead
+            self.ring.overruns += 1; self.pos = self.ring.head - n
+        if self.scratch is None or len(self.scratch) < n: self.scratch = np.empty(n, dtype=np.int16)
+        i = self.pos % self.ring.size
+        frame = self.ring.view(self.pos, self.pos + n, None if i + n <= self.ring.size else self.scratch)
+        self.pos += n
+        return frame
+
+
+class MicCapture:
+    def __init__(self, stream, ring, chunk):
+        self.stream = stream; self.ring = ring; self.chunk = chunk
+        self.running = False; self.errors = 0
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def stop(self):
+        self.running = False; self.ring.close()
+
+    def _loop(self):
+        while self.running:
+            try: data = self.stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                self.errors += 1
+                if self.errors % 100 == 1: print(f"Mic read error: {e}")
+                time.sleep(0.01); continue
+            self.ring.write(data)
@@ -0,0 +1,177 @@
+import threading
+import numpy as np
+
+# ---------------------------------------------------------
+# OUTPUT MIXER
+# ---------------------------------------------------------
+# One long-lived output stream, one thread writing to it. Sounds (TTS, wake beep, alarm) are
+# sources registered by name with a priority; while a source is sounding, every lower
+# priority source is scaled by its `duck` (1.0 = mix equally, 0.0 = silence them). Gains
+# move in a ramp across one block so ducking doesn't click. Mixing is Q8 fixed point into
+# preallocated buffers, like the old gain stage.
+# stop() drops a source at once: at most the block being written (plus whatever the device
+# itself buffers) still plays. With nothing registered the thread sleeps and writes nothing.
+
+def to_mono16(data, channels, width, rate, out_rate):
+    # WAV frames (8/16-bit, any channel count, any rate) -> mono int16 at out_rate
+    if width == 1: x = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) * 256
+    elif width == 2: x = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    else: raise ValueError(f"unsupported sample width {width}")
+    if channels > 1: x = x[:len(x) // channels * channels].reshape(-1, channels).mean(axis=1)
+    if rate != out_rate and len(x):
+        n = int(len(x) * out_rate / rate)
+        x = np.interp(np.arange(n) * (rate / out_rate), np.arange(len(x)), x)
+    return np.clip(x, -32767, 32767).astype(np.int16)
+
+
+class Source:
+    # read(n) -> up to n int16 samples, an empty array while it has nothing yet (buffering),
+    # or None once finished
+    EMPTY = np.zeros(0, dtype=np.int16)
+
+    def __init__(self, priority=0, duck=1.0, gain=1.0, on_first=None, on_end=None):
+        self.priority = priority; self.duck = duck
+        self.gain_q = int(round(gain * 256)); self.cur_q = None
+        self.on_first = on_first; self.on_end = on_end
+        self.name = None; self.stopped = False; self.started = False; self.ended = False
+        self.level = 0.0                            # mean |sample| after gain, last block
+
+    def read(self, n): return None
+
+
+class ClipSource(Source):
+    # In-memory int16 PCM, played `loops` times with `gap` samples of silence in between
+    def __init__(self, pcm, loops=1, gap=0, **kw):
+        super().__init__(**kw)
+        self.pcm = pcm; self.loops = loops; self.gap = gap
+        self.pos = 0; self.loop = 0
+        self._silence = np.zeros(0, dtype=np.int16)
+
+    def read(self, n):
+        while not self.stopped and self.loop < self.loops:
+            if self.pos < len(self.pcm):
+                out = self.pcm[self.pos:self.pos + n]; self.pos += len(out)
+                return out
+            k = 0 if self.loop + 1 >= self.loops else min(n, len(self.pcm) + self.gap - self.pos)
+            if k <= 0: self.loop += 1; self.pos = 0; continue
+            if len(self._silence) < k: self._silence = np.zeros(k, dtype=np.int16)
+            self.pos += k
+            return self._silence[:k]
+        return None
+
+
+class StreamSource(Source):
+    # Drains a JitterBuffer; empty while it is prefilling or re-buffering
+    def __init__(self, jitter, block, **kw):
+        super().__init__(**kw)
+        self.jb = jitter
+        self.buf = np.empty(block, dtype=np.int16); self.bytes = self.buf.view(np.uint8)
+
+    def read(self, n):
+        if self.stopped: return None
+        jb = self.jb
+        if not jb.wait_ready(0): return None if jb.aborted or jb.done() else self.EMPTY
+        got = jb.read_into(self.bytes[:2 * n])
+        if got == 0: return None if jb.done() else self.EMPTY
+        jb.mark_first_sample()
+        return self.buf[:got // 2]
+
+
+class Mixer:
+    def __init__(self, stream, rate, block=1024, tap=None, poll_ms=5):
+        self.stream = stream; self.rate = rate; self.block = block
+        self.tap = tap                              # sees every block just before it is written
+        self.poll = poll_ms / 1000
+        self.sources = {}
+        self.cond = threading.Condition()
+        self.closed = False
+        self.acc = np.zeros(block, dtype=np.int32); self.work = np.empty(block, dtype=np.int32)
+        self.gains = np.empty(block, dtype=np.int32); self.ramp = np.arange(block, dtype=np.int32)
+        self.out = np.empty(block, dtype=np.int16)
+        self.out_ro = self.out.view(); self.out_ro.flags.writeable = False   # PyAudio wants a read-only buffer
+        self.blocks = 0; self.errors = 0
+        self.thread = threading.Thread(target=self._run, daemon=True, name="mixer")
+        self.thread.start()
+
+    def play(self, name, source):
+        # Registers `source` under `name`, replacing (and ending) whatever had that name
+        source.name = name
+        with self.cond:
+            old = self.sources.get(name)
+            self.sources[name] = source
+            self.cond.notify_all()
+        if old is not None: old.stopped = True; self._end(old)
+        return source
+
+    def stop(self, name):
+        with self.cond: src = self.sources.pop(name, None)
+        if src is not None: src.stopped = True; self._end(src)
+
+    def playing(self, name):
+        with self.cond: return name in self.sources
+
+    def close(self):
+        with self.cond: self.closed = True; self.cond.notify_all()
+
+    def _end(self, src):
+        if src.ended: return
+        src.ended = True
+        if src.on_end:
+            try: src.on_end()
+            except Exception as e: print(f"Mixer: {e}")
+
+    def _finish(self, src):
+        with self.cond:
+            if self.sources.get(src.name) is src: del self.sources[src.name]
+        self._end(src)
+
+    def _mix(self, srcs):
+        # Mixes one block into self.acc. Returns its length (0 = nothing to play), whether a live
+        # source is still waiting for data, and the sources heard for the first time
+        acc = self.acc; work = self.work; n_out = 0; duck_q = 256; waiting = False; fresh = []
+        for s in srcs:
+            pcm = s.read(self.block)
+            if pcm is None: self._finish(s); continue
+            n = len(pcm)
+            if n == 0: waiting = True; continue
+            g = (s.gain_q * duck_q) >> 8
+            if s.cur_q is None: s.cur_q = g
+            w = work[:n]; np.copyto(w, pcm)
+            if g == s.cur_q: np.multiply(w, g, out=w)
+            else:                                   # ramp from the last block's gain
+                gq = self.gains[:n]
+                np.multiply(self.ramp[:n], g - s.cur_q, out=gq); np.floor_divide(gq, n, out=gq); gq += s.cur_q
+                np.multiply(w, gq, out=w); s.cur_q = g
+            np.right_shift(w, 8, out=w)
+            if n > n_out: acc[n_out:n] = 0; n_out = n
+            acc[:n] += w
+            np.abs(w, out=w); s.level = int(w.sum()) / n
+            if not s.started: fresh.append(s)
+            duck_q = (duck_q * int(round(s.duck * 256))) >> 8
+        return n_out, waiting, fresh
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.sources and not self.closed: self.cond.wait()
+                if self.closed: return
+                srcs = sorted(self.sources.values(), key=lambda s: -s.priority)
+            n, waiting, fresh = self._mix(srcs)
+            if n == 0:
+                if waiting:
+                    with self.cond: self.cond.wait(self.poll)   # a stream is still prefilling
+                continue
+            np.clip(self.acc[:n], -32767, 32767, out=self.acc[:n])
+            np.copyto(self.out[:n], self.acc[:n], casting='unsafe')
+            out = self.out_ro[:n]
+            if self.tap: self.tap(out)
+            try: self.stream.write(out); self.errors = 0
+            except Exception as e:
+                self.errors += 1; print(f"Playback error: {e}")
+                if self.errors >= 3:                # device gone: end everything rather than spin
+                    for s in srcs: self.stop(s.name)
+                continue
+            self.blocks += 1
+            for s in fresh:
+                s.started = True
+                if s.on_first: s.on_first()
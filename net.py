@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ---------------------------------------------------------
+# SHARED CONNECTION POOL
+# ---------------------------------------------------------
+# One place that owns every outbound connection: a requests.Session (Serper, wttr.in, cache
+# warm-up), an httpx.Client for the blocking Groq SDK calls made off the hot path, and an
+# httpx.AsyncClient for everything a turn awaits (STT, LLM, TTS), so cancelling the turn
+# cancels the request. All keep connections alive per host. warm() opens connections ahead
+# of use (startup, wake word) so the first real request doesn't pay DNS + TCP + TLS.
+# Idempotent calls get retries and, optionally, a hedged second attempt when the first is
+# slow to answer.
+
+IDEMPOTENT = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+class ConnectionPool:
+    def __init__(self, connect_timeout=3.05, read_timeout=15.0, pool_size=8, retries=2, hedge_after=0.8):
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedge_after = hedge_after
+        self.lock = threading.Lock()
+        self.hosts = defaultdict(lambda: {"requests": 0, "new_connections": 0, "reused": 0, "errors": 0,
+                                          "hedges": 0, "hedge_wins": 0, "warmups": 0})
+        self.executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="net")
+        self.seen = {}
+
+        self.session = requests.Session()
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504), allowed_methods=IDEMPOTENT, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+
+        self.http = httpx.Client(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=120),
+            event_hooks={"request": [self._httpx_request]})
+        # Only ever used from the runtime's event loop
+        self.ahttp = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=120),
+            event_hooks={"request": [self._ahttpx_request]})
+
+    # --- requests side ---
+    def request(self, method, url, idempotent=None, hedge=False, **kw):
+        method = method.upper()
+        kw.setdefault("timeout", self.timeout)
+        if idempotent is None: idempotent = method in IDEMPOTENT
+        if hedge and idempotent and self.hedge_after and not kw.get("stream"):
+            return self._hedged(method, url, **kw)
+        return self._send(method, url, **kw)
+
+    def get(self, url, **kw): return self.request("GET", url, **kw)
+
+    def post(self, url, **kw): return self.request("POST", url, **kw)
+
+    def _send(self, method, url, **kw):
+        host = urlsplit(url).netloc
+        try: r = self.session.request(method, url, **kw)
+        except Exception:
+            with self.lock: self.hosts[host]["errors"] += 1
+            raise
+        with self.lock:
+            opened = self._opened_since_last(getattr(r.raw, "_pool", None))
+            st = self.hosts[host]; st["requests"] += 1
+            st["new_connections"] += opened; st["reused"] += 0 if opened else 1
+        return r
+
+    def _hedged(self, method, url, **kw):
+        host = urlsplit(url).netloc
+        first = self.executor.submit(self._send, method, url, **kw)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done: return first.result()
+        with self.lock: self.hosts[host]["hedges"] += 1
+        second = self.executor.submit(self._send, method, url, **kw)
+        pending = {first, second}; error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                try: r = f.result()
+                except Exception as e: error = e; continue
+                if f is second:
+                    with self.lock: self.hosts[host]["hedge_wins"] += 1
+                return r
+        raise error
+
+    def _opened_since_last(self, pool):
+        # urllib3 pools only count sockets ever opened; diff against what we saw last time
+        if pool is None: return 0
+        seen = self.seen.get(id(pool), 0); self.seen[id(pool)] = pool.num_connections
+        return max(0, pool.num_connections - seen)
+
+    # --- httpx side (Groq SDK, streamed TTS) ---
+    def _httpx_request(self, request, is_async=False):
+        host = request.url.netloc.decode()
+        with self.lock: self.hosts[host]["requests"] += 1
+        opened = []
+        def count(event):
+            if event == "connection.connect_tcp.complete" and not opened:
+                opened.append(1)
+                with self.lock: self.hosts[host]["new_connections"] += 1; self.hosts[host]["reused"] -= 1
+        with self.lock: self.hosts[host]["reused"] += 1   # corrected by count() if a socket gets opened
+        if is_async:
+            async def trace(event, info): count(event)
+        else:
+            def trace(event, info): count(event)
+        request.extensions["trace"] = trace
+
+    async def _ahttpx_request(self, request): self._httpx_request(request, is_async=True)
+
+    # --- warm-up ---
+    def warm(self, urls, async_urls=(), loop=None):
+        # Fire-and-forget HEADs; each leaves an idle keep-alive connection in the pool.
+        # `async_urls` are warmed on the AsyncClient, which has to happen on its `loop`.
+        def _head(url):
+            host = urlsplit(url).netloc
+            try:
+                r = self.session.head(url, timeout=5)
+                with self.lock:
+                    self.hosts[host]["new_connections"] += self._opened_since_last(getattr(r.raw, "_pool", None))
+                    self.hosts[host]["warmups"] += 1
+            except Exception: pass
+        for url in urls:
+            if url: self.executor.submit(_head, url)
+        async_urls = [u for u in async_urls if u]
+        if async_urls and loop: asyncio.run_coroutine_threadsafe(self.awarm(async_urls), loop)
+
+    async def awarm(self, urls):
+        async def _head(url):
+            try:
+                await self.ahttp.head(url, timeout=5)
+                with self.lock: self.hosts[urlsplit(url).netloc]["warmups"] += 1
+            except Exception: pass
+        await asyncio.gather(*(_head(u) for u in urls))
+
+    def stats(self):
+        with self.lock: return {h: dict(v) for h, v in self.hosts.items()}
@@ -0,0 +1,117 @@
+import time
+import threading
+
+# ---------------------------------------------------------
+# JITTER BUFFER
+# ---------------------------------------------------------
+# Byte FIFO between the TTS download and the output stream. Playback starts (and restarts
+# after an underrun) once `prefill_ms` of audio is buffered. The prefill adapts to how
+# fast audio has been arriving: a link that outruns real time gets a short prefill, a
+# slow one gets more headroom.
+
+class JitterBuffer:
+    def __init__(self, rate, target_ms=150, min_prefill_ms=40, max_prefill_ms=800):
+        self.bytes_per_ms = rate * 2 / 1000.0
+        self.play_rate = rate * 2.0                 # bytes per second consumed by the device
+        self.target_ms = target_ms; self.min_prefill_ms = min_prefill_ms; self.max_prefill_ms = max_prefill_ms
+        self.cond = threading.Condition()
+        self.buf = bytearray(); self.off = 0
+        self.arrival_ema = None                     # bytes/s, carried across turns
+        self.underruns = 0; self.total_underruns = 0
+        self.max_depth_ms = 0.0; self.depth_sum = 0.0; self.depth_n = 0
+        self.ttfs_ms = None; self.prefill_ms = target_ms
+        self.epoch = 0
+        self.start()
+
+    # --- producer side ---
+    def start(self):
+        with self.cond:
+            self.epoch += 1; self.cond.notify_all()     # a reader still waiting on the last reply gives up
+            del self.buf[:]; self.off = 0
+            self.eof = False; self.aborted = False; self.buffering = True
+            self.t_start = time.perf_counter(); self.t_first = None; self.t_last = None
+            self.first_len = 0; self.arrived = 0; self.played = 0
+            self.underruns = 0; self.ttfs_ms = None
+            self.max_depth_ms = 0.0; self.depth_sum = 0.0; self.depth_n = 0
+
+    def put(self, data):
+        now = time.perf_counter()
+        with self.cond:
+            if self.aborted: return
+            if self.t_first is None: self.t_first = now; self.first_len = len(data)
+            self.t_last = now; self.arrived += len(data)
+            self.buf += data
+            self.cond.notify_all()
+
+    def finish(self):
+        with self.cond:
+            self.eof = True
+            rate = self.arrival_rate()
+            if rate: self.arrival_ema = rate if self.arrival_ema is None else self.arrival_ema * 0.7 + rate * 0.3
+            self.cond.notify_all()
+
+    def abort(self):
+        with self.cond:
+            self.aborted = True; self.eof = True
+            del self.buf[:]; self.off = 0
+            self.cond.notify_all()
+
+    # --- consumer side ---
+    def depth(self): return len(self.buf) - self.off
+
+    def depth_ms(self): return self.depth() / self.bytes_per_ms
+
+    def arrival_rate(self):
+        if self.t_first is None or self.t_last - self.t_first < 0.02: return self.arrival_ema
+        return (self.arrived - self.first_len) / (self.t_last - self.t_first)
+
+    def _prefill_bytes(self):
+        rate = self.arrival_rate()
+        ms = self.target_ms if not rate else self.target_ms * min(4.0, self.play_rate / rate)
+        self.prefill_ms = min(self.max_prefill_ms, max(self.min_prefill_ms, ms))
+        return int(self.prefill_ms * self.bytes_per_ms)
+
+    def wait_ready(self, timeout=None):
+        # Blocks while (re)buffering. True when audio may be read, False on timeout, abort or restart.
+        with self.cond:
+            epoch = self.epoch
+            if not self.buffering: return not self.aborted
+            ok = self.cond.wait_for(lambda: self.aborted or self.epoch != epoch or self.eof
+                                    or self.depth() >= self._prefill_bytes(), timeout)
+            if not ok or self.aborted or self.epoch != epoch: return False
+            self.buffering = False
+            return True
+
+    def read_into(self, out):
+        # Copies exactly len(out) bytes (or the remainder at end of stream) into `out`.
+        # Returns 0 on underrun (switches back to buffering) or when the stream is done.
+        with self.cond:
+            avail = self.depth()
+            if avail < len(out) and not self.eof:
+                if self.played: self.underruns += 1; self.total_underruns += 1
+                self.buffering = True
+                return 0
+            n = min(len(out), avail); n -= n % 2
+            if n == 0: return 0
+            out[:n] = memoryview(self.buf)[self.off:self.off + n]
+            self.off += n; self.played += n
+            if self.off > 65536 and self.off * 2 > len(self.buf):
+                del self.buf[:self.off]; self.off = 0
+            d = self.depth_ms()
+            self.depth_sum += d; self.depth_n += 1; self.max_depth_ms = max(self.max_depth_ms, d)
+            return n
+
+    def done(self):
+        with self.cond: return self.eof and self.depth() < 2
+
+    def mark_first_sample(self):
+        if self.ttfs_ms is None: self.ttfs_ms = (time.perf_counter() - self.t_start) * 1000
+
+    def stats(self):
+        with self.cond:
+            rate = self.arrival_rate()
+            return {"underruns": self.underruns, "total_underruns": self.total_underruns,
+                    "depth_ms": round(self.depth_ms(), 1), "max_depth_ms": round(self.max_depth_ms, 1),
+                    "avg_depth_ms": round(self.depth_sum / self.depth_n, 1) if self.depth_n else 0.0,
+                    "prefill_ms": round(self.prefill_ms, 1), "ttfs_ms": self.ttfs_ms,
+                    "arrival_x_realtime": round(rate / self.play_rate, 2) if rate else None}
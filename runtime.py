@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------------------
+# ASYNC RUNTIME
+# ---------------------------------------------------------
+# One asyncio loop on its own thread runs every turn: capture, STT, tools, LLM and TTS are
+# tasks on it, so cancelling the turn's task aborts whatever network call is in flight.
+# Blocking device I/O (mic ring reads) runs on a small dedicated pool so it never stalls
+# the loop; the speaker belongs to the mixer's own thread. Kivy keeps the main thread; other threads talk to the loop through
+# submit()/call().
+
+class AsyncRuntime:
+    def __init__(self, io_workers=3):
+        self.loop = asyncio.new_event_loop()
+        self.io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="audio-io")
+        self.thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True, name="asyncio")
+            self.thread.start(); self._ready.wait()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        # From any thread: schedule `coro` as a task. The returned concurrent Future's
+        # cancel() cancels the task itself.
+        return asyncio.run_coroutine_threadsafe(coro, self.start().loop)
+
+    def call(self, fn, *args):
+        self.start().loop.call_soon_threadsafe(fn, *args)
+
+    async def blocking(self, fn, *args):
+        # Run a blocking device call on the I/O pool
+        return await self.loop.run_in_executor(self.io, fn, *args)
+
+    def reserve_io(self, n):
+        # Each capturing turn holds an I/O worker in a blocking mic read; many sessions need many
+        if n > self.io._max_workers:
+            old, self.io = self.io, ThreadPoolExecutor(max_workers=n, thread_name_prefix="audio-io")
+            old.shutdown(wait=False)
+
+
+class BackendLimits:
+    # Caps concurrent requests per backend ("stt", "llm", "tts") across every session in the
+    # process; 0 = unlimited. Time spent queued for a slot is traced as "<name>_queue".
+    def __init__(self, **limits):
+        self.limits = limits; self.sems = {}
+        self.waiting = dict.fromkeys(limits, 0); self.active = dict.fromkeys(limits, 0)
+
+    @asynccontextmanager
+    async def slot(self, name, tracer=None):
+        n = self.limits.get(name, 0)
+        if not n: yield; return
+        sem = self.sems.get(name)
+        if sem is None: sem = self.sems[name] = asyncio.Semaphore(n)   # on the runtime loop
+        if sem.locked():
+            self.waiting[name] += 1; start = tracer.now() if tracer else None
+            try: await sem.acquire()
+            finally: self.waiting[name] -= 1
+            if tracer: tracer.add_span(f"{name}_queue", start, tracer.now())
+        else: await sem.acquire()
+        self.active[name] += 1
+        try: yield
+        finally: self.active[name] -= 1; sem.release()
+
+    def stats(self):
+        return {k: {"limit": self.limits[k], "active": self.active[k], "waiting": self.waiting[k]} for k in self.limits}
+
+
+def event_setter(event):
+    # Callable that sets an asyncio.Event from any thread (e.g. the playback thread)
+    loop = asyncio.get_running_loop()
+    return lambda: loop.call_soon_threadsafe(event.set)
+
+
+async def aiter_any(items):
+    # Segments may come from an async generator (LLM stream) or a plain list
+    if hasattr(items, "__aiter__"):
+        async for x in items: yield x
+    else:
+        for x in items: yield x
+
+
+runtime = AsyncRuntime()
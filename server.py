@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import struct
+import socket
+import threading
+
+from headless import StatusReporter
+from tracing import Tracer
+from runtime import runtime
+from assistant import (SmartAssistant, AudioEngine, AssistantState, new_tts_cache, limits, RATE,
+                       TRACE_FILE)
+
+# ---------------------------------------------------------
+# MULTI-SESSION SERVER
+# ---------------------------------------------------------
+# Many remote voice clients on one process. Each TCP connection is a session with its own
+# AssistantState, Tracer, conversation memory, VAD, echo canceller and mixer; the HTTP pools,
+# tool/LLM cache, TTS cache and the asyncio runtime are shared, and `limits` caps concurrent
+# STT/LLM/TTS requests across all sessions (STT_CONCURRENCY etc.).
+#
+# Framing, both directions: 1 type byte + 4-byte big-endian length + payload.
+#   client -> server   A  mic audio, 16 kHz mono int16, streamed continuously in real time
+#                      W  push-to-talk: start a turn now (the next thing said is the question)
+#   server -> client   T  reply audio, 16 kHz mono int16, paced to real time (+ SERVER_LEAD_MS)
+#                      S  status JSON on every change (same fields as headless mode)
+# Barge-in works as locally: speech over the reply, after echo suppression, interrupts it.
+# Session alarms live only as long as the connection. "Play X" is declined: it would open a
+# browser on the server, not on the client's device.
+
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8765"))
+SERVER_MAX_SESSIONS = int(os.getenv("SERVER_MAX_SESSIONS", "32"))
+SERVER_LEAD_MS = int(os.getenv("SERVER_LEAD_MS", "150"))       # reply audio sent ahead of real time
+SERVER_WAKE_WORD = os.getenv("SERVER_WAKE_WORD", "0") == "1"   # per-session wake word instead of W frames
+
+HEADER = struct.Struct(">cI")
+
+def send_frame(sock, kind, payload=b""):
+    sock.sendall(HEADER.pack(kind, len(payload)) + bytes(payload))
+
+def recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk: return None
+        buf += chunk
+    return bytes(buf)
+
+def recv_frame(sock):
+    head = recv_exact(sock, HEADER.size)
+    if head is None: return None, None
+    kind, n = HEADER.unpack(head)
+    payload = recv_exact(sock, n) if n else b""
+    if payload is None: return None, None
+    return kind, payload
+
+
+class NetMic:
+    # The session's "input stream": read() blocks until the client has sent that much audio
+    def __init__(self):
+        self.buf = bytearray(); self.cond = threading.Condition(); self.closed = False
+
+    def feed(self, data):
+        with self.cond: self.buf += data; self.cond.notify()
+
+    def read(self, n, exception_on_overflow=False):
+        with self.cond:
+            while len(self.buf) < 2 * n and not self.closed: self.cond.wait()
+            if self.closed: return b""           # capture is stopped before this is closed
+            out = bytes(self.buf[:2 * n]); del self.buf[:2 * n]
+            return out
+
+    def stop_stream(self): pass
+
+    def close(self):
+        with self.cond: self.closed = True; self.cond.notify_all()
+
+
+class NetSpeaker:
+    # The session's "output stream": blocks like a device so the mixer keeps real time, but
+    # runs `lead` ahead so the client's playout never starves
+    def __init__(self, session, lead_ms=SERVER_LEAD_MS):
+        self.session = session; self.lead = lead_ms / 1000; self.t = None
+
+    def write(self, data):
+        pcm = memoryview(data).cast('B')
+        self.session.send(b"T", pcm)
+        now = time.perf_counter()
+        if self.t is None or self.t < now: self.t = now
+        self.t += len(pcm) / 2 / RATE
+        delay = self.t - now - self.lead
+        if delay > 0: time.sleep(delay)
+
+    def stop_stream(self): pass
+    def close(self): pass
+
+
+class SessionStatus(StatusReporter):
+    def __init__(self, session):
+        super().__init__(session.state, stdout=False)
+        self.session = session
+
+    def publish(self, line):
+        try: self.session.send(b"S", line)
+        except OSError: pass
+
+
+class Session:
+    def __init__(self, server, conn, addr):
+        self.server = server; self.conn = conn; self.addr = addr
+        self.send_lock = threading.Lock(); self.closed = False
+        self.mic = NetMic()
+        self.state = AssistantState(); self.tracer = Tracer(TRACE_FILE)
+        engine = AudioEngine(pa=self, state=self.state, tracer=self.tracer, tts_cache=server.tts_cache)
+        self.assistant = SmartAssistant(engine=engine, state=self.state, tracer=self.tracer, wake_word=server.wake_word,
+                                        alarm_file=None, prewarm=False, open_media=False)
+        self.status = SessionStatus(self).start()
+
+    # PyAudio stand-in for AudioEngine
+    def open(self, **kw): return self.mic if kw.get("input") else NetSpeaker(self)
+
+    def send(self, kind, payload):
+        with self.send_lock: send_frame(self.conn, kind, payload)
+
+    def run(self):
+        try:
+            while True:
+                kind, payload = recv_frame(self.conn)
+                if kind is None: break
+                if kind == b"A": self.mic.feed(payload)
+                elif kind == b"W": self.assistant.push_to_talk()
+        except OSError: pass
+        finally: self.close()
+
+    def close(self):
+        if self.closed: return
+        self.closed = True
+        self.status.stop(); self.assistant.close(); self.mic.close()
+        try: self.conn.shutdown(socket.SHUT_RDWR); self.conn.close()   # shutdown also wakes a blocked recv()
+        except OSError: pass
+        self.server.ended(self)
+
+
+class VoiceServer:
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, max_sessions=SERVER_MAX_SESSIONS, wake_word=SERVER_WAKE_WORD):
+        self.max_sessions = max_sessions; self.wake_word = wake_word
+        self.sessions = set(); self.starting = 0; self.lock = threading.Lock(); self.running = False
+        self.tts_cache = new_tts_cache()
+        self.sock = socket.create_server((host, port))
+        self.port = self.sock.getsockname()[1]
+        runtime.reserve_io(max_sessions + 2)    # every capturing turn parks a worker on its mic
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True, name="voice-server").start()
+        return self
+
+    def stop(self):
+        self.running = False; self.sock.close()
+        with self.lock: sessions = list(self.sessions)
+        for s in sessions: s.close()
+
+    def _accept(self):
+        while self.running:
+            try: conn, addr = self.sock.accept()
+            except OSError: return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn, addr), daemon=True, name="session").start()
+
+    def _serve(self, conn, addr):
+        with self.lock:
+            full = len(self.sessions) + self.starting >= self.max_sessions
+            if not full: self.starting += 1
+        if full:
+            try: send_frame(conn, b"S", (json.dumps({"error": "server full"}) + "\n").encode())
+            except OSError: pass
+            conn.close(); return
+        try: session = Session(self, conn, addr)
+        except Exception as e:
+            print(f"Session {addr}: {e}"); conn.close(); session = None
+        with self.lock:
+            self.starting -= 1
+            if session is None: return
+            self.sessions.add(session)
+        session.run()
+
+    def ended(self, session):
+        with self.lock: self.sessions.discard(session)
+
+    def stats(self):
+        with self.lock: n = len(self.sessions)
+        return {"sessions": n, "backends": limits.stats()}
+
+
+def run(host=SERVER_HOST, port=SERVER_PORT):
+    # Blocks until SIGINT/SIGTERM
+    import signal
+    done = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: done.set()); signal.signal(signal.SIGTERM, lambda *_: done.set())
+    server = VoiceServer(host, port).start()
+    print(f"Serving voice sessions on {host}:{server.port}", flush=True)
+    done.wait()
+    server.stop()
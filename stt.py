@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import queue
+import numpy as np
+
+from codec import encode_upload
+
+# ---------------------------------------------------------
+# SPEECH TO TEXT
+# ---------------------------------------------------------
+# Backends only need `transcribe(pcm, rate) -> str`, where pcm is mono int16 bytes.
+# Anything with that method can be handed to SmartAssistant(stt=...), e.g. a local stand-in.
+# An optional `async atranscribe(pcm, rate)` is preferred by the turn pipeline, since
+# awaiting it lets an interrupt cancel the upload; otherwise transcribe() runs in a thread.
+
+class GroqWhisperSTT:
+    # `codec`: how the capture is uploaded, "wav", "flac" or "opus" (see codec.py)
+    def __init__(self, client, model="whisper-large-v3", aclient=None, codec="wav"):
+        self.client = client; self.model = model; self.aclient = aclient; self.codec = codec
+        self.bytes_sent = 0
+
+    def _file(self, pcm, rate):
+        f = encode_upload(pcm, rate, self.codec)
+        self.bytes_sent += len(f[1])
+        return f
+
+    def transcribe(self, pcm, rate):
+        return self.client.audio.transcriptions.create(file=self._file(pcm, rate), model=self.model).text
+
+    async def atranscribe(self, pcm, rate):
+        if self.aclient is None: return await asyncio.to_thread(self.transcribe, pcm, rate)
+        f = await asyncio.to_thread(self._file, pcm, rate) if self.codec != "wav" else self._file(pcm, rate)
+        return (await self.aclient.audio.transcriptions.create(file=f, model=self.model)).text
+
+
+class IncrementalTranscriber:
+    # Transcribes the capture in windows while the user is still talking, so only the
+    # tail after the last window is left to upload once endpointing fires. Uploads call the
+    # backend on the worker thread, or `submit(pcm, rate)` -> concurrent Future when given (the
+    # assistant's, which takes an STT_CONCURRENCY slot). close() drops queued windows, cancels
+    # the one in flight and stops the worker; a capture that is abandoned must be close()d.
+    def __init__(self, backend, rate, window_s=2.5, search_s=0.6, silence_amp=300, submit=None):
+        self.backend = backend; self.rate = rate; self.submit = submit
+        self.window = int(window_s * rate) * 2          # bytes
+        self.search = int(search_s * rate) * 2
+        self.frame = int(0.032 * rate) * 2              # granularity of cut-point search
+        self.silence_amp = silence_amp
+        self.buf = bytearray(); self.committed = 0
+        self.texts = []; self.failed = False; self.closed = False; self.inflight = None
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def feed(self, data):
+        self.buf += data
+        if len(self.buf) - self.committed >= self.window:
+            cut = self._quietest_cut(self.committed + self.window)
+            self._submit(self.committed, cut)
+            self.committed = cut
+
+    def finish(self):
+        self._submit(self.committed, len(self.buf))
+        self.jobs.put(None); self.worker.join()
+        if self.failed and not self.closed:  # a window was lost, redo the whole utterance in one go
+            return self._transcribe(bytes(self.buf))
+        return " ".join(t.strip() for t in self.texts if t and t.strip())
+
+    def close(self):
+        self.closed = True; self.jobs.put(None)
+        fut = self.inflight
+        if fut is not None: fut.cancel()
+
+    def _transcribe(self, pcm):
+        if self.submit is None: return self.backend.transcribe(pcm, self.rate)
+        fut = self.inflight = self.submit(pcm, self.rate)
+        if self.closed: fut.cancel()        # close() may have run before inflight was set
+        return fut.result()
+
+    def _quietest_cut(self, end):
+        # Cut at the lowest-energy frame near the window end so words aren't split
+        start = max(self.committed + self.frame, end - self.search)
+        seg = np.frombuffer(self.buf, dtype=np.int16, count=(end - start) // 2, offset=start)
+        n = len(seg) // (self.frame // 2)
+        if n == 0: return end
+        energy = np.abs(seg[:n * (self.frame // 2)].astype(np.int32)).reshape(n, -1).sum(axis=1)
+        return start + int(np.argmin(energy)) * self.frame
+
+    def _submit(self, start, end):
+        if end <= start: return
+        pcm = bytes(self.buf[start:end])
+        if np.abs(np.frombuffer(pcm, dtype=np.int16)).max() < self.silence_amp: return  # Whisper hallucinates on silence
+        self.jobs.put(pcm)
+
+    def _work(self):
+        while True:
+            pcm = self.jobs.get()
+            if pcm is None: break
+            if self.failed or self.closed: continue
+            try: self.texts.append(self._transcribe(pcm))
+            except Exception as e:
+                if not self.closed: print(e)
+                self.failed = True
@@ -0,0 +1,132 @@
+# AlarmScheduler on a fake clock: run_pending() is called after moving time, and the
+# scheduler thread is driven through an injected wait() that advances the clock instead
+# of sleeping.
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from alarms import AlarmScheduler, DAY
+
+T0 = 1_700_000_000.0
+
+class FakeClock:
+    def __init__(self, t=T0): self.t = t
+    def __call__(self): return self.t
+    def advance(self, s): self.t += s
+
+def scheduler(clock, path=None, **kw):
+    fired = []
+    s = AlarmScheduler(fired.append, path, clock=clock, **kw)
+    return s, fired
+
+
+def test_next_is_earliest_whatever_the_insert_order():
+    clock = FakeClock(); s, _ = scheduler(clock)
+    late = s.add(T0 + 300, "late"); early = s.add(T0 + 60, "early"); s.add(T0 + 120, "mid")
+    assert s.next() is early
+    assert [a.label for a in s.pending()] == ["early", "mid", "late"]
+    assert late.id != early.id
+
+def test_fires_in_order_once_due():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    s.add(T0 + 120, "b"); s.add(T0 + 60, "a")
+    assert s.run_pending() == []
+    clock.advance(60); assert [a.label for a in s.run_pending()] == ["a"]
+    clock.advance(60); assert [a.label for a in s.run_pending()] == ["b"]
+    assert [a.label for a in fired] == ["a", "b"]
+    assert s.next() is None and s.run_pending() == []
+
+def test_cancel_by_id():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    a = s.add(T0 + 60, "a"); b = s.add(T0 + 90, "b")
+    assert s.cancel(a.id) == 1 and s.cancel(a.id) == 0
+    assert s.next() is b
+    clock.advance(100); s.run_pending()
+    assert [x.label for x in fired] == ["b"]
+
+def test_cancel_all():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    s.add(T0 + 60); s.add(T0 + 90, repeat=DAY)
+    assert s.cancel() == 2
+    assert s.next() is None and s.pending() == []
+    clock.advance(DAY * 2); assert s.run_pending() == [] and fired == []
+
+def test_snooze_after_fire():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    assert s.snooze(9) is None                      # nothing has rung yet
+    s.add(T0 + 60, "wake up")
+    clock.advance(60); s.run_pending()
+    snoozed = s.snooze(9)
+    assert snoozed.at == clock() + 9 * 60 and snoozed.label == "wake up"
+    clock.advance(9 * 60 - 1); assert s.run_pending() == []
+    clock.advance(1); assert [a.label for a in s.run_pending()] == ["wake up"]
+
+def test_daily_repeat_rolls_forward():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    a = s.add(T0 + 60, "daily", repeat=DAY)
+    clock.advance(60); assert s.run_pending()[0].id == a.id
+    assert s.next().id == a.id and s.next().at == T0 + 60 + DAY
+    clock.advance(DAY); assert len(s.run_pending()) == 1
+    assert s.next().at == T0 + 60 + 2 * DAY
+
+def test_repeat_skips_missed_days_and_fires_once():
+    clock = FakeClock(); s, fired = scheduler(clock)
+    s.add(T0 + 60, repeat=DAY)
+    clock.advance(60 + 3 * DAY + 30)                # suspended over three occurrences
+    assert len(s.run_pending()) == 1                # rings once: the latest was only 30 s ago
+    assert s.next().at == T0 + 60 + 4 * DAY
+
+def test_clock_jump_within_grace_still_rings():
+    clock = FakeClock(); s, fired = scheduler(clock, grace=3600)
+    s.add(T0 + 60, "late but fine")
+    clock.advance(60 + 3599)
+    assert [a.label for a in s.run_pending()] == ["late but fine"]
+
+def test_repeat_past_grace_rolls_on_without_ringing():
+    clock = FakeClock(); s, fired = scheduler(clock, grace=3600)
+    s.add(T0 + 60, repeat=DAY)
+    clock.advance(60 + 2 * DAY + 7200)              # latest occurrence missed by 2 h
+    assert s.run_pending() == [] and fired == []
+    assert s.next().at == T0 + 60 + 3 * DAY
+
+def test_stale_alarm_past_grace_is_dropped_silently():
+    clock = FakeClock(); s, fired = scheduler(clock, grace=3600)
+    s.add(T0 + 60, "stale")
+    clock.advance(60 + 3601)
+    assert s.run_pending() == [] and fired == []
+    assert s.next() is None
+
+def test_thread_wakes_on_injected_wait():
+    # While an alarm is pending wait() moves the fake clock by the timeout instead of sleeping
+    # it; once nothing is left it really waits, so stop() can get the lock and wake it
+    clock = FakeClock(); fired = threading.Event(); waits = []
+    def wait(cond, timeout):
+        if not s.alarms: cond.wait(timeout); return
+        waits.append(timeout); clock.advance(timeout)
+    s = AlarmScheduler(lambda a: fired.set(), None, clock=clock, wait=wait, max_sleep=15.0)
+    s.add(T0 + 40)
+    s.start()
+    try: assert fired.wait(5)
+    finally: s.stop()
+    assert waits == [15.0, 15.0, 10.0]              # capped sleeps, then exactly up to the deadline
+
+def test_persistence_reloads_from_path(tmp_path):
+    path = str(tmp_path / "alarms.json"); clock = FakeClock()
+    s, _ = scheduler(clock, path)
+    a = s.add(T0 + 60, "once"); b = s.add(T0 + 120, "daily", repeat=DAY); c = s.add(T0 + 180, "gone")
+    s.cancel(c.id)
+
+    r, fired = scheduler(clock, path)
+    assert [(x.id, x.at, x.label, x.repeat) for x in r.pending()] == [(a.id, a.at, "once", None), (b.id, b.at, "daily", DAY)]
+    assert r.add(T0 + 240).id > b.id                # ids keep counting after the saved ones
+    clock.advance(120); r.run_pending()
+    assert [x.label for x in fired] == ["once", "daily"]
+
+    again, _ = scheduler(clock, path)               # fired one-shots are gone, the repeat moved on
+    assert [(x.label, x.at) for x in again.pending() if x.label] == [("daily", T0 + 120 + DAY)]
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "alarms.json"; path.write_text("{not json")
+    s, _ = scheduler(FakeClock(), str(path))
+    assert s.pending() == []
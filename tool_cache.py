@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------------------
+# TOOL RESULT CACHE
+# ---------------------------------------------------------
+# Results of slow calls (web search, weather, LLM answers) keyed by (tool, normalized query).
+# Per tool: `ttl` seconds fresh, then served stale for up to `stale` more seconds while one
+# background refresh runs (stale-while-revalidate). Bounded LRU, optionally saved to disk.
+
+def normalize_query(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+class ToolCache:
+    def __init__(self, path=None, max_entries=512, save_delay=2.0):
+        self.path = path; self.max_entries = max_entries; self.save_delay = save_delay
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()          # "tool|key" -> [value, stored_at]
+        self.policies = {}                    # tool -> (ttl, stale)
+        self.refreshing = set()
+        self.stats_ = defaultdict(lambda: {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0,
+                                           "errors": 0, "saved_s": 0.0, "avg_cost_s": 0.0})
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-cache")
+        self._save_timer = None
+        self._load()
+
+    def register(self, tool, ttl, stale=0):
+        self.policies[tool] = (ttl, stale)
+
+    # --- lookups ---
+    def get(self, tool, key, fetch, cacheable=None):
+        # Blocking: fresh hit, stale hit (+ background refresh), or fetch now on a miss
+        k, value, age = self._lookup(tool, key)
+        ttl, stale = self.policies.get(tool, (0, 0))
+        if age is not None and age <= ttl:
+            self._hit(tool, stale=False); return value
+        if age is not None and age <= ttl + stale:
+            self._hit(tool, stale=True); self._refresh(tool, k, fetch, cacheable)
+            return value
+        with self.lock: self.stats_[tool]["misses"] += 1
+        return self._fetch(tool, k, fetch, cacheable)
+
+    def get_async(self, tool, key, fetch, callback, cacheable=None):
+        # Never blocks: returns whatever is cached (or None) and calls `callback(value)` when a
+        # refresh/fetch lands. Used for the weather line, which should just stay current.
+        k, value, age = self._lookup(tool, key)
+        ttl, stale = self.policies.get(tool, (0, 0))
+        if age is not None and age <= ttl:
+            self._hit(tool, stale=False); return value
+        if age is not None and age <= ttl + stale: self._hit(tool, stale=True)
+        else:
+            with self.lock: self.stats_[tool]["misses"] += 1
+            value = None
+        self._refresh(tool, k, fetch, cacheable, callback)
+        return value
+
+    def fresh(self, tool, key):
+        # Value if still within its TTL, else None (counted as a miss). For callers that fetch
+        # themselves, e.g. a streamed LLM reply stored afterwards with put().
+        _, value, age = self._lookup(tool, key)
+        if age is not None and age <= self.policies.get(tool, (0, 0))[0]:
+            self._hit(tool, stale=False); return value
+        with self.lock: self.stats_[tool]["misses"] += 1
+        return None
+
+    def put(self, tool, key, value, cost_s=None):
+        k = f"{tool}|{normalize_query(key)}"
+        self._store(tool, k, value, cost_s)
+
+    # --- internals ---
+    def _lookup(self, tool, key):
+        k = f"{tool}|{normalize_query(key)}"
+        with self.lock:
+            e = self.entries.get(k)
+            if e is None: return k, None, None
+            self.entries.move_to_end(k)
+            return k, e[0], time.time() - e[1]
+
+    def _hit(self, tool, stale):
+        with self.lock:
+            st = self.stats_[tool]
+            st["stale_hits" if stale else "hits"] += 1
+            st["saved_s"] += st["avg_cost_s"]
+
+    def _fetch(self, tool, k, fetch, cacheable):
+        t0 = time.perf_counter()
+        value = fetch()
+        cost = time.perf_counter() - t0
+        if cacheable is None or cacheable(value): self._store(tool, k, value, cost)
+        return value
+
+    def _refresh(self, tool, k, fetch, cacheable, callback=None):
+        with self.lock:
+            if k in self.refreshing: return
+            self.refreshing.add(k); self.stats_[tool]["refreshes"] += 1
+        def _job():
+            try:
+                value = self._fetch(tool, k, fetch, cacheable)
+                if callback: callback(value)
+            except Exception as e:
+                with self.lock: self.stats_[tool]["errors"] += 1
+                print(f"{tool} refresh failed: {e}")
+            finally:
+                with self.lock: self.refreshing.discard(k)
+        self.executor.submit(_job)
+
+    def _store(self, tool, k, value, cost_s):
+        with self.lock:
+            self.entries[k] = [value, time.time()]; self.entries.move_to_end(k)
+            while len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+            if cost_s is not None:
+                st = self.stats_[tool]
+                st["avg_cost_s"] = cost_s if not st["avg_cost_s"] else st["avg_cost_s"] * 0.8 + cost_s * 0.2
+        self._schedule_save()
+
+    def _schedule_save(self):
+        if not self.path: return
+        with self.lock:
+            if self._save_timer is not None: return
+            self._save_timer = threading.Timer(self.save_delay, self._save)
+            self._save_timer.daemon = True; self._save_timer.start()
+
+    def _save(self):
+        with self.lock:
+            self._save_timer = None
+            data = {"entries": list(self.entries.items()),
+                    "avg_cost": {t: s["avg_cost_s"] for t, s in self.stats_.items()}}
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f: json.dump(data, f)
+            os.replace(tmp, self.path)
+        except (OSError, TypeError) as e: print(f"Could not save tool cache: {e}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path) as f: data = json.load(f)
+        except (OSError, ValueError) as e: print(f"Could not load tool cache: {e}"); return
+        for k, e in data.get("entries", []): self.entries[k] = e
+        for t, c in data.get("avg_cost", {}).items(): self.stats_[t]["avg_cost_s"] = c
+
+    def stats(self):
+        with self.lock:
+            out = {}
+            for tool, st in self.stats_.items():
+                lookups = st["hits"] + st["stale_hits"] + st["misses"]
+                out[tool] = dict(st, hit_rate=round((st["hits"] + st["stale_hits"]) / lookups, 3) if lookups else 0.0,
+                                 saved_s=round(st["saved_s"], 2), avg_cost_s=round(st["avg_cost_s"], 3))
+            return out
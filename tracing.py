@@ -0,0 +1,83 @@
+import json
+import time
+import threading
+import itertools
+from contextlib import contextmanager
+
+# ---------------------------------------------------------
+# TURN TRACING
+# ---------------------------------------------------------
+# Timestamped spans for each stage of a turn (wake, capture, stt, tool, llm, tts, playback).
+# Each finished turn is appended to a JSONL file as one object:
+#   {"turn": 3, "wall": 1718000000.1, "spans": [{"name": "stt", "start_ms": 812.4, "dur_ms": 402.1, ...}],
+#    "marks": {"first_audio": 1630.2, ...}, "summary": {...}}
+# Times are ms since the turn began. Spans may be recorded from any thread.
+
+class Tracer:
+    def __init__(self, path=None):
+        self.path = path; self.listeners = []
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.turn = None
+
+    def configure(self, path): self.path = path or None
+
+    def begin_turn(self, **attrs):
+        with self.lock:
+            if self.turn is not None: return self.turn["turn"]
+            self.t0 = time.perf_counter()
+            self.turn = {"turn": next(self.ids), "wall": time.time(), "attrs": attrs, "spans": [], "marks": {}}
+            return self.turn["turn"]
+
+    def _now(self): return (time.perf_counter() - self.t0) * 1000
+
+    @contextmanager
+    def span(self, name, **attrs):
+        if self.turn is None: yield attrs; return
+        start = self._now()
+        try: yield attrs
+        finally: self.add_span(name, start, self._now(), **attrs)
+
+    def now(self): return self._now() if self.turn is not None else None
+
+    def add_span(self, name, start_ms, end_ms, **attrs):
+        with self.lock:
+            if self.turn is None or start_ms is None or end_ms is None: return
+            self.turn["spans"].append(dict(name=name, start_ms=round(start_ms, 2), dur_ms=round(end_ms - start_ms, 2), **attrs))
+
+    def mark(self, name, once=True):
+        with self.lock:
+            if self.turn is None: return
+            if once and name in self.turn["marks"]: return
+            self.turn["marks"][name] = round(self._now(), 2)
+
+    def end_turn(self):
+        with self.lock:
+            turn, self.turn = self.turn, None
+        if turn is None: return None
+        turn["summary"] = summarize(turn)
+        if self.path:
+            try:
+                with open(self.path, "a") as f: f.write(json.dumps(turn) + "\n")
+            except OSError as e: print(f"Trace write failed: {e}")
+        for fn in self.listeners:
+            try: fn(turn)
+            except Exception as e: print(e)
+        return turn
+
+
+def summarize(turn):
+    # Per-stage totals plus the latencies users feel, all in ms
+    out = {}
+    for s in turn["spans"]: out[s["name"]] = round(out.get(s["name"], 0) + s["dur_ms"], 2)
+    capture = next((s for s in turn["spans"] if s["name"] == "capture"), None)
+    marks = turn["marks"]
+    if capture:
+        end_of_speech = capture["start_ms"] + capture["dur_ms"]
+        if "first_audio" in marks: out["time_to_first_audio"] = round(marks["first_audio"] - end_of_speech, 2)
+        if "llm_first_token" in marks: out["llm_first_token"] = round(marks["llm_first_token"] - end_of_speech, 2)
+        if "tts_first_byte" in marks: out["tts_first_byte"] = round(marks["tts_first_byte"] - end_of_speech, 2)
+    return out
+
+
+tracer = Tracer()
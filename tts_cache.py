@@ -0,0 +1,157 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# ---------------------------------------------------------
+# TTS AUDIO CACHE
+# ---------------------------------------------------------
+# Linear16 PCM keyed by (voice, sample rate, normalized text), plus the wire codec when the
+# audio was decoded from a lossy one (mulaw/opus) so it never stands in for a linear16 clip.
+# A small in-memory LRU sits in front of an on-disk LRU (file mtime = last use); both are size capped.
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+class TTSCache:
+    def __init__(self, voice, rate, directory=".tts_cache", mem_bytes=8 << 20, disk_bytes=64 << 20):
+        self.voice = voice; self.rate = rate; self.dir = directory
+        self.mem_cap = mem_bytes; self.disk_cap = disk_bytes
+        self.mem = OrderedDict(); self.mem_size = 0
+        self.lock = threading.Lock()
+        self.hits = 0; self.disk_hits = 0; self.misses = 0; self.evictions = 0
+        self.disk_size = 0
+        if self.dir:
+            os.makedirs(self.dir, exist_ok=True)
+            self.disk_size = sum(e.stat().st_size for e in os.scandir(self.dir) if e.name.endswith(".pcm"))
+
+    def key(self, text, codec="linear16"):
+        raw = f"{self.voice}|{self.rate}|{normalize_text(text)}"
+        if codec != "linear16": raw += f"|{codec}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, k): return os.path.join(self.dir, k + ".pcm")
+
+    def get(self, text, codec="linear16"):
+        k = self.key(text, codec)
+        with self.lock:
+            pcm = self.mem.get(k)
+            if pcm is not None:
+                self.mem.move_to_end(k); self.hits += 1
+                return pcm
+        if self.dir:
+            try:
+                with open(self._path(k), "rb") as f: pcm = f.read()
+                os.utime(self._path(k))
+            except OSError: pcm = None
+            if pcm is not None:
+                with self.lock: self.hits += 1; self.disk_hits += 1
+                self._remember(k, pcm)
+                return pcm
+        with self.lock: self.misses += 1
+        return None
+
+    def __contains__(self, text): return self.has(text)
+
+    def has(self, text, codec="linear16"):
+        k = self.key(text, codec)
+        with self.lock:
+            if k in self.mem: return True
+        return bool(self.dir) and os.path.exists(self._path(k))
+
+    def put(self, text, pcm, codec="linear16"):
+        if not pcm: return
+        k = self.key(text, codec)
+        self._remember(k, pcm)
+        if not self.dir: return
+        path = self._path(k); tmp = path + ".tmp"
+        try:
+            existed = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp, "wb") as f: f.write(pcm)
+            os.replace(tmp, path)
+        except OSError as e: print(e); return
+        with self.lock: self.disk_size += len(pcm) - existed
+        if self.disk_size > self.disk_cap: self._evict_disk()
+
+    def _remember(self, k, pcm):
+        if len(pcm) > self.mem_cap: return
+        with self.lock:
+            old = self.mem.pop(k, None)
+            if old is not None: self.mem_size -= len(old)
+            self.mem[k] = pcm; self.mem_size += len(pcm)
+            while self.mem_size > self.mem_cap:
+                _, dropped = self.mem.popitem(last=False)
+                self.mem_size -= len(dropped); self.evictions += 1
+
+    def _evict_disk(self):
+        files = sorted((e for e in os.scandir(self.dir) if e.name.endswith(".pcm")), key=lambda e: e.stat().st_mtime)
+        for e in files:
+            if self.disk_size <= self.disk_cap * 0.9: break
+            try:
+                size = e.stat().st_size; os.remove(e.path)
+                with self.lock: self.disk_size -= size; self.evictions += 1
+            except OSError: pass
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0, "evictions": self.evictions,
+                    "mem_entries": len(self.mem), "mem_bytes": self.mem_size, "disk_bytes": self.disk_size}
+
+# ---------------------------------------------------------
+# PRE-RENDERED PHRASE FRAGMENTS
+# ---------------------------------------------------------
+# Clock/alarm answers are stitched from cached fragments ("It's" + "five" + "oh seven" + "PM")
+# so they can be spoken without a TTS round-trip.
+
+ONES = ["", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+        "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty"]
+
+def number_words(n):
+    if n < 20: return ONES[n]
+    return TENS[n // 10] + ("-" + ONES[n % 10] if n % 10 else "")
+
+def minute_words(m):
+    if m == 0: return "o'clock"
+    if m < 10: return "oh " + ONES[m]
+    return number_words(m)
+
+def clock_fragments(prefix, hour, minute):
+    # hour is 0-23
+    h12 = hour % 12 or 12
+    return [prefix, number_words(h12), minute_words(minute), "PM" if hour >= 12 else "AM"]
+
+def all_clock_fragments(prefixes):
+    frags = list(prefixes) + ["AM", "PM"]
+    frags += [number_words(h) for h in range(1, 13)]
+    frags += [minute_words(m) for m in range(60)]
+    return list(dict.fromkeys(frags))
+
+class PhraseBank:
+    def __init__(self, cache, gap_ms=60, trim_amp=200):
+        self.cache = cache; self.trim_amp = trim_amp
+        self.gap = bytes(int(cache.rate * gap_ms / 1000) * 2)
+
+    def render(self, fragments, codec="linear16"):
+        parts = []
+        for frag in fragments:
+            if not self.cache.has(frag, codec): return None
+            pcm = self.cache.get(frag, codec)
+            if pcm is None: return None
+            parts.append(self._trim(pcm))
+        return self.gap.join(parts)
+
+    def _trim(self, pcm):
+        # Deepgram pads each clip with silence; strip it so fragments sit close together
+        s = np.frombuffer(pcm, dtype=np.int16)
+        loud = np.flatnonzero(np.abs(s.astype(np.int32)) > self.trim_amp)
+        if len(loud) == 0: return pcm
+        pad = self.cache.rate // 100
+        a = max(0, loud[0] - pad); b = min(len(s), loud[-1] + pad)
+        return s[a:b].tobytes()
+
+    def missing(self, texts, codec="linear16"):
+        return [t for t in texts if not self.cache.has(t, codec)]
@@ -0,0 +1,313 @@
+import os
+import re
+import math
+import time
+from datetime import datetime
+
+# Kivy opens its window on import: only `main.py` without --headless imports this module
+from kivy.app import App
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Line, Ellipse, Rectangle, InstructionGroup, StencilPush, StencilUse, StencilUnUse, StencilPop
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.utils import get_color_from_hex, escape_markup
+from kivy.config import Config
+
+from assistant import SmartAssistant, ToolManager, state
+from waveform import WaveGeometry
+
+# --- CONFIGURATION ---
+Config.set('input', 'mouse', 'mouse,multitouch_on_demand')
+
+# Set window background color
+Window.clearcolor = (0.02, 0.03, 0.05, 1)
+
+# FONTS 
+FONT_DIGITAL = 'digital.ttf'
+FONT_TEMP = 'temp.ttf'      
+FONT_CLASSIC = 'classic.ttf' 
+
+# Redraw only on change: fades and the typewriter run at UI_FPS, the idle screen's pulsing
+# dots at UI_IDLE_FPS (0 = hold them still and draw nothing until something changes)
+UI_FPS = float(os.getenv("UI_FPS", "60"))
+UI_IDLE_FPS = float(os.getenv("UI_IDLE_FPS", "10"))
+UI_STATS = float(os.getenv("UI_STATS", "0"))     # print frames / texture uploads per minute every N s
+
+# State fields the screen shows; changes to any of them wake the UI
+UI_FIELDS = ("active", "user_text", "ai_text", "current_temp", "next_alarm_label", "is_alarm_ringing")
+
+# ---------------------------------------------------------
+# VISUALIZER & UI
+# ---------------------------------------------------------
+class ProAudioWave(Widget):
+    LAYERS = [
+        {"color": "#4287f5", "s": 1.0, "f": 1.0, "l": 0.0},
+        {"color": "#00f7ff", "s": 1.5, "f": 1.5, "l": 0.5},
+        {"color": "#8a00c2", "s": 2.2, "f": 2.0, "l": 1.0},
+        {"color": "#ffffff", "s": 2.8, "f": 2.5, "l": 1.5},
+    ]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.current_vol = 0; self.time = 0
+        self.geom = WaveGeometry([(l['s'], l['f'], l['l']) for l in self.LAYERS])
+        # Instructions are created once; update() only rewrites their points
+        self.lines = []
+        with self.canvas:
+            for l in self.LAYERS:
+                r, g, b, _ = get_color_from_hex(l['color'])
+                Color(r, g, b, 0.8); self.lines.append(Line(points=[], width=2))
+        self._ev = None
+        self.bind(opacity=self._on_opacity)
+        self._on_opacity(self, self.opacity)
+
+    def _on_opacity(self, _, value):
+        # The fade-out only approaches 0, so treat "barely visible" as hidden and stop the clock
+        if value > 0.01 and self._ev is None:
+            self._ev = Clock.schedule_interval(self.update, 1.0 / 30.0)
+        elif value <= 0.01 and self._ev is not None:
+            self._ev.cancel(); self._ev = None
+
+    def update(self, dt):
+        self.time += dt; lerp = 0.2
+        self.current_vol = self.current_vol * (1 - lerp) + state.amplitude * lerp
+        amp = math.tanh(self.current_vol / 40.0) * (self.height * 0.3) + 5
+        if self.width < 1: return
+        self.geom.resize(self.width)
+        pts = self.geom.update(self.time, amp, self.center_y)
+        for line, row in zip(self.lines, pts): line.points = row.tolist()
+
+
+class TypewriterLabel(Label):
+    # Types its text out without re-rendering it per character. The text is rendered whole,
+    # every word a markup ref so its box is known, and a stencil mask over those boxes grows
+    # each frame instead. The texture is only redrawn when the reveal catches up with text
+    # that has grown since (a streaming reply), or when the text is replaced.
+    def __init__(self, cps=60, **kwargs):
+        super().__init__(markup=True, **kwargs)
+        self.cps = cps; self.target = ""; self.plain = ""; self.shown = 0.0
+        self.words = []; self.boxes = []       # (start, end) per ref; + its boxes once rendered
+        self.mask_in = InstructionGroup(); self.mask_out = InstructionGroup()
+        for i in (StencilPush(), self.mask_in, StencilUse()): self.canvas.before.add(i)
+        for i in (StencilUnUse(), self.mask_out, StencilPop()): self.canvas.after.add(i)
+        self.bind(texture=self._on_texture, pos=self._mask, size=self._mask)
+
+    def show(self, text):
+        if text == self.target: return
+        if not text.startswith(self.plain[:int(self.shown)]):     # replaced, not extended
+            self.shown = 0.0; self._render(text)
+        elif not self.plain: self._render(text)
+        self.target = text
+
+    def advance(self, dt):
+        # One animation step; False once everything is shown
+        if self.shown >= len(self.target): return False
+        if self.shown >= len(self.plain): self._render(self.target)
+        self.shown = min(self.shown + self.cps * dt, len(self.plain))
+        self._mask()
+        return True
+
+    def _render(self, text):
+        self.plain = text; self.words = []; parts = []; pos = 0
+        for i, m in enumerate(re.finditer(r"\S+", text)):
+            parts.append(escape_markup(text[pos:m.start()])); parts.append(f"[ref={i}]{escape_markup(m.group())}[/ref]")
+            self.words.append(m.span()); pos = m.end()
+        self.text = "".join(parts)
+
+    def _on_texture(self, _, texture):
+        if texture is None: return              # texture_update() clears it first
+        self.boxes = [(s, e, self.refs.get(str(i), ())) for i, (s, e) in enumerate(self.words)]
+        self._mask()
+
+    def _mask(self, *_):
+        # One rectangle per line, from its first word to the reveal point
+        tw, th = self.texture_size
+        x0 = int(self.center_x - tw / 2.); y0 = int(self.center_y - th / 2.)   # as Label's own canvas rule
+        lines = {}
+        for s, e, boxes in self.boxes:
+            if s >= self.shown: break
+            w = sum(b[2] - b[0] for b in boxes) * min(1.0, (self.shown - s) / (e - s))
+            for x1, y1, x2, y2 in boxes:
+                if w <= 0: break
+                x2 = min(x2, x1 + w); w -= x2 - x1
+                r = lines.setdefault(y1, [x1, x2, y2]); r[0] = min(r[0], x1); r[1] = max(r[1], x2)
+        self.mask_in.clear(); self.mask_out.clear()
+        for y1, (x1, x2, y2) in lines.items():
+            for g in (self.mask_in, self.mask_out): g.add(Rectangle(pos=(x0 + x1, y0 + th - y2), size=(x2 - x1, y2 - y1)))
+
+
+class FrameStats:
+    # Frames actually drawn and label textures rendered (each one an upload to the GPU),
+    # per minute, split by whether a turn is on screen
+    def __init__(self, labels, every=UI_STATS):
+        self.n = {False: [0, 0, 0.0], True: [0, 0, 0.0]}      # active -> frames, textures, seconds
+        self.active = False; self.t = time.perf_counter()
+        Window.bind(on_flip=self._frame)
+        for l in labels: l.bind(texture=self._texture)
+        if every: Clock.schedule_interval(self.report, every)
+
+    def _frame(self, *_): self.n[self.active][0] += 1
+    def _texture(self, _, texture):
+        if texture is not None: self.n[self.active][1] += 1
+
+    def set_active(self, active):
+        now = time.perf_counter(); self.n[self.active][2] += now - self.t
+        self.t = now; self.active = active
+
+    def rates(self):
+        self.set_active(self.active)
+        return {("active" if k else "idle"): (f * 60 / s, x * 60 / s, s) for k, (f, x, s) in self.n.items() if s > 0}
+
+    def report(self, *_):
+        print("UI " + " | ".join(f"{k}: {f:.0f} frames/min, {x:.1f} texture uploads/min ({s:.0f} s)"
+                                 for k, (f, x, s) in self.rates().items()), flush=True)
+
+
+def _approach(widget, target, rate, dt):
+    # Framerate-independent version of `opacity += (target - opacity) * rate` at 60 fps;
+    # snaps when close and returns whether it is still moving
+    o = widget.opacity
+    if abs(target - o) < 0.005:
+        widget.opacity = target; return False
+    widget.opacity = o + (target - o) * (1 - (1 - rate) ** (dt * 60)); return True
+
+
+class AssistantInterface(FloatLayout):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        
+        f_dig = FONT_DIGITAL if os.path.exists(FONT_DIGITAL) else None
+        f_tmp = FONT_TEMP if os.path.exists(FONT_TEMP) else None
+        f_cls = FONT_CLASSIC if os.path.exists(FONT_CLASSIC) else None
+        
+        self.time_lbl = Label(text="00:00", font_name=f_dig, font_size="130sp", bold=True, pos_hint={"center_x": 0.5, "center_y": 0.7})
+        self.date_lbl = Label(text="DATE", font_name=f_dig, font_size="35sp", color=(0.5, 0.75, 0.9, 1), pos_hint={"center_x": 0.5, "center_y": 0.55})
+        
+        sub_col = (0.85, 0.85, 0.9, 0.8)
+        self.weather_lbl = Label(text="Loading...", font_name=f_tmp, font_size="22sp", color=sub_col, pos_hint={"center_x": 0.5, "center_y": 0.15})
+        self.alarm_lbl = Label(text="No alarms", font_name=f_tmp, font_size="22sp", color=sub_col, opacity=0, pos_hint={"center_x": 0.5, "center_y": 0.15})
+        
+        self.viz = ProAudioWave(opacity=0)
+        self.stt_lbl = TypewriterLabel(cps=120, text="", font_name=f_cls, font_size='22sp', color=(0.7,0.9,1,1), size_hint=(0.8, None), pos_hint={'center_x': 0.5, 'y': 0.6}, opacity=0)
+        self.ai_lbl = TypewriterLabel(cps=60, text="", font_name=f_cls, font_size='26sp', bold=True, color=(1,1,1,1), size_hint=(0.9, None), halign="center", valign="top", pos_hint={'center_x': 0.5, 'top': 0.45}, opacity=0)
+
+        self.add_widget(self.viz)
+        self.add_widget(self.time_lbl); self.add_widget(self.date_lbl)
+        self.add_widget(self.weather_lbl); self.add_widget(self.alarm_lbl)
+        self.add_widget(self.stt_lbl); self.add_widget(self.ai_lbl)
+        
+        self.dots = []; self.d_phase = 0
+        with self.canvas:
+            for _ in range(3):
+                c = Color(0.4, 0.8, 1, 0); e = Ellipse(size=(10,10))
+                self.dots.append((c,e))
+
+        self.active = False; self.show_weather = True
+        self.stats = FrameStats([self.time_lbl, self.date_lbl, self.weather_lbl, self.alarm_lbl, self.stt_lbl, self.ai_lbl])
+        self._anim = None; self.fps = 0
+        self.bind(size=self._layout)
+
+        # Labels change only when the state does; the listener runs on whichever thread
+        # wrote it and just fires a trigger, which runs _apply on the Kivy thread
+        self._changed = Clock.create_trigger(self._apply)
+        state.subscribe(lambda name, value: self._changed(), UI_FIELDS)
+        self._apply(); self._tick_clock()
+        self._info_ev = Clock.schedule_interval(self._toggle_info, 7)
+        Clock.schedule_interval(lambda dt: ToolManager.fetch_weather_bg(), 60)
+        ToolManager.fetch_weather_bg()
+
+    def _tick_clock(self, *_):
+        now = datetime.now()
+        self.time_lbl.text = now.strftime("%I:%M") 
+        self.date_lbl.text = now.strftime("%A | %b %d").upper()
+        Clock.schedule_once(self._tick_clock, 60.05 - now.second - now.microsecond / 1e6)   # next minute
+
+    def _apply(self, *_):
+        self.weather_lbl.text = f"Temp: {state.current_temp}"
+        if state.is_alarm_ringing:
+            self.alarm_lbl.text = "!!! WAKE UP !!!"
+            self.alarm_lbl.color = (1, 0.1, 0.1, 1) 
+        else:
+            self.alarm_lbl.text = f"Next Alarm: {state.next_alarm_label}"
+            self.alarm_lbl.color = (0.85, 0.85, 0.9, 0.8)
+
+        if state.active != self.active:
+            self.active = state.active; self.stats.set_active(self.active)
+            self._info_ev.cancel(); self._info_ev = Clock.schedule_interval(self._toggle_info, 7)
+        if self.active:
+            self.stt_lbl.show(f"You: {state.user_text}" if state.user_text else "")
+            self.ai_lbl.show(state.ai_text)
+        self._wake()
+
+    def _toggle_info(self, dt):
+        if self.active: return
+        self.show_weather = not self.show_weather; self._wake()
+
+    def _layout(self, *_):
+        self.stt_lbl.text_size = (self.width * 0.8, None)
+        self.ai_lbl.text_size = (self.width * 0.9, None)
+        cy = self.height * 0.42; cx = self.center_x
+        for i, (c, e) in enumerate(self.dots): e.pos = (cx - 30 + i*30 - 5, cy)
+        self._wake()
+
+    def _wake(self): self._pace(True)
+
+    def _pace(self, busy):
+        # Run the animation clock at UI_FPS while something moves, UI_IDLE_FPS for the idle
+        # dots, not at all otherwise
+        fps = UI_FPS if busy else (UI_IDLE_FPS if not self.active else 0)
+        if fps == self.fps: return
+        if self._anim is not None: self._anim.cancel(); self._anim = None
+        if fps: self._anim = Clock.schedule_interval(self._animate, 1 / fps)
+        self.fps = fps
+
+    def _animate(self, dt):
+        target_idle = 0.0 if self.active else 1.0
+        busy = _approach(self.time_lbl, target_idle, 0.1, dt)
+        self.date_lbl.opacity = self.time_lbl.opacity
+        
+        busy |= _approach(self.viz, 1 - target_idle, 0.2, dt)
+        self.stt_lbl.opacity = self.viz.opacity
+        self.ai_lbl.opacity = self.viz.opacity
+
+        if not self.active:
+            if self.show_weather:
+                busy |= _approach(self.weather_lbl, 1, 0.05, dt)
+                busy |= _approach(self.alarm_lbl, 0, 0.1, dt)
+            else:
+                busy |= _approach(self.weather_lbl, 0, 0.1, dt)
+                busy |= _approach(self.alarm_lbl, 1, 0.05, dt)
+        else:
+            self.weather_lbl.opacity = 0; self.alarm_lbl.opacity = 0
+            busy |= self.stt_lbl.advance(dt)
+            busy |= self.ai_lbl.advance(dt)
+
+        self.d_phase += dt * 2
+        for i, (c, e) in enumerate(self.dots):
+            c.a = ((math.sin(self.d_phase - i) + 1)/2 if UI_IDLE_FPS else 0.5) * 0.4 * target_idle
+        self._pace(busy)
+
+# ---------------------------------------------------------
+# APP
+# ---------------------------------------------------------
+class VoiceApp(App):
+    def build(self): return AssistantInterface()
+
+    def on_start(self):
+        self.assistant = SmartAssistant()
+        self.assistant.on_window_front = self.bring_window_front
+
+    def on_stop(self):
+        if UI_STATS: self.root.stats.report()
+        state.stop_signal = True; os._exit(0)
+
+    def bring_window_front(self):
+        def _job(dt):
+            try:
+                if hasattr(Window, 'restore'): Window.restore()
+                Window.raise_window()
+            except: pass
+        # Wait 3 seconds for browser to load, then steal focus back
+        Clock.schedule_once(_job, 3.0)
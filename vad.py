@@ -0,0 +1,101 @@
+import numpy as np
+
+# ---------------------------------------------------------
+# VOICE ACTIVITY DETECTION / ENDPOINTING
+# ---------------------------------------------------------
+# Frame energy (RMS) and zero-crossing rate against an adaptive noise floor.
+# The floor tracks the quiet level of the room: it falls quickly and rises slowly, so
+# speech bursts barely move it while a fan switching on is learned within seconds.
+
+def frame_features(frame, scratch=None):
+    # RMS and zero-crossing rate of one int16 frame
+    x = scratch[:len(frame)] if scratch is not None else np.empty(len(frame), dtype=np.float32)
+    np.copyto(x, frame, casting='unsafe')
+    rms = float(np.sqrt(np.dot(x, x) / len(x)))
+    zcr = np.count_nonzero(np.signbit(frame[1:]) != np.signbit(frame[:-1])) / len(frame)
+    return rms, zcr
+
+def batch_features(signal, frame_len):
+    # Same features for a whole recording at once: (n_frames,) arrays
+    n = len(signal) // frame_len
+    frames = signal[:n * frame_len].reshape(n, frame_len).astype(np.float32)
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_len)
+    sb = np.signbit(frames)
+    zcr = np.count_nonzero(sb[:, 1:] != sb[:, :-1], axis=1) / frame_len
+    return rms, zcr
+
+
+class VoiceActivityDetector:
+    def __init__(self, rate, frame_len=512, trailing_silence_ms=700, hangover_ms=160, min_speech_ms=96,
+                 max_utterance_ms=6000, no_speech_ms=5000, start_ratio=3.0, stop_ratio=1.8,
+                 min_level=120.0, zcr_max=0.35, floor_init=150.0, onset_gap_ms=0):
+        ms = 1000.0 * frame_len / rate
+        self.frame_ms = ms
+        self.trailing = max(1, int(round(trailing_silence_ms / ms)))
+        self.hangover = int(round(hangover_ms / ms))
+        self.min_speech = max(1, int(round(min_speech_ms / ms)))
+        self.onset_gap = int(round(onset_gap_ms / ms))     # dips between syllables a start run survives
+        self.max_frames = int(max_utterance_ms / ms)
+        self.no_speech = int(no_speech_ms / ms)
+        self.start_ratio = start_ratio; self.stop_ratio = stop_ratio
+        self.min_level = min_level; self.zcr_max = zcr_max
+        self.floor = floor_init
+        self.scratch = np.empty(frame_len, dtype=np.float32)
+        self.rms = 0.0; self.zcr = 0.0
+        self.reset()
+
+    def reset(self):
+        # New utterance; the noise floor is kept
+        self.speaking = False; self.frames = 0
+        self.run = 0; self.gap = 0; self.silence = 0; self.hang = 0
+        self.speech_start = None; self.last_voiced = None
+        self.reason = None
+
+    def _adapt(self, rms):
+        a = 0.3 if rms < self.floor else 0.03
+        self.floor += (rms - self.floor) * a
+        self.floor = max(self.floor, 1.0)
+
+    def observe(self, frame):
+        # Idle-time frames (wake-word loop): only learn the noise floor, so skip the zero-crossing count
+        x = self.scratch[:len(frame)]
+        np.copyto(x, frame, casting='unsafe')
+        self._adapt(float(np.sqrt(np.dot(x, x) / len(x))))
+
+    def process(self, frame):
+        # Returns None while listening, "start" when speech begins, or "end" once the
+        # utterance is over (see self.reason: "silence", "max_length" or "no_speech")
+        self.rms, self.zcr = rms, zcr = frame_features(frame, self.scratch)
+        self.frames += 1
+        start_thr = max(self.min_level, self.floor * self.start_ratio)
+        stop_thr = max(self.min_level * 0.75, self.floor * self.stop_ratio)
+
+        if not self.speaking:
+            if rms > start_thr and zcr < self.zcr_max:
+                self.run += 1; self.gap = 0
+                if self.run >= self.min_speech:
+                    self.speaking = True; self.silence = 0; self.hang = self.hangover
+                    self.speech_start = self.frames - self.run; self.last_voiced = self.frames
+                    return "start"
+            elif self.run and self.gap < self.onset_gap:
+                self.gap += 1
+            else:
+                self.run = 0; self.gap = 0; self._adapt(rms)
+            if self.frames >= self.no_speech: return self._end("no_speech")
+            return None
+
+        if rms > stop_thr:
+            self.silence = 0; self.hang = self.hangover; self.last_voiced = self.frames
+        elif self.hang > 0:
+            # Hangover: tail of a word / short gap. Counts towards silence but the floor stays put
+            self.hang -= 1; self.silence += 1
+        else:
+            self.silence += 1; self._adapt(rms)
+
+        if self.silence >= self.trailing: return self._end("silence")
+        if self.frames >= self.max_frames: return self._end("max_length")
+        return None
+
+    def _end(self, reason):
+        self.reason = reason
+        return "end"
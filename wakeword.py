@@ -0,0 +1,117 @@
+import wave
+import ctypes
+import numpy as np
+from vad import VoiceActivityDetector
+
+# ---------------------------------------------------------
+# WAKE-WORD DETECTORS
+# ---------------------------------------------------------
+# Detectors only need `frame_length`, `sample_rate`, `process(frame) -> int` (keyword index,
+# -1 for none) and `delete()`. `frame` is an int16 numpy array of frame_length samples and is
+# usually a view straight into the mic ring, so process() must not keep it.
+# This runs ~31 times a second for as long as the device is on: nothing on that path
+# should build Python lists or tuples of samples.
+
+_SHORT_P = ctypes.POINTER(ctypes.c_short)
+
+class PorcupineDetector:
+    # pvporcupine's own process() turns the frame into a Python list and then a fresh ctypes
+    # array every call. This hands the native library a pointer to the frame's memory
+    # instead, falling back to the public API if the binding's internals ever change.
+    def __init__(self, handle):
+        self.pv = handle
+        self.frame_length = handle.frame_length; self.sample_rate = handle.sample_rate
+        self._result = ctypes.c_int(); self._result_ref = ctypes.byref(self._result)
+        try: self._fn = handle._process_func; self._h = handle._handle; self._ok = handle.PicovoiceStatuses.SUCCESS
+        except AttributeError: self._fn = None
+
+    def process(self, frame):
+        if self._fn is None: return self.pv.process(frame)
+        if frame.dtype != np.int16 or not frame.flags.c_contiguous: frame = np.ascontiguousarray(frame, dtype=np.int16)
+        if len(frame) != self.frame_length: raise ValueError(f"expected {self.frame_length} samples, got {len(frame)}")
+        if self._fn(self._h, frame.ctypes.data_as(_SHORT_P), self._result_ref) is not self._ok:
+            return self.pv.process(frame)           # let the binding raise its own error
+        return self._result.value
+
+    def delete(self): self.pv.delete()
+
+
+class EnergyDetector:
+    # Fires once per burst of sound louder than the room: a clap, or any word. For tests and
+    # devices without a keyword model.
+    def __init__(self, rate, frame_length=512, min_ms=200, ratio=4.0, min_level=400.0):
+        self.sample_rate = rate; self.frame_length = frame_length
+        self.vad = VoiceActivityDetector(rate, frame_length, trailing_silence_ms=300, min_speech_ms=min_ms,
+                                         start_ratio=ratio, min_level=min_level, max_utterance_ms=10**9, no_speech_ms=10**9)
+
+    def process(self, frame):
+        ev = self.vad.process(frame)
+        if ev == "end": self.vad.reset()
+        return 0 if ev == "start" else -1
+
+    def delete(self): pass
+
+
+class TemplateDetector:
+    # Matches the last len(template) frames' log band energies against a recording of the
+    # wake word (correlation of the spectrograms with each band's mean removed). One rfft per frame.
+    def __init__(self, template, rate, frame_length=512, threshold=0.85, bands=20, min_level=300.0):
+        self.sample_rate = rate; self.frame_length = frame_length
+        self.threshold = threshold; self.min_level = min_level
+        edges = np.geomspace(100, min(4000, rate / 2 - 1), bands + 1) * frame_length / rate
+        self.edges = np.unique(edges.astype(int))[:-1]
+        self.window = np.hanning(frame_length).astype(np.float32)
+        self._x = np.empty(frame_length, dtype=np.float32)
+        tmpl = np.asarray(template, dtype=np.int16)
+        feats = np.array([self._features(tmpl[i:i + frame_length])[1]
+                          for i in range(0, len(tmpl) - frame_length + 1, frame_length)])
+        if len(feats) < 2: raise ValueError("wake word template is shorter than two frames")
+        t = feats - feats.mean(axis=0); t /= np.linalg.norm(t) + 1e-9
+        self.n = len(t)
+        self.rolled = np.stack([np.roll(t, k, axis=0).ravel() for k in range(self.n)])   # one per ring offset
+        self.hist = np.zeros_like(t); self.level = np.zeros(self.n)
+        self.i = 0; self.seen = 0; self.refractory = 0
+        self.score = 0.0
+
+    @classmethod
+    def from_wav(cls, path, rate, frame_length=512, **kw):
+        with wave.open(path, 'rb') as wf:
+            if wf.getframerate() != rate or wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: need 16-bit audio at {rate} Hz")
+            ch = wf.getnchannels()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if ch > 1: pcm = pcm.reshape(-1, ch)[:, 0]
+        return cls(pcm, rate, frame_length, **kw)
+
+    def _features(self, frame):
+        x = self._x[:len(frame)]
+        np.copyto(x, frame, casting='unsafe')
+        rms = float(np.sqrt(np.dot(x, x) / len(x)))
+        x *= self.window
+        p = np.fft.rfft(x); p = p.real ** 2 + p.imag ** 2
+        return rms, np.log10(np.add.reduceat(p, self.edges)[:len(self.edges) - 1] + 1.0)
+
+    def process(self, frame):
+        self.level[self.i], self.hist[self.i] = self._features(frame)
+        self.i = (self.i + 1) % self.n; self.seen += 1
+        if self.refractory: self.refractory -= 1; return -1
+        if self.seen < self.n or self.level.max() < self.min_level: return -1
+        h = (self.hist - self.hist.mean(axis=0)).ravel()
+        self.score = float(np.dot(h, self.rolled[self.i])) / (float(np.linalg.norm(h)) + 1e-9)
+        if self.score < self.threshold: return -1
+        self.refractory = self.n
+        return 0
+
+    def delete(self): pass
+
+
+def create_detector(engine, rate, frame_length=512, access_key=None, keyword=None, template=None, threshold=0.85):
+    # engine: "porcupine", "energy" or "template". Returns None (and says why) if it can't be built.
+    try:
+        if engine == "energy": return EnergyDetector(rate, frame_length)
+        if engine == "template": return TemplateDetector.from_wav(template, rate, frame_length, threshold=threshold)
+        import pvporcupine
+        return PorcupineDetector(pvporcupine.create(access_key=access_key, keywords=[keyword]))
+    except Exception as e:
+        print(f"Wake word ({engine}) unavailable: {e}")
+        return None
@@ -0,0 +1,41 @@
+import numpy as np
+
+# ---------------------------------------------------------
+# WAVEFORM GEOMETRY
+# ---------------------------------------------------------
+# Points for the visualizer's layered sine waves, all layers at once, into arrays that are
+# allocated once per widget size. Row i of `points` is the interleaved x, y list for layer i.
+
+class WaveGeometry:
+    def __init__(self, layers, step=12):
+        # layers: (speed, frequency, lag) per line
+        self.speed = np.array([l[0] for l in layers], dtype=np.float64)
+        self.freq = np.array([l[1] for l in layers], dtype=np.float64)
+        self.lag = np.array([l[2] for l in layers], dtype=np.float64)
+        self.step = step
+        self.offset = np.empty(len(layers), dtype=np.float64)
+        self.width = None
+        self.resize(0)
+
+    def resize(self, width):
+        width = int(width)
+        if width == self.width: return
+        self.width = width
+        x = np.arange(0, width, self.step, dtype=np.float64)
+        nx = x / width if width else x
+        self.base = 5 * self.freq[:, None] * nx[None, :]       # spatial phase per layer
+        self.env = np.sin(np.pi * nx)                           # pinned at both ends
+        self.tmp = np.empty_like(self.base)
+        self.points = np.empty((len(self.freq), 2 * len(x)), dtype=np.float64)
+        self.points[:, 0::2] = x
+
+    def update(self, t, amp, cy):
+        np.multiply(self.speed, t, out=self.offset)
+        np.subtract(self.offset, self.lag, out=self.offset)
+        np.add(self.base, self.offset[:, None], out=self.tmp)
+        np.sin(self.tmp, out=self.tmp)
+        np.multiply(self.tmp, self.env, out=self.tmp)
+        np.multiply(self.tmp, amp, out=self.tmp)
+        np.add(self.tmp, cy, out=self.tmp)
+        self.points[:, 1::2] = self.tmp
+        return self.points